@@ -14,6 +14,7 @@ from app.models.user import User
 from app.models.track import Track
 from app.models.track_preference import TrackPreference
 from app.models.track_behavior import TrackBehavior
+from app.models.track_image import TrackImage
 
 config = context.config
 
@@ -2,6 +2,9 @@ from app.core.config import settings
 import app.core.prompts as prompts
 from .tools import (
     recommend_by_features,
+    recommend_by_features_batch,
+    recommend_radio,
+    recommend_similar_tracks,
 )
 from app.services.recommender import RecommenderService
 from app.schemas.recommendation import AudioFeaturesInput
@@ -9,7 +9,10 @@ from app.core.config import settings
 import app.core.prompts as prompts
 from app.agents.sub_agents.recommender.tools import (
     recommend_by_features,
-    )
+    recommend_by_features_batch,
+    recommend_radio,
+    recommend_similar_tracks,
+)
 
 def create_recommender_agent():
     return Agent(
@@ -18,5 +21,10 @@ def create_recommender_agent():
         description=prompts.RECOMMENDER_DESCRIPTION,
         instruction=prompts.RECOMMENDER_INSTRUCTION,
         output_key="recommender_output",
-        tools=[recommend_by_features,],
-    )
\ No newline at end of file
+        tools=[
+            recommend_by_features,
+            recommend_by_features_batch,
+            recommend_similar_tracks,
+            recommend_radio,
+        ],
+    )
@@ -1,6 +1,8 @@
+from typing import Optional
+
 from google.adk.tools import ToolContext
 from app.services.recommender import RecommenderService
-from app.schemas.recommendation import AudioFeaturesInput
+from app.schemas.recommendation import AudioFeaturesInput, RadioInput
 
 
 async def recommend_by_features(tool_context: ToolContext, features: dict) -> list:
@@ -25,11 +27,122 @@ async def recommend_by_features(tool_context: ToolContext, features: dict) -> li
     try:
         input_data = AudioFeaturesInput(**(features | {"top_k": 5}))
 
-        results = await RecommenderService.recommend_by_audio_features(
+        result = await RecommenderService.recommend_by_audio_features(
             db, input_data, user=user
         )
 
-        tracks_dict = [t.model_dump() for t in results]
+        tracks_dict = [t.model_dump() for t in result.recommendations]
+
+        tool_context.state["metadata:tracks"] = tracks_dict
+
+        return tracks_dict
+    except Exception as e:
+        return [{"error": str(e)}]
+    finally:
+        db.close()
+
+
+async def recommend_by_features_batch(
+    tool_context: ToolContext, features_list: list[dict]
+) -> list:
+    """
+    Gera recomendações para várias músicas de referência em uma única chamada.
+
+    Use esta ferramenta quando houver mais de uma 'seed_track' (ex: o usuário citou várias músicas)
+    em vez de chamar `recommend_by_features` uma vez por música.
+
+    Args:
+        features_list: Lista de dicionários de características, no mesmo formato aceito por
+                    `recommend_by_features` (um dicionário por música de referência).
+
+    Returns:
+        Uma lista com uma lista de músicas recomendadas para cada item de `features_list`, na mesma ordem.
+    """
+    from app.agents.sub_agents.dj.tools import _get_user_from_context
+
+    user, db = _get_user_from_context(tool_context)
+    try:
+        items = [
+            AudioFeaturesInput(**(features | {"top_k": 5}))
+            for features in features_list
+        ]
+
+        results = await RecommenderService.recommend_batch(db, items, user=user)
+
+        tracks_lists = [
+            [t.model_dump() for t in result.recommendations] for result in results
+        ]
+
+        tool_context.state["metadata:tracks"] = [
+            t for tracks in tracks_lists for t in tracks
+        ]
+
+        return tracks_lists
+    except Exception as e:
+        return [{"error": str(e)}]
+    finally:
+        db.close()
+
+
+async def recommend_similar_tracks(tool_context: ToolContext, track_id: int) -> list:
+    """
+    Recomenda músicas parecidas com uma faixa do catálogo a partir do seu ID interno.
+
+    Prefira esta ferramenta quando o librarian_agent já retornou a 'seed_track' com o campo `id`:
+    ela não precisa das audio features e responde mais rápido que `recommend_by_features`.
+
+    Args:
+        track_id: O `id` interno da música de referência (campo `id` retornado pelo librarian).
+
+    Returns:
+        Uma lista de dicionários contendo os detalhes das músicas recomendadas, incluindo capas.
+    """
+    from app.agents.sub_agents.dj.tools import _get_user_from_context
+
+    user, db = _get_user_from_context(tool_context)
+    try:
+        result = await RecommenderService.similar_tracks(
+            db, track_id, top_k=5, user=user
+        )
+
+        tracks_dict = [t.model_dump() for t in result.recommendations]
+
+        tool_context.state["metadata:tracks"] = tracks_dict
+
+        return tracks_dict
+    except Exception as e:
+        return [{"error": str(e)}]
+    finally:
+        db.close()
+
+
+async def recommend_radio(
+    tool_context: ToolContext,
+    track_ids: Optional[list[int]] = None,
+    playlist_id: Optional[str] = None,
+) -> list:
+    """
+    Monta uma "rádio": recomenda músicas que combinam com um conjunto de faixas de referência.
+
+    Use esta ferramenta quando o usuário citar várias músicas ou uma playlist inteira como base,
+    em vez de pedir recomendações para cada música separadamente. Informe apenas um dos argumentos.
+
+    Args:
+        track_ids: Lista de `id` internos das músicas de referência (retornados pelo librarian).
+        playlist_id: ID Spotify de uma playlist cujas faixas serão usadas como referência.
+
+    Returns:
+        Uma lista de dicionários com as músicas recomendadas (sem as de referência), incluindo capas.
+    """
+    from app.agents.sub_agents.dj.tools import _get_user_from_context
+
+    user, db = _get_user_from_context(tool_context)
+    try:
+        payload = RadioInput(track_ids=track_ids, playlist_id=playlist_id, top_k=10)
+
+        result = await RecommenderService.radio(db, payload, user=user)
+
+        tracks_dict = [t.model_dump() for t in result.recommendations]
 
         tool_context.state["metadata:tracks"] = tracks_dict
 
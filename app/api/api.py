@@ -1,4 +1,5 @@
 from app.api.endpoints import (
+    admin,
     agent,
     auth,
     health,
@@ -28,3 +29,4 @@ api_router.include_router(
     recommendations.router, prefix="/recommendations", tags=["Recommendations"]
 )
 api_router.include_router(player.router, prefix="/player", tags=["Player"])
+api_router.include_router(admin.router, prefix="/admin", tags=["Admin"])
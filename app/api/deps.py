@@ -1,4 +1,6 @@
-from fastapi import Depends, HTTPException, status
+import secrets
+from typing import Optional
+from fastapi import Depends, Header, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from jose import jwt, JWTError
 from sqlalchemy.orm import Session
@@ -43,3 +45,21 @@ def get_current_user(
         raise credentials_exception
 
     return user
+
+
+def require_admin_key(x_admin_key: Optional[str] = Header(None)) -> None:
+    """
+    Protege rotas administrativas com o header X-Admin-Key.
+    Sem ADMIN_API_KEY configurada, as rotas ficam desabilitadas (403).
+    """
+    if not settings.ADMIN_API_KEY or not x_admin_key:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Acesso administrativo não autorizado",
+        )
+    if not secrets.compare_digest(x_admin_key, settings.ADMIN_API_KEY):
+        logger.warning("Tentativa de acesso administrativo com chave inválida")
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Acesso administrativo não autorizado",
+        )
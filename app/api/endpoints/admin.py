@@ -0,0 +1,47 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from app.api import deps
+from app.core.logger import logger
+from app.services.mcp_cache import mcp_cache
+from app.services.mcp_pool import mcp_pool
+from app.services.model_loader import model_status, reload_model
+from app.services.spotify_mcp import SpotifyMCPService
+
+router = APIRouter(dependencies=[Depends(deps.require_admin_key)])
+
+
+@router.get(
+    "/model",
+    summary="Versão ativa do modelo",
+    description="Retorna a versão do modelo em uso neste worker, seu manifest e o estado da última recarga.",
+)
+async def get_model_status():
+    return model_status()
+
+
+@router.post(
+    "/model/reload",
+    status_code=status.HTTP_202_ACCEPTED,
+    summary="Recarrega o modelo",
+    description="Carrega em segundo plano a versão apontada por `versions/CURRENT` e troca o modelo ativo sem interromper as requisições em andamento. Use `force=true` para recarregar mesmo que a versão não tenha mudado.",
+)
+async def reload_active_model(force: bool = Query(False)):
+    logger.info("Recarga do modelo solicitada via API", data={"force": force})
+    if not reload_model(force=force):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Já existe uma recarga do modelo em andamento.",
+        )
+    return {"status": "reloading", **model_status()}
+
+
+@router.get(
+    "/mcp",
+    summary="Estado do MCP",
+    description="Retorna o uso do pool de sessões MCP e as métricas do cache de respostas (acertos, taxa de acerto por ferramenta e invalidações) e das chamadas agrupadas em andamento deste worker.",
+)
+async def get_mcp_status():
+    return {
+        "pool": mcp_pool.stats(),
+        "cache": mcp_cache.stats(),
+        "in_flight": SpotifyMCPService.in_flight_stats(),
+    }
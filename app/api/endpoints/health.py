@@ -1,5 +1,7 @@
 from fastapi import APIRouter
+from fastapi.responses import JSONResponse
 from app.core.logger import logger
+from app.services.warmup import state as warmup_state
 
 router = APIRouter()
 
@@ -12,3 +14,15 @@ router = APIRouter()
 async def health_check():
     logger.debug("Verificação de saúde (Health Check) solicitada")
     return {"status": "ok"}
+
+
+@router.get(
+    "/ready",
+    summary="Verificação de Prontidão",
+    description="Retorna 200 quando o modelo de recomendação e o catálogo de faixas já foram carregados, com o tempo de carga de cada artefato. Enquanto o warm-up não termina (ou se falhar), retorna 503.",
+)
+async def readiness_check():
+    payload = warmup_state.as_dict()
+    if not warmup_state.ready:
+        return JSONResponse(status_code=503, content=payload)
+    return payload
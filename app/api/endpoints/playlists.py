@@ -4,6 +4,7 @@ from app.models.user import User
 from app.schemas.playlists import (
     PlaylistsMCPResponse,
     PlaylistMCPDetailResponse,
+    PlaylistPageMCPResponse,
     CreatePlaylistInput,
     UpdatePlaylistInput,
     AddTracksInput,
@@ -101,6 +102,33 @@ async def get_playlist_details_mcp(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.get(
+    "/{playlist_id}/page",
+    response_model=PlaylistPageMCPResponse,
+    summary="Detalhes e faixas de uma playlist",
+    description="Retorna os detalhes da playlist e uma página de suas faixas em uma única chamada, buscando os dois no MCP em paralelo.",
+)
+async def get_playlist_page_mcp(
+    playlist_id: str,
+    limit: int = 50,
+    offset: int = 0,
+    calculate_duration: bool = False,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Busca detalhes ('getPlaylist') e faixas ('getPlaylistTracks') via MCP.
+    """
+    try:
+        logger.info(f"Buscando página da playlist {playlist_id} via MCP")
+        return await PlaylistsService.get_playlist_page_mcp(
+            current_user, db, playlist_id, limit, offset, calculate_duration
+        )
+    except Exception as e:
+        logger.error(f"Erro ao buscar página da playlist {playlist_id} via MCP: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @router.patch(
     "/{playlist_id}",
     response_model=PlaylistOperationResponse,
@@ -1,7 +1,13 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 from app.api import deps
-from app.schemas.recommendation import AudioFeaturesInput, RecommendationResponse
+from app.schemas.recommendation import (
+    AudioFeaturesInput,
+    BatchRecommendationInput,
+    BatchRecommendationResponse,
+    RadioInput,
+    RecommendationResponse,
+)
 from app.services.recommender import RecommenderService
 
 from app.core.logger import logger
@@ -15,7 +21,7 @@ router = APIRouter()
     "/",
     response_model=RecommendationResponse,
     summary="Recomenda músicas baseadas em características de áudio",
-    description="Retorna uma lista de tracks usando o modelo KNN e filtros de década/popularidade.",
+    description="Retorna até `top_k` tracks usando o modelo KNN e filtros de década/popularidade. Use `next_cursor` em `/recommendations/page` para obter mais resultados da mesma consulta.",
 )
 async def get_recommendations(
     features: AudioFeaturesInput,
@@ -24,16 +30,18 @@ async def get_recommendations(
 ):
     try:
         logger.info("Solicitação de recomendação recebida", data=features.model_dump())
-        results = await RecommenderService.recommend_by_audio_features(
+        result = await RecommenderService.recommend_by_audio_features(
             db, features, user=current_user
         )
-        if not results:
+        if not result.recommendations:
             logger.warning("Nenhuma recomendação encontrada para estes parâmetros")
             raise HTTPException(
                 status_code=404,
                 detail="Nenhuma recomendação encontrada para estes parâmetros.",
             )
-        return {"recommendations": results}
+        return result
+    except HTTPException:
+        raise
     except ValueError as e:
         logger.error(f"Erro de validação nas recomendações: {e}")
         raise HTTPException(status_code=400, detail=str(e))
@@ -42,3 +50,114 @@ async def get_recommendations(
         raise HTTPException(
             status_code=500, detail=f"Erro interno no motor de recomendação: {str(e)}"
         )
+
+
+@router.post(
+    "/batch",
+    response_model=BatchRecommendationResponse,
+    summary="Recomenda músicas para várias consultas de uma vez",
+    description="Recebe N conjuntos de características de áudio e retorna N listas de tracks, resolvidas com uma única busca KNN, uma consulta ao banco e uma busca de capas.",
+)
+async def get_batch_recommendations(
+    payload: BatchRecommendationInput,
+    db: Session = Depends(deps.get_db),
+    current_user: User = Depends(deps.get_current_user),
+):
+    try:
+        logger.info(
+            f"Solicitação de recomendação em lote recebida ({len(payload.items)} consultas)"
+        )
+        results = await RecommenderService.recommend_batch(
+            db, payload.items, user=current_user
+        )
+        return {"results": results}
+    except HTTPException:
+        raise
+    except ValueError as e:
+        logger.error(f"Erro de validação nas recomendações em lote: {e}")
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Erro interno no motor de recomendação: {e}")
+        raise HTTPException(
+            status_code=500, detail=f"Erro interno no motor de recomendação: {str(e)}"
+        )
+
+
+@router.post(
+    "/radio",
+    response_model=RecommendationResponse,
+    summary="Rádio a partir de várias músicas",
+    description="Recebe uma lista de IDs internos de faixas ou o ID de uma playlist do Spotify e retorna até `top_k` tracks parecidas com o conjunto, sem repetir as faixas de referência. As sementes são resumidas no centroide ou em até `n_medoids` medoides e resolvidas com uma única busca KNN.",
+)
+async def get_radio_recommendations(
+    payload: RadioInput,
+    db: Session = Depends(deps.get_db),
+    current_user: User = Depends(deps.get_current_user),
+):
+    try:
+        logger.info("Solicitação de rádio recebida", data=payload.model_dump())
+        result = await RecommenderService.radio(db, payload, user=current_user)
+        if not result.recommendations:
+            raise HTTPException(
+                status_code=404,
+                detail="Nenhuma recomendação encontrada para estas faixas.",
+            )
+        return result
+    except HTTPException:
+        raise
+    except ValueError as e:
+        logger.error(f"Erro de validação na rádio: {e}")
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Erro interno no motor de recomendação: {e}")
+        raise HTTPException(
+            status_code=500, detail=f"Erro interno no motor de recomendação: {str(e)}"
+        )
+
+
+@router.get(
+    "/similar/{track_id}",
+    response_model=RecommendationResponse,
+    summary="Músicas parecidas com uma faixa",
+    description="Retorna até `top_k` tracks similares à faixa informada (sem incluí-la), a partir da tabela de vizinhos pré-calculada do modelo. Faixas fora da tabela são resolvidas com busca KNN. Use `next_cursor` em `/recommendations/page` para mais resultados.",
+)
+async def get_similar_tracks(
+    track_id: int,
+    top_k: int = Query(20, ge=1, le=50),
+    db: Session = Depends(deps.get_db),
+    current_user: User = Depends(deps.get_current_user),
+):
+    try:
+        return await RecommenderService.similar_tracks(
+            db, track_id, top_k, user=current_user
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Erro interno no motor de recomendação: {e}")
+        raise HTTPException(
+            status_code=500, detail=f"Erro interno no motor de recomendação: {str(e)}"
+        )
+
+
+@router.get(
+    "/page",
+    response_model=RecommendationResponse,
+    summary="Próxima página de uma recomendação",
+    description="Retorna mais resultados de uma recomendação anterior a partir do `next_cursor`, usando a lista de vizinhos em cache (sem nova busca KNN).",
+)
+async def get_recommendations_page(
+    cursor: str,
+    limit: int = Query(20, ge=1, le=50),
+    db: Session = Depends(deps.get_db),
+    current_user: User = Depends(deps.get_current_user),
+):
+    try:
+        return await RecommenderService.get_page(db, cursor, limit, user=current_user)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Erro interno no motor de recomendação: {e}")
+        raise HTTPException(
+            status_code=500, detail=f"Erro interno no motor de recomendação: {str(e)}"
+        )
@@ -3,9 +3,11 @@ from sqlalchemy.orm import Session
 from typing import List
 from app.api import deps
 from app.schemas.tracks import (
+    TrackImagesStatusResponse,
     TrackResponse,
     PlaylistTracksMCPResponse,
 )
+from app.services.image_enrichment import image_enrichment
 from app.services.tracks import TracksService
 from app.models.user import User
 
@@ -59,6 +61,26 @@ async def search_tracks(
     return await TracksService.search_tracks_fuzzy(current_user, db, q, limit, offset)
 
 
+@router.get(
+    "/images",
+    response_model=TrackImagesStatusResponse,
+    summary="Capas das faixas",
+    description="Retorna as capas já disponíveis em cache para os spotify_ids informados. Com TRACK_IMAGES_ASYNC, as ausentes são buscadas em segundo plano e listadas em `pending`; consulte novamente para obtê-las. Sem ele, são buscadas na hora.",
+)
+async def get_track_images(
+    ids: List[str] = Query(..., min_length=1, max_length=100),
+    db: Session = Depends(deps.get_db),
+    current_user: User = Depends(deps.get_current_user),
+):
+    images = await TracksService.get_track_images(current_user, db, ids, wait=False)
+    pending = [
+        spotify_id
+        for spotify_id in dict.fromkeys(ids)
+        if spotify_id not in images and image_enrichment.is_pending(spotify_id)
+    ]
+    return TrackImagesStatusResponse(images=images, pending=pending)
+
+
 # @router.post("/filter", response_model=List[TrackResponse])
 # async def filter_tracks(
 #     filters: TrackFeaturesInput, limit: int = 20, db: Session = Depends(deps.get_db)
@@ -1,3 +1,6 @@
+from typing import Optional
+
+from pydantic import Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -21,11 +24,69 @@ class Settings(BaseSettings):
     REFRESH_TOKEN_EXPIRE_MINUTES: int
 
     MCP_SERVER_URL: str
+    # Pool de sessões MCP reutilizadas entre chamadas
+    MCP_POOL_SIZE: int = 4
+    MCP_POOL_PING_INTERVAL: int = 30
+    MCP_POOL_ACQUIRE_TIMEOUT: int = 30
+    # Cache das ferramentas MCP somente leitura (TTLs em mcp_cache.CACHED_TOOLS)
+    MCP_CACHE_ENABLED: bool = True
+    MCP_CACHE_SIZE: int = 5000
 
     GOOGLE_API_KEY: str
 
     MODEL: str
 
+    # Rotas administrativas (header X-Admin-Key); desabilitadas sem chave
+    ADMIN_API_KEY: Optional[str] = None
+    # Recarrega o modelo quando versions/CURRENT muda
+    MODEL_WATCH_ENABLED: bool = False
+    # Carrega modelo e catálogo na inicialização (/health/ready)
+    MODEL_WARMUP_ENABLED: bool = True
+    # Usa a matriz exportada (matrix.npy) com mmap em vez do joblib, se existir
+    MODEL_MMAP_ENABLED: bool = True
+    # Recalcula o sha256 da matriz a cada carga (por padrão só confere o tamanho)
+    MODEL_VERIFY_CHECKSUM: bool = False
+
+    # Pool de execução do recomendador (CPU + consultas síncronas)
+    RECOMMENDER_MAX_WORKERS: int = 4
+    RECOMMENDER_MAX_QUEUE: int = 16
+
+    # Backend de busca de vizinhos: "sklearn", "brute" ou "hnsw"
+    RECOMMENDER_INDEX_BACKEND: str = "sklearn"
+    HNSW_EF_SEARCH: int = 64
+    # Intervalo (s) entre verificações de mudança na tabela tracks/modelo
+    TRACK_CATALOG_CHECK_INTERVAL: int = 60
+
+    # Profundidade da lista de vizinhos e paginação por cursor
+    RECOMMENDER_MAX_RESULTS: int = 60
+    RECOMMENDER_CURSOR_TTL: int = 600
+    RECOMMENDER_CURSOR_CACHE_SIZE: int = 1000
+
+    # Cache de resultados por vetor de features quantizado
+    RECOMMENDER_CACHE_SIZE: int = 2048
+    RECOMMENDER_CACHE_TTL: int = 3600
+    RECOMMENDER_CACHE_QUANTUM: float = Field(0.01, gt=0)
+
+    # Re-ranking por preferências do usuário
+    RECOMMENDER_OVERFETCH: int = 3
+    RECOMMENDER_SKIP_PENALTY: float = 0.25
+    RECOMMENDER_LIKE_BONUS: float = 0.1
+    USER_SIGNALS_TTL: int = 300
+
+    # Diversidade (MMR, 0 desliga) e limite de faixas por artista (0 = sem limite)
+    RECOMMENDER_MMR_DIVERSITY: float = 0.0
+    RECOMMENDER_MAX_PER_ARTIST: int = 0
+    # Só os RECOMMENDER_MMR_POOL_FACTOR * k candidatos mais relevantes entram no MMR (0 = todos)
+    RECOMMENDER_MMR_POOL_FACTOR: int = 3
+
+    # Cache de capas (getTrackImages): LRU em memória + tabela track_images
+    TRACK_IMAGES_CACHE_SIZE: int = 50000
+    TRACK_IMAGES_TTL: int = 30 * 24 * 3600
+    TRACK_IMAGES_BATCH_SIZE: int = 50
+    # Responde sem esperar o MCP; capas ausentes são buscadas em segundo plano
+    TRACK_IMAGES_ASYNC: bool = False
+    TRACK_IMAGES_QUEUE_SIZE: int = 1000
+
     model_config = SettingsConfigDict(
         env_file=".env", env_file_encoding="utf-8", case_sensitive=True
     )
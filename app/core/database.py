@@ -1,3 +1,5 @@
+from typing import Callable, TypeVar
+
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 
@@ -7,6 +9,8 @@ engine = create_engine(settings.DATABASE_URL)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+T = TypeVar("T")
+
 
 def get_db():
     """
@@ -18,3 +22,16 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+def with_session(fn: Callable[..., T], *args, **kwargs) -> T:
+    """
+    Executa `fn(db, *args, **kwargs)` com uma sessão própria, fechada ao
+    final. Para trabalho enviado a threads (ex.: recommender_pool), que pode
+    terminar depois que a sessão da requisição já foi fechada.
+    """
+    db = SessionLocal()
+    try:
+        return fn(db, *args, **kwargs)
+    finally:
+        db.close()
@@ -0,0 +1,91 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+from fastapi import HTTPException
+
+from app.core.config import settings
+from app.core.logger import logger
+
+
+class BoundedExecutor:
+    """
+    Pool de threads com limite de fila para tirar trabalho síncrono do event loop.
+
+    Quando o número de tarefas em execução + aguardando ultrapassa
+    `max_workers + max_queue`, novas submissões são rejeitadas com 503
+    em vez de acumular latência para as demais rotas.
+    """
+
+    def __init__(self, name: str, max_workers: int, max_queue: int):
+        self.name = name
+        self.max_workers = max(1, max_workers)
+        self.max_queue = max(0, max_queue)
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._pending = 0
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    @property
+    def capacity(self) -> int:
+        return self.max_workers + self.max_queue
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers, thread_name_prefix=self.name
+            )
+        return self._executor
+
+    async def run(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        Executa `fn` em uma thread do pool e aguarda o resultado.
+
+        A vaga só é liberada quando a thread termina (callback do future), não
+        quando quem aguardava é cancelado: um cancelamento não interrompe a
+        função que já está rodando. O contador é manipulado apenas no event
+        loop, então não precisa de lock.
+        """
+        if self._pending >= self.capacity:
+            logger.warning(
+                f"Pool '{self.name}' saturado ({self._pending}/{self.capacity}). Rejeitando requisição."
+            )
+            raise HTTPException(
+                status_code=503,
+                detail="Serviço temporariamente sobrecarregado. Tente novamente em instantes.",
+            )
+
+        loop = asyncio.get_running_loop()
+        self._pending += 1
+        try:
+            future = self._get_executor().submit(fn, *args, **kwargs)
+        except BaseException:
+            self._pending -= 1
+            raise
+        future.add_done_callback(lambda _: self._release(loop))
+        return await asyncio.wrap_future(future, loop=loop)
+
+    def _release(self, loop: asyncio.AbstractEventLoop) -> None:
+        """Chamado na thread que concluiu o future; devolve a vaga no event loop."""
+        try:
+            loop.call_soon_threadsafe(self._decrement)
+        except RuntimeError:  # event loop já encerrado
+            pass
+
+    def _decrement(self) -> None:
+        self._pending -= 1
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+# Pool do recomendador (busca, hidratação e consultas síncronas ao banco)
+recommender_pool = BoundedExecutor(
+    "recommender",
+    max_workers=settings.RECOMMENDER_MAX_WORKERS,
+    max_queue=settings.RECOMMENDER_MAX_QUEUE,
+)
@@ -0,0 +1,32 @@
+import time
+from contextlib import contextmanager
+
+
+class StageTimer:
+    """
+    Acumula o tempo (em ms) de cada etapa de um fluxo.
+
+    Uso:
+        timer = StageTimer()
+        with timer.stage("search"):
+            ...
+        timer.as_dict()  # {"search": 1.23, "total": 1.30}
+    """
+
+    def __init__(self):
+        self._start = time.perf_counter()
+        self._stages: dict[str, float] = {}
+
+    @contextmanager
+    def stage(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = (time.perf_counter() - start) * 1000
+            self._stages[name] = self._stages.get(name, 0.0) + elapsed
+
+    def as_dict(self) -> dict[str, float]:
+        timings = {name: round(ms, 2) for name, ms in self._stages.items()}
+        timings["total"] = round((time.perf_counter() - self._start) * 1000, 2)
+        return timings
@@ -1,15 +1,33 @@
+import asyncio
 from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from app.core.logger import setup_logging
 from fastapi.middleware.cors import CORSMiddleware
 from app.core.config import settings
 from app.api.api import api_router
+from app.services.image_enrichment import image_enrichment
+from app.services.mcp_pool import mcp_pool
+from app.services.model_loader import model_watcher
+from app.services.recommender import recommender_pool
+from app.services.warmup import warm_up
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     setup_logging()
+    # Warm-up em segundo plano: o servidor sobe, mas /health/ready só
+    # responde 200 quando modelo e catálogo estiverem carregados
+    warmup_task = asyncio.create_task(warm_up())
+    if settings.MODEL_WATCH_ENABLED:
+        model_watcher.start()
+    if settings.TRACK_IMAGES_ASYNC:
+        image_enrichment.start()
     yield
+    warmup_task.cancel()
+    await image_enrichment.stop()
+    await mcp_pool.close()
+    model_watcher.stop()
+    recommender_pool.shutdown()
 
 
 app = FastAPI(
@@ -0,0 +1,23 @@
+from datetime import datetime, timezone
+
+from sqlalchemy import DateTime, String, func
+from sqlalchemy.orm import Mapped, mapped_column
+from .base import Base
+
+
+class TrackImage(Base):
+    """Cache persistente da URL de capa de cada faixa (resposta do getTrackImages)"""
+
+    __tablename__ = "track_images"
+
+    spotify_id: Mapped[str] = mapped_column(String, primary_key=True)
+    # None = o Spotify não retornou capa para a faixa
+    image_url: Mapped[str | None] = mapped_column(String, nullable=True)
+    # Início da validade (TRACK_IMAGES_TTL); renovado a cada gravação
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        default=lambda: datetime.now(timezone.utc),
+        onupdate=lambda: datetime.now(timezone.utc),
+        server_default=func.now(),
+        nullable=False,
+    )
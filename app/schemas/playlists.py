@@ -1,4 +1,5 @@
 from app.schemas.spotify import SpotifyPlaylistsResponse
+from app.schemas.tracks import PlaylistTracksMCPResponse
 from pydantic import BaseModel
 from typing import List, Optional
 
@@ -28,6 +29,13 @@ class PlaylistMCPDetailResponse(BaseModel):
     json: Optional[PlaylistRawSchema] = None
 
 
+class PlaylistPageMCPResponse(BaseModel):
+    """Detalhes e primeira página de faixas de uma playlist."""
+
+    playlist: PlaylistMCPDetailResponse
+    tracks: Optional[PlaylistTracksMCPResponse] = None
+
+
 # --- Schemas para operações de playlist via MCP ---
 
 
@@ -1,7 +1,32 @@
-from typing import List, Optional
+from typing import Annotated, List, Literal, Optional
 
 from app.schemas.tracks import TrackResponse
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_validator
+
+
+DECADE_PATTERN = "^(1920|1930|1940|1950|1960|1970|1980|1990|2000|2010|2020)$"
+
+
+class RecommendationFilters(BaseModel):
+    """
+    Restrições obrigatórias aplicadas durante a busca (None = sem restrição).
+    Diferente de `decade`/`explicit`/`is_popular` de AudioFeaturesInput, que
+    apenas aproximam o resultado, aqui faixas fora do filtro nunca aparecem.
+    """
+
+    decades: Optional[List[Annotated[str, Field(pattern=DECADE_PATTERN)]]] = Field(
+        None, min_length=1
+    )
+    explicit: Optional[bool] = None
+    is_popular: Optional[bool] = None
+
+    @property
+    def is_empty(self) -> bool:
+        return not self.decades and self.explicit is None and self.is_popular is None
+
+    def cache_key(self) -> tuple:
+        decades = tuple(sorted(set(self.decades))) if self.decades else None
+        return (decades, self.explicit, self.is_popular)
 
 
 class AudioFeaturesInput(BaseModel):
@@ -11,10 +36,40 @@ class AudioFeaturesInput(BaseModel):
     acousticness: float = Field(...)
     is_popular: bool = False
     explicit: bool = False
-    decade: Optional[str] = Field(
-        None, pattern="^(1920|1930|1940|1950|1960|1970|1980|1990|2000|2010|2020)$"
-    )
+    decade: Optional[str] = Field(None, pattern=DECADE_PATTERN)
+    top_k: int = Field(20, ge=1, le=50)
+    # Diversidade (MMR) e limite por artista; None usa os padrões do servidor
+    diversity: Optional[float] = Field(None, ge=0, le=1)
+    max_per_artist: Optional[int] = Field(None, ge=0, le=50)
+    filters: Optional[RecommendationFilters] = None
 
 
 class RecommendationResponse(BaseModel):
     recommendations: List[TrackResponse]
+    next_cursor: Optional[str] = None
+
+
+class BatchRecommendationInput(BaseModel):
+    items: List[AudioFeaturesInput] = Field(..., min_length=1, max_length=20)
+
+
+class BatchRecommendationResponse(BaseModel):
+    results: List[RecommendationResponse]
+
+
+class RadioInput(BaseModel):
+    """Sementes de uma rádio: IDs internos de faixas ou uma playlist do Spotify."""
+
+    track_ids: Optional[List[int]] = Field(None, min_length=1, max_length=50)
+    playlist_id: Optional[str] = None
+    strategy: Literal["centroid", "medoids"] = "medoids"
+    n_medoids: int = Field(3, ge=1, le=10)
+    top_k: int = Field(20, ge=1, le=50)
+    diversity: Optional[float] = Field(None, ge=0, le=1)
+    max_per_artist: Optional[int] = Field(None, ge=0, le=50)
+
+    @model_validator(mode="after")
+    def check_seeds(self):
+        if bool(self.track_ids) == bool(self.playlist_id):
+            raise ValueError("Informe exatamente um entre track_ids e playlist_id.")
+        return self
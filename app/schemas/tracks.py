@@ -22,6 +22,13 @@ class TrackImagesMCPResponse(BaseModel):
     json: Optional[TrackImagesResponse] = None
 
 
+class TrackImagesStatusResponse(BaseModel):
+    """Capas já disponíveis e faixas cuja capa ainda está sendo buscada."""
+
+    images: dict[str, Optional[str]]
+    pending: list[str]
+
+
 class TrackResponse(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
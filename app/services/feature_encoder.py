@@ -0,0 +1,95 @@
+from typing import Optional, Sequence
+
+import numpy as np
+
+from app.schemas.recommendation import AudioFeaturesInput
+
+DECADES = tuple(str(d) for d in range(1920, 2030, 10))
+
+
+class QueryEncoder:
+    """
+    Converte AudioFeaturesInput na linha numérica esperada pelo modelo KNN.
+
+    O layout de colunas é resolvido uma única vez a partir da lista de features
+    do modelo; a normalização usa diretamente a média e a escala do
+    StandardScaler, sem passar por DataFrames.
+    """
+
+    def __init__(
+        self,
+        columns: Sequence[str],
+        scaled_columns: Sequence[str],
+        mean: Optional[Sequence[float]],
+        scale: Optional[Sequence[float]],
+    ):
+        self.columns = list(columns)
+        self.dim = len(self.columns)
+        positions = {name: i for i, name in enumerate(self.columns)}
+
+        self.scaled_columns = list(scaled_columns)
+        self._scaled_pos = np.array(
+            [positions[name] for name in self.scaled_columns], dtype=np.intp
+        )
+        n_scaled = len(self.scaled_columns)
+        self._mean = (
+            np.zeros(n_scaled)
+            if mean is None
+            else np.asarray(mean, dtype=np.float64)
+        )
+        self._scale = (
+            np.ones(n_scaled)
+            if scale is None
+            else np.asarray(scale, dtype=np.float64)
+        )
+
+        self._popular_pos = positions.get("is_popular")
+        self._explicit_pos = positions.get("explicit")
+        self._decade_pos = {
+            decade: positions[f"{decade}s"]
+            for decade in DECADES
+            if f"{decade}s" in positions
+        }
+
+    @classmethod
+    def from_scaler(cls, scaler, columns: Sequence[str]) -> "QueryEncoder":
+        """Cria o encoder a partir de um StandardScaler já treinado."""
+        scaled_columns = list(getattr(scaler, "feature_names_in_", []))
+        if not scaled_columns:
+            scaled_columns = ["acousticness", "danceability", "energy", "valence"]
+
+        return cls(
+            columns=columns,
+            scaled_columns=scaled_columns,
+            mean=scaler.mean_ if getattr(scaler, "with_mean", True) else None,
+            scale=scaler.scale_ if getattr(scaler, "with_std", True) else None,
+        )
+
+    def encode(self, features: AudioFeaturesInput) -> np.ndarray:
+        """Retorna uma matriz float32 de shape (1, dim)."""
+        return self.encode_batch([features])
+
+    def encode_batch(self, items: Sequence[AudioFeaturesInput]) -> np.ndarray:
+        """Retorna uma matriz float32 de shape (len(items), dim)."""
+        n = len(items)
+        out = np.zeros((n, self.dim), dtype=np.float32)
+        if n == 0:
+            return out
+
+        raw = np.array(
+            [[getattr(f, name) for name in self.scaled_columns] for f in items],
+            dtype=np.float64,
+        )
+        out[:, self._scaled_pos] = (raw - self._mean) / self._scale
+
+        if self._popular_pos is not None:
+            out[:, self._popular_pos] = [f.is_popular for f in items]
+        if self._explicit_pos is not None:
+            out[:, self._explicit_pos] = [f.explicit for f in items]
+
+        for row, f in enumerate(items):
+            pos = self._decade_pos.get(f.decade) if f.decade else None
+            if pos is not None:
+                out[row, pos] = 1.0
+
+        return out
@@ -0,0 +1,101 @@
+import os
+import threading
+from typing import Optional
+
+import numpy as np
+
+from app.core.logger import logger
+from app.schemas.recommendation import RecommendationFilters
+from app.services.feature_encoder import DECADES
+from app.services.knn_index import PartitionedIndex
+from app.services.model_loader import ModelBundle
+from app.services.track_catalog import TrackCatalog
+
+# bucket = código da década (0 = sem década, 1..11) * 4 + explicit * 2 + is_popular
+DECADE_CODES = {int(decade): code for code, decade in enumerate(DECADES, start=1)}
+N_BUCKETS = (len(DECADES) + 1) * 4
+
+
+def bucket_ids(catalog: TrackCatalog, size: int) -> np.ndarray:
+    """Bucket de cada uma das `size` primeiras linhas do catálogo."""
+    decades = np.asarray(catalog.columns["decade"][:size])
+    codes = np.zeros(size, dtype=np.int64)
+    for decade, code in DECADE_CODES.items():
+        codes[decades == decade] = code
+    explicit = np.asarray(catalog.columns["explicit"][:size], dtype=np.int64)
+    popular = np.asarray(catalog.columns["is_popular"][:size], dtype=np.int64)
+    return codes * 4 + explicit * 2 + popular
+
+
+def allowed_buckets(filters: RecommendationFilters) -> np.ndarray:
+    """Máscara booleana dos buckets que satisfazem os filtros."""
+    buckets = np.arange(N_BUCKETS)
+    codes, explicit, popular = buckets // 4, (buckets // 2) % 2, buckets % 2
+
+    allowed = np.ones(N_BUCKETS, dtype=bool)
+    if filters.decades:
+        allowed &= np.isin(codes, [DECADE_CODES[int(d)] for d in filters.decades])
+    if filters.explicit is not None:
+        allowed &= explicit == int(filters.explicit)
+    if filters.is_popular is not None:
+        allowed &= popular == int(filters.is_popular)
+    return allowed
+
+
+PARTITIONED_DIR = "partitioned"
+
+
+class FilteredIndexStore:
+    """
+    Mantém o índice particionado da combinação atual de modelo e catálogo.
+    A versão do catálogo já inclui a do modelo, então o índice é gravado no
+    diretório do catálogo (`partitioned/`) e reaberto com mmap pelos demais
+    workers. O warm-up o prepara antes da primeira busca filtrada.
+    """
+
+    def __init__(self):
+        self._key: Optional[tuple[str, str]] = None
+        self._index: Optional[PartitionedIndex] = None
+        self._lock = threading.Lock()
+
+    def get(self, bundle: ModelBundle, catalog: TrackCatalog) -> PartitionedIndex:
+        key = (bundle.version, catalog.version)
+        if self._key == key and self._index is not None:
+            return self._index
+
+        with self._lock:
+            if self._key != key or self._index is None:
+                self._index, self._key = self._open_or_build(bundle, catalog), key
+            return self._index
+
+    @staticmethod
+    def _open_or_build(bundle: ModelBundle, catalog: TrackCatalog) -> PartitionedIndex:
+        size = min(bundle.index.size, len(catalog))
+        metric = bundle.index.metric
+        directory = (
+            os.path.join(catalog.directory, PARTITIONED_DIR) if catalog.directory else None
+        )
+        if directory and os.path.isdir(directory):
+            index = PartitionedIndex.load(directory, metric)
+            if index.size == size:
+                return index
+
+        index = PartitionedIndex.build(
+            bundle.index.vectors(slice(0, size)),
+            bucket_ids(catalog, size),
+            N_BUCKETS,
+            metric=metric,
+            directory=directory,
+        )
+        logger.info(
+            f"Índice particionado por década/explicit/popularidade criado "
+            f"({size} faixas, {int((np.diff(index.offsets) > 0).sum())} buckets)."
+        )
+        return index
+
+
+_store = FilteredIndexStore()
+
+
+def get_filtered_index(bundle: ModelBundle, catalog: TrackCatalog) -> PartitionedIndex:
+    return _store.get(bundle, catalog)
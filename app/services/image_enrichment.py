@@ -0,0 +1,94 @@
+import asyncio
+from typing import Optional
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.executor import recommender_pool
+from app.core.logger import logger
+from app.models.user import User
+
+
+class ImageEnrichmentWorker:
+    """
+    Busca em segundo plano as capas que não estavam no cache quando a
+    resposta foi montada (TRACK_IMAGES_ASYNC). Cada pedido guarda o usuário
+    (para o token do Spotify) e os spotify_ids; ids já enfileirados ou em
+    andamento não são enfileirados de novo. As capas obtidas vão para o LRU
+    e para track_images, de onde o cliente as lê em GET /tracks/images.
+    """
+
+    def __init__(self):
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._pending: set[str] = set()
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        if self.running:
+            return
+        self._queue = asyncio.Queue(maxsize=settings.TRACK_IMAGES_QUEUE_SIZE)
+        self._task = asyncio.create_task(self._run())
+        logger.info("Worker de enriquecimento de capas iniciado.")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        self._pending.clear()
+
+    def is_pending(self, spotify_id: str) -> bool:
+        return spotify_id in self._pending
+
+    def enqueue(self, user_id: int, spotify_ids: list[str]) -> None:
+        """Agenda a busca das capas; com a fila cheia, o pedido é descartado."""
+        if not self.running:
+            return
+        ids = [spotify_id for spotify_id in spotify_ids if spotify_id not in self._pending]
+        if not ids:
+            return
+        try:
+            self._queue.put_nowait((user_id, ids))
+        except asyncio.QueueFull:
+            logger.warning(
+                f"Fila de capas cheia ({self._queue.maxsize}). {len(ids)} faixas ficam sem imagem."
+            )
+            return
+        self._pending.update(ids)
+
+    async def _run(self) -> None:
+        while True:
+            user_id, ids = await self._queue.get()
+            try:
+                await self._enrich(user_id, ids)
+            except Exception as e:
+                logger.warning(f"Falha ao enriquecer capas em segundo plano: {e}")
+            finally:
+                self._pending.difference_update(ids)
+                self._queue.task_done()
+
+    @staticmethod
+    async def _enrich(user_id: int, ids: list[str]) -> None:
+        from app.services.tracks import TracksService
+
+        db = SessionLocal()
+        try:
+            user = await recommender_pool.run(db.get, User, user_id)
+            if user is None:
+                return
+            fetched = await TracksService._fetch_track_images(user, db, ids)
+            if fetched:
+                await TracksService.store_images(fetched)
+                logger.info(f"{len(fetched)} capas obtidas em segundo plano.")
+        finally:
+            db.close()
+
+
+image_enrichment = ImageEnrichmentWorker()
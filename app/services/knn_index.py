@@ -0,0 +1,426 @@
+import os
+import shutil
+import tempfile
+from typing import Optional
+
+import numpy as np
+
+try:
+    import hnswlib
+except ImportError:  # hnswlib é opcional; só o backend "hnsw" depende dele
+    hnswlib = None
+
+SUPPORTED_METRICS = ("euclidean", "cosine")
+
+
+def _prepare_matrix(matrix: np.ndarray, metric: str) -> np.ndarray:
+    """
+    Converte a matriz para float32 contíguo. Para cosseno, normaliza as linhas
+    para que a busca euclidiana preserve a ordem da similaridade.
+
+    Matrizes que já estão nesse formato (ex.: mapeadas com mmap) são
+    devolvidas sem cópia.
+    """
+    if metric not in SUPPORTED_METRICS:
+        raise ValueError(
+            f"Métrica '{metric}' não suportada. Use uma de {SUPPORTED_METRICS}."
+        )
+    data = np.ascontiguousarray(matrix, dtype=np.float32)
+    if metric == "cosine":
+        norms = np.linalg.norm(data, axis=1, keepdims=True)
+        if not np.allclose(norms, 1.0, atol=1e-5):
+            data = data / np.maximum(norms, 1e-12)
+    return data
+
+
+def _to_metric_distance(sq_dist: np.ndarray, metric: str) -> np.ndarray:
+    """Converte distância euclidiana ao quadrado na distância da métrica original."""
+    sq_dist = np.maximum(sq_dist, 0.0)
+    if metric == "cosine":
+        return sq_dist / 2.0
+    return np.sqrt(sq_dist)
+
+
+class NeighborIndex:
+    """
+    Interface comum dos backends de busca de vizinhos.
+
+    `search` recebe uma matriz (n_queries, dim) e retorna as tuplas
+    (distances, indices), ambas com shape (n_queries, k), no mesmo formato
+    de `NearestNeighbors.kneighbors`.
+    """
+
+    name = "base"
+
+    @property
+    def size(self) -> int:
+        raise NotImplementedError
+
+    def search(self, queries: np.ndarray, k: int) -> tuple[np.ndarray, np.ndarray]:
+        raise NotImplementedError
+
+    def vectors(self, rows) -> np.ndarray:
+        """Vetores indexados das linhas `rows`, prontos para usar como consulta."""
+        raise NotImplementedError
+
+
+class SklearnIndex(NeighborIndex):
+    """Busca exata delegada ao modelo NearestNeighbors treinado."""
+
+    name = "sklearn"
+
+    def __init__(self, model):
+        self.model = model
+
+    @property
+    def metric(self) -> str:
+        return self.model.effective_metric_
+
+    @property
+    def size(self) -> int:
+        return int(self.model.n_samples_fit_)
+
+    def search(self, queries: np.ndarray, k: int) -> tuple[np.ndarray, np.ndarray]:
+        k = min(k, self.size)
+        return self.model.kneighbors(queries, n_neighbors=k)
+
+    def vectors(self, rows) -> np.ndarray:
+        return np.asarray(self.model._fit_X[rows])
+
+
+class BruteForceIndex(NeighborIndex):
+    """
+    Varredura exata em NumPy sobre uma matriz float32 contígua.
+
+    Usa ||x||² - 2·x·q + ||q||² com as normas do catálogo pré-calculadas,
+    processando as consultas em blocos para limitar a memória temporária.
+    """
+
+    name = "brute"
+
+    def __init__(
+        self,
+        matrix: np.ndarray,
+        metric: str = "euclidean",
+        block_size: int = 64,
+        sq_norms: Optional[np.ndarray] = None,
+    ):
+        self.metric = metric
+        self.block_size = block_size
+        self.data = _prepare_matrix(matrix, metric)
+        if sq_norms is None:
+            sq_norms = np.einsum("ij,ij->i", self.data, self.data)
+        self._sq_norms = sq_norms
+
+    @property
+    def size(self) -> int:
+        return self.data.shape[0]
+
+    def vectors(self, rows) -> np.ndarray:
+        return np.asarray(self.data[rows])
+
+    def search(self, queries: np.ndarray, k: int) -> tuple[np.ndarray, np.ndarray]:
+        queries = _prepare_matrix(np.atleast_2d(queries), self.metric)
+        k = min(k, self.size)
+        n_queries = queries.shape[0]
+        distances = np.empty((n_queries, k), dtype=np.float32)
+        indices = np.empty((n_queries, k), dtype=np.intp)
+
+        for start in range(0, n_queries, self.block_size):
+            block = queries[start : start + self.block_size]
+            sq = (
+                self._sq_norms[None, :]
+                - 2.0 * (block @ self.data.T)
+                + np.einsum("ij,ij->i", block, block)[:, None]
+            )
+            if k < self.size:
+                top = np.argpartition(sq, k - 1, axis=1)[:, :k]
+            else:
+                top = np.broadcast_to(np.arange(self.size), sq.shape).copy()
+            top_sq = np.take_along_axis(sq, top, axis=1)
+            order = np.argsort(top_sq, axis=1)
+
+            end = start + block.shape[0]
+            indices[start:end] = np.take_along_axis(top, order, axis=1)
+            distances[start:end] = _to_metric_distance(
+                np.take_along_axis(top_sq, order, axis=1), self.metric
+            )
+
+        return distances, indices
+
+
+class PartitionedIndex:
+    """
+    Busca exata restrita a partições (buckets) do catálogo.
+
+    As linhas são reordenadas por bucket em uma matriz float32 contígua, com
+    os offsets de cada bucket. Uma consulta filtrada varre apenas as fatias
+    dos buckets permitidos, sem percorrer nem sobre-buscar o catálogo todo,
+    e devolve as linhas originais do índice.
+
+    Com `directory`, a matriz reordenada é gravada em disco (em blocos, sem
+    copiar a matriz inteira para a memória) e aberta com mmap, como a matriz
+    do modelo, para que os workers compartilhem as mesmas páginas.
+    """
+
+    name = "partitioned"
+    FILES = ("data", "rows", "offsets", "sq_norms")
+    CHUNK_ROWS = 65536
+
+    def __init__(
+        self,
+        data: np.ndarray,
+        rows: np.ndarray,
+        offsets: np.ndarray,
+        sq_norms: np.ndarray,
+        metric: str = "euclidean",
+    ):
+        self.metric = metric
+        self.data = data
+        self.rows = rows
+        self.offsets = offsets
+        self.n_buckets = len(offsets) - 1
+        self._sq_norms = sq_norms
+
+    @classmethod
+    def build(
+        cls,
+        matrix: np.ndarray,
+        buckets: np.ndarray,
+        n_buckets: int,
+        metric: str = "euclidean",
+        directory: Optional[str] = None,
+    ) -> "PartitionedIndex":
+        order = np.argsort(buckets, kind="stable").astype(np.intp)
+        offsets = np.zeros(n_buckets + 1, dtype=np.int64)
+        np.cumsum(np.bincount(buckets, minlength=n_buckets), out=offsets[1:])
+
+        if directory is None:
+            data = _prepare_matrix(np.asarray(matrix)[order], metric)
+            sq_norms = np.einsum("ij,ij->i", data, data)
+            return cls(data, order, offsets, sq_norms, metric=metric)
+
+        parent = os.path.dirname(directory) or "."
+        tmp_dir = tempfile.mkdtemp(prefix=f".{os.path.basename(directory)}-", dir=parent)
+        try:
+            data = np.lib.format.open_memmap(
+                os.path.join(tmp_dir, "data.npy"),
+                mode="w+",
+                dtype=np.float32,
+                shape=(len(order), matrix.shape[1]),
+            )
+            sq_norms = np.empty(len(order), dtype=np.float32)
+            for start in range(0, len(order), cls.CHUNK_ROWS):
+                chunk = slice(start, start + cls.CHUNK_ROWS)
+                block = _prepare_matrix(np.asarray(matrix[order[chunk]]), metric)
+                data[chunk] = block
+                sq_norms[chunk] = np.einsum("ij,ij->i", block, block)
+            data.flush()
+            del data
+            np.save(os.path.join(tmp_dir, "rows.npy"), order)
+            np.save(os.path.join(tmp_dir, "offsets.npy"), offsets)
+            np.save(os.path.join(tmp_dir, "sq_norms.npy"), sq_norms)
+            os.rename(tmp_dir, directory)
+        except OSError:
+            # Outro worker gravou o mesmo índice primeiro
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            if not os.path.isdir(directory):
+                raise
+        return cls.load(directory, metric)
+
+    @classmethod
+    def load(cls, directory: str, metric: str = "euclidean") -> "PartitionedIndex":
+        arrays = {
+            name: np.load(os.path.join(directory, f"{name}.npy"), mmap_mode="r")
+            for name in cls.FILES
+        }
+        return cls(**arrays, metric=metric)
+
+    @property
+    def size(self) -> int:
+        return self.data.shape[0]
+
+    def ranges(self, allowed: np.ndarray) -> list[tuple[int, int]]:
+        """Fatias [início, fim) dos buckets permitidos, unindo buckets vizinhos."""
+        ranges: list[tuple[int, int]] = []
+        for bucket in np.flatnonzero(allowed):
+            start, end = int(self.offsets[bucket]), int(self.offsets[bucket + 1])
+            if start == end:
+                continue
+            if ranges and ranges[-1][1] == start:
+                ranges[-1] = (ranges[-1][0], end)
+            else:
+                ranges.append((start, end))
+        return ranges
+
+    def search(
+        self, queries: np.ndarray, k: int, allowed: np.ndarray
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Busca os `k` vizinhos exatos entre as linhas dos buckets marcados em
+        `allowed` (máscara booleana de tamanho n_buckets).
+        """
+        queries = _prepare_matrix(np.atleast_2d(queries), self.metric)
+        n_queries = queries.shape[0]
+        ranges = self.ranges(allowed)
+        total = sum(end - start for start, end in ranges)
+        k = min(k, total)
+        if k == 0:
+            return (
+                np.empty((n_queries, 0), dtype=np.float32),
+                np.empty((n_queries, 0), dtype=np.intp),
+            )
+
+        q_norms = np.einsum("ij,ij->i", queries, queries)[:, None]
+        sq = np.concatenate(
+            [
+                self._sq_norms[None, start:end]
+                - 2.0 * (queries @ self.data[start:end].T)
+                + q_norms
+                for start, end in ranges
+            ],
+            axis=1,
+        )
+        if k < total:
+            top = np.argpartition(sq, k - 1, axis=1)[:, :k]
+        else:
+            top = np.broadcast_to(np.arange(total), sq.shape).copy()
+        top_sq = np.take_along_axis(sq, top, axis=1)
+        order = np.argsort(top_sq, axis=1)
+        top = np.take_along_axis(top, order, axis=1)
+
+        # Posição na concatenação -> posição na matriz particionada -> linha original
+        starts = np.array([start for start, _ in ranges], dtype=np.int64)
+        lengths = np.array([end - start for start, end in ranges], dtype=np.int64)
+        concat_starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+        which = np.searchsorted(concat_starts, top, side="right") - 1
+        positions = starts[which] + (top - concat_starts[which])
+
+        distances = _to_metric_distance(
+            np.take_along_axis(top_sq, order, axis=1), self.metric
+        )
+        return distances.astype(np.float32), self.rows[positions]
+
+
+class HNSWIndex(NeighborIndex):
+    """
+    Índice aproximado baseado em grafo navegável hierárquico (HNSW), delegado
+    ao hnswlib (C++). O grafo guarda sua própria cópia dos vetores; `data`
+    continua sendo a matriz do modelo, usada por `vectors`.
+
+    Parâmetros:
+        M: vizinhos por nó nas camadas superiores (2*M na camada 0).
+        ef_construction: largura da busca durante a construção.
+        ef_search: largura da busca nas consultas. Valores maiores aumentam o
+            recall e a latência. É estado do grafo no hnswlib, compartilhado
+            pelas threads que buscam ao mesmo tempo; por isso é fixo por
+            índice (`set_ef` só fora do atendimento, ex.: benchmarks). Quando
+            k > ef, o hnswlib usa k.
+
+    O grafo é sempre euclidiano; para cosseno as linhas são normalizadas por
+    `_prepare_matrix`, como nos demais backends.
+    """
+
+    name = "hnsw"
+
+    def __init__(
+        self,
+        matrix: np.ndarray,
+        M: int = 16,
+        ef_construction: int = 100,
+        ef_search: int = 64,
+        metric: str = "euclidean",
+        seed: int = 42,
+    ):
+        if hnswlib is None:
+            raise ImportError(
+                "O backend HNSW requer o pacote hnswlib (pip install hnswlib)."
+            )
+        self.metric = metric
+        self.M = M
+        self.ef_construction = ef_construction
+        self.ef_search = ef_search
+        self.seed = seed
+        self.data = _prepare_matrix(matrix, metric)
+        self._graph = hnswlib.Index(space="l2", dim=self.data.shape[1])
+
+    @property
+    def size(self) -> int:
+        return self.data.shape[0]
+
+    def vectors(self, rows) -> np.ndarray:
+        return np.asarray(self.data[rows])
+
+    @classmethod
+    def build(cls, matrix: np.ndarray, **params) -> "HNSWIndex":
+        index = cls(matrix, **params)
+        index._graph.init_index(
+            max_elements=max(index.size, 1),
+            M=index.M,
+            ef_construction=index.ef_construction,
+            random_seed=index.seed,
+        )
+        if index.size:
+            index._graph.add_items(index.data, np.arange(index.size))
+        index.set_ef(index.ef_search)
+        return index
+
+    def set_ef(self, ef: int) -> None:
+        """Troca a largura da busca. Não é seguro com buscas em andamento."""
+        self.ef_search = ef
+        self._graph.set_ef(ef)
+
+    def add(self, matrix: np.ndarray) -> None:
+        """
+        Acrescenta linhas ao final da matriz e as insere no grafo existente,
+        sem reconstruir os nós já indexados. As novas linhas recebem os
+        números seguintes ao último nó (mesma ordem do catálogo).
+        """
+        new = _prepare_matrix(matrix, self.metric)
+        start = self.size
+        self.data = np.concatenate([self.data, new])
+        self._graph.resize_index(self.size)
+        self._graph.add_items(new, np.arange(start, self.size))
+
+    def search(self, queries: np.ndarray, k: int) -> tuple[np.ndarray, np.ndarray]:
+        queries = _prepare_matrix(np.atleast_2d(queries), self.metric)
+        k = min(k, self.size)
+        # Uma thread por chamada: o paralelismo vem do executor do recomendador
+        labels, sq_dist = self._graph.knn_query(queries, k=k, num_threads=1)
+        distances = _to_metric_distance(sq_dist, self.metric).astype(np.float32)
+        return distances, labels.astype(np.intp)
+
+    # --- Persistência ---
+
+    def save(self, path: str) -> None:
+        self._graph.save_index(path)
+
+    @classmethod
+    def load(
+        cls,
+        path: str,
+        matrix: np.ndarray,
+        metric: str = "euclidean",
+        ef_search: int = 64,
+    ) -> "HNSWIndex":
+        index = cls(matrix, ef_search=ef_search, metric=metric)
+        index._graph.load_index(path, max_elements=index.size)
+        if index._graph.element_count != index.size:
+            raise ValueError(
+                f"Grafo HNSW tem {index._graph.element_count} nós, "
+                f"mas a matriz tem {index.size} linhas."
+            )
+        index.M = index._graph.M
+        index.ef_construction = index._graph.ef_construction
+        index.set_ef(ef_search)
+        return index
+
+
+def recall_at_k(exact_indices: np.ndarray, approx_indices: np.ndarray) -> float:
+    """Fração média dos vizinhos exatos recuperados pelo índice aproximado."""
+    k = exact_indices.shape[1]
+    hits = sum(
+        len(set(exact.tolist()) & set(approx.tolist()))
+        for exact, approx in zip(exact_indices, approx_indices)
+    )
+    return hits / (k * len(exact_indices))
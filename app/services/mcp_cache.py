@@ -0,0 +1,167 @@
+import json
+from collections import Counter
+from typing import Any, NamedTuple, Optional, Type
+
+from pydantic import BaseModel
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+
+
+class ToolCachePolicy(NamedTuple):
+    ttl: int
+    # Escopo invalidado por ferramentas de escrita: "library", "devices" ou
+    # "playlist" (resolvido pelo playlistId dos argumentos); None = só TTL
+    scope: Optional[str]
+
+
+# Ferramentas somente leitura cujas respostas podem ser reaproveitadas
+CACHED_TOOLS: dict[str, ToolCachePolicy] = {
+    "getMyPlaylists": ToolCachePolicy(ttl=60, scope="library"),
+    "getPlaylist": ToolCachePolicy(ttl=300, scope="playlist"),
+    "getPlaylistTracks": ToolCachePolicy(ttl=300, scope="playlist"),
+    "getAvailableDevices": ToolCachePolicy(ttl=15, scope="devices"),
+    "getTrackImages": ToolCachePolicy(ttl=24 * 3600, scope=None),
+}
+
+# Ferramentas de escrita e os escopos que elas tornam obsoletos
+MUTATING_TOOLS: dict[str, tuple[str, ...]] = {
+    "addTracksToPlaylist": ("playlist", "library"),
+    "removeTracksFromPlaylist": ("playlist", "library"),
+    "updatePlaylistDetails": ("playlist", "library"),
+    "unfollowPlaylist": ("playlist", "library"),
+    "followPlaylist": ("playlist", "library"),
+    "createPlaylist": ("library",),
+    "transferPlayback": ("devices",),
+}
+
+# Somente leitura sem cache, mas seguras para agrupar chamadas simultâneas
+COALESCED_TOOLS = set(CACHED_TOOLS) | {
+    "getNowPlaying",
+    "getQueue",
+    "searchSpotify",
+    "findPlaylistsContainingTrack",
+}
+
+MISS = object()
+
+
+def normalize_arguments(arguments: dict) -> str:
+    """Argumentos em JSON canônico, sem o `_accessToken`."""
+    args = {k: v for k, v in arguments.items() if k != "_accessToken"}
+    return json.dumps(args, sort_keys=True, default=str)
+
+
+class MCPResponseCache:
+    """
+    Cache das respostas de ferramentas MCP somente leitura (CACHED_TOOLS).
+
+    A chave combina usuário, ferramenta, argumentos normalizados (sem o
+    `_accessToken`) e a geração atual do escopo da ferramenta. Uma escrita
+    bem-sucedida (MUTATING_TOOLS) só incrementa a geração dos escopos
+    afetados: as entradas antigas deixam de ser encontradas e saem pelo LRU
+    ou pelo TTL, sem varrer o cache.
+
+    Os valores são compartilhados entre chamadas e não devem ser alterados
+    por quem os recebe.
+    """
+
+    def __init__(self, maxsize: int, enabled: bool = True):
+        self.enabled = enabled
+        self._cache = TTLCache(maxsize=maxsize, ttl=60)
+        self._generations: dict[tuple, int] = {}
+        self._hits: Counter = Counter()
+        self._misses: Counter = Counter()
+        self.invalidations = 0
+
+    def key(
+        self,
+        user_id: int,
+        tool_name: str,
+        arguments: dict,
+        response_model: Optional[Type[BaseModel]] = None,
+    ) -> Optional[tuple]:
+        """
+        Chave da resposta, ou None se a ferramenta não usa cache. Inclui o
+        modelo de resposta, já que a mesma ferramenta pode ser pedida como
+        dict ou tipada. Deve ser obtida antes da chamada ao MCP: uma escrita
+        concluída durante a chamada muda a geração e a resposta antiga não
+        é mais encontrada.
+        """
+        policy = CACHED_TOOLS.get(tool_name)
+        if policy is None or not self.enabled:
+            return None
+        scope = self._scope(user_id, policy.scope, arguments)
+        generation = self._generations.get(scope, 0) if scope else 0
+        normalized = normalize_arguments(arguments)
+        return (user_id, tool_name, normalized, generation, response_model)
+
+    @staticmethod
+    def _scope(user_id: int, scope: Optional[str], arguments: dict) -> Optional[tuple]:
+        if scope is None:
+            return None
+        if scope == "playlist":
+            playlist_id = arguments.get("playlistId")
+            return (user_id, scope, playlist_id) if playlist_id else None
+        return (user_id, scope)
+
+    def get(
+        self,
+        user_id: int,
+        tool_name: str,
+        arguments: dict,
+        response_model: Optional[Type[BaseModel]] = None,
+    ) -> Any:
+        """Resposta em cache ou MISS (também para ferramentas sem cache)."""
+        key = self.key(user_id, tool_name, arguments, response_model)
+        if key is None:
+            return MISS
+        value = self._cache.get(key, MISS)
+        if value is MISS:
+            self._misses[tool_name] += 1
+        else:
+            self._hits[tool_name] += 1
+        return value
+
+    def set(self, key: Optional[tuple], value: Any) -> None:
+        """Guarda a resposta na chave obtida com `key` antes da chamada."""
+        if key is not None:
+            self._cache.set(key, value, ttl=CACHED_TOOLS[key[1]].ttl)
+
+    def observe_write(self, user_id: int, tool_name: str, arguments: dict) -> None:
+        """Invalida os escopos afetados por uma ferramenta de escrita concluída."""
+        for scope_name in MUTATING_TOOLS.get(tool_name, ()):
+            scope = self._scope(user_id, scope_name, arguments)
+            if scope is not None:
+                self._generations[scope] = self._generations.get(scope, 0) + 1
+                self.invalidations += 1
+
+    def clear(self) -> None:
+        self._cache.clear()
+        self._generations.clear()
+
+    def stats(self) -> dict:
+        hits, misses = sum(self._hits.values()), sum(self._misses.values())
+        tools = {}
+        for tool_name in sorted(set(self._hits) | set(self._misses)):
+            total = self._hits[tool_name] + self._misses[tool_name]
+            tools[tool_name] = {
+                "hits": self._hits[tool_name],
+                "misses": self._misses[tool_name],
+                "hit_rate": round(self._hits[tool_name] / total, 4),
+            }
+        return {
+            "enabled": self.enabled,
+            "size": len(self._cache),
+            "maxsize": self._cache.maxsize,
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": round(hits / (hits + misses), 4) if hits + misses else 0.0,
+            "invalidations": self.invalidations,
+            "tools": tools,
+        }
+
+
+mcp_cache = MCPResponseCache(
+    maxsize=settings.MCP_CACHE_SIZE, enabled=settings.MCP_CACHE_ENABLED
+)
@@ -0,0 +1,163 @@
+import re
+from typing import Any, Optional, Type
+
+from fastapi import HTTPException
+from pydantic import BaseModel, TypeAdapter, ValidationError
+
+from app.core.logger import logger
+
+try:
+    import orjson
+
+    loads = orjson.loads
+except ImportError:  # orjson é opcional; sem ele, usa o json da biblioteca padrão
+    import json
+
+    loads = json.loads
+
+_json_adapters: dict[type, TypeAdapter] = {}
+
+
+def _json_adapter(response_model: Type[BaseModel]) -> TypeAdapter:
+    """Adapter do campo `json` do modelo, que valida direto do texto."""
+    adapter = _json_adapters.get(response_model)
+    if adapter is None:
+        adapter = TypeAdapter(response_model.model_fields["json"].annotation)
+        _json_adapters[response_model] = adapter
+    return adapter
+
+
+def _loads_or_none(text: str) -> Any:
+    try:
+        return loads(text)
+    except ValueError:
+        return None
+
+
+def decode_tool_result(
+    tool_name: str, result: Any, response_model: Optional[Type[BaseModel]] = None
+) -> Any:
+    """
+    Interpreta o CallToolResult em uma única passada pelas partes de texto.
+
+    Partes que começam com `{` ou `[` são decodificadas uma só vez: com
+    `response_model`, direto para o tipo do campo `json` (parser do
+    pydantic-core); sem ele, com orjson (ou json). As demais viram `md`.
+
+    Erros são detectados por `result.isError` ou por um campo `error` no
+    JSON e classificados pelo `status` do objeto de erro. Erros só em texto
+    passam por `_legacy_text_error`.
+
+    Returns:
+        `response_model` preenchido ou {"md": ..., "json": ...}
+
+    Raises:
+        HTTPException 403/400: erro retornado pela ferramenta
+        HTTPException 502: JSON fora do formato de `response_model`
+    """
+    adapter = _json_adapter(response_model) if response_model else None
+    md = None
+    payload = None
+    error = None
+
+    for part in result.content or ():
+        text = getattr(part, "text", None)
+        if text is None:
+            continue
+
+        if text.lstrip()[:1] in ("{", "["):
+            try:
+                payload = adapter.validate_json(text) if adapter else loads(text)
+                if adapter is None and isinstance(payload, dict) and "error" in payload:
+                    error, payload = payload["error"], None
+                continue
+            except ValidationError:
+                data = _loads_or_none(text)
+                if isinstance(data, dict) and "error" in data:
+                    error = data["error"]
+                    continue
+                if data is not None:
+                    logger.error(f"Resposta inesperada da ferramenta {tool_name}")
+                    raise HTTPException(
+                        status_code=502,
+                        detail=f"Resposta inesperada da ferramenta {tool_name}.",
+                    )
+            except ValueError:
+                pass
+        md = text
+
+    is_error = bool(getattr(result, "isError", False))
+    if error is None and (is_error or (payload is None and md)):
+        error = _legacy_text_error(md or "Erro desconhecido", is_error)
+    elif error is not None and not isinstance(error, dict):
+        error = _legacy_text_error(str(error), is_error=True)
+    if error is not None:
+        raise _tool_error(tool_name, error)
+
+    if md is None and payload is None:
+        md = "Sem resposta da ferramenta."
+    if response_model is not None:
+        return response_model.model_construct(md=md, json=payload)
+    return {"md": md, "json": payload}
+
+
+def _tool_error(tool_name: str, error: dict) -> HTTPException:
+    """
+    HTTPException para o objeto de erro da ferramenta ({"status", "message"},
+    como na API do Spotify). A classificação usa só o `status` (ou `code`)
+    numérico; sem ele, o erro vira 400.
+    """
+    status = _error_status(error)
+    message = str(error.get("message") or error).strip()
+    logger.error(
+        f"Erro retornado pela ferramenta {tool_name}",
+        data={"status": status},
+        error=message,
+    )
+
+    if status == 403:
+        return HTTPException(
+            status_code=403,
+            detail="Permissão negada pelo Spotify. Verifique se você é o dono da playlist.",
+        )
+    return HTTPException(status_code=400, detail=message)
+
+
+def _error_status(error: dict) -> Optional[int]:
+    """Status HTTP do objeto de erro, ignorando códigos que não são HTTP (ex.: JSON-RPC)."""
+    for field in ("status", "code"):
+        value = error.get(field)
+        if isinstance(value, int) and not isinstance(value, bool) and 400 <= value < 600:
+            return value
+    return None
+
+
+# --- Compatibilidade com servidores que devolvem erros só como texto ---
+
+_LEGACY_ERROR_PREFIXES = (
+    "Error:",
+    "Error ",
+    "Failed to",
+    "Unable to",
+    "Cannot ",
+    "Could not",
+    "Bad OAuth request",
+    "MCP error",
+)
+
+_LEGACY_FORBIDDEN = re.compile(r"\bForbidden\b|\b403\b")
+
+
+def _legacy_text_error(text: str, is_error: bool) -> Optional[dict]:
+    """
+    Único ponto que interpreta o texto do erro. Converte a mensagem no mesmo
+    formato do objeto de erro tipado, inferindo o 403 pelo conteúdo.
+
+    Sem `isError`, o texto só é tratado como erro se começar com um dos
+    prefixos conhecidos; caso contrário retorna None (resposta normal em md).
+    """
+    text = text.strip()
+    if not is_error and not text.startswith(_LEGACY_ERROR_PREFIXES):
+        return None
+    status = 403 if _LEGACY_FORBIDDEN.search(text) else None
+    return {"status": status, "message": text}
@@ -0,0 +1,274 @@
+import asyncio
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional
+
+from fastapi import HTTPException
+from mcp import ClientSession
+from mcp.client.sse import sse_client
+
+from app.core.config import settings
+from app.core.logger import logger
+
+
+class MCPConnection:
+    """
+    Sessão MCP já inicializada, mantida aberta por uma task dedicada.
+
+    O sse_client e o ClientSession usam task groups do anyio, que precisam
+    ser abertos e fechados na mesma task; por isso a conexão vive em sua
+    própria task e as chamadas de outras tasks usam apenas `session`.
+    """
+
+    def __init__(self, url: str):
+        self.url = url
+        self.session: Optional[ClientSession] = None
+        self.last_used = time.monotonic()
+        self.broken = False
+        self._ready = asyncio.Event()
+        self._closing = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._error: Optional[BaseException] = None
+
+    @property
+    def alive(self) -> bool:
+        return (
+            not self.broken
+            and self.session is not None
+            and self._task is not None
+            and not self._task.done()
+        )
+
+    async def open(self, timeout: float) -> None:
+        self._task = asyncio.create_task(self._run())
+        await asyncio.wait_for(self._ready.wait(), timeout)
+        if self.session is None:
+            raise self._error or ConnectionError("Sessão MCP encerrada ao iniciar")
+
+    async def _run(self) -> None:
+        try:
+            async with sse_client(self.url, timeout=120.0) as (read, write):
+                async with ClientSession(
+                    read, write, message_handler=self._on_message
+                ) as session:
+                    await session.initialize()
+                    self.session = session
+                    self._ready.set()
+                    await self._closing.wait()
+        except Exception as e:
+            self._error = e
+            if self.session is not None:
+                logger.warning("Conexão MCP do pool encerrada", data=str(e))
+        finally:
+            self.session = None
+            self._ready.set()
+
+    async def _on_message(self, message) -> None:
+        """
+        Falhas do transporte (ex.: stream SSE encerrado pelo servidor) chegam
+        como exceções no stream de leitura, sem fechar o ClientSession. A
+        conexão é marcada como quebrada e encerrada, para o pool abrir outra.
+        """
+        if isinstance(message, Exception):
+            logger.warning("Conexão MCP do pool perdida", data=str(message))
+            self.broken = True
+            self._closing.set()
+
+    async def ping(self, timeout: float) -> bool:
+        try:
+            await asyncio.wait_for(self.session.send_ping(), timeout)
+            return True
+        except Exception:
+            return False
+
+    async def close(self) -> None:
+        self._closing.set()
+        if self._task is not None:
+            try:
+                await asyncio.wait_for(self._task, timeout=5)
+            except (asyncio.TimeoutError, asyncio.CancelledError, Exception):
+                self._task.cancel()
+
+
+class MCPSessionPool:
+    """
+    Pool limitado de sessões MCP reutilizadas entre chamadas.
+
+    - Tamanho máximo MCP_POOL_SIZE; quem chega com o pool cheio espera em
+      fila FIFO e recebe a próxima sessão devolvida (checkout justo).
+    - Sessões paradas há mais de MCP_POOL_PING_INTERVAL segundos recebem um
+      ping antes de serem entregues; se falhar, são descartadas.
+    - Sessões marcadas com `invalidate` (erro durante a chamada) são fechadas
+      na devolução e o lugar fica livre para uma nova conexão.
+    """
+
+    def __init__(self, url: str, max_size: int, ping_interval: float, acquire_timeout: float):
+        self.url = url
+        self.max_size = max(1, max_size)
+        self.ping_interval = ping_interval
+        self.acquire_timeout = acquire_timeout
+        self._idle: deque[MCPConnection] = deque()
+        self._waiters: deque[asyncio.Future] = deque()
+        self._leased: dict[int, MCPConnection] = {}
+        self._size = 0
+        self.opened = 0
+        self.reused = 0
+
+    @asynccontextmanager
+    async def session(self) -> AsyncIterator[ClientSession]:
+        conn = await self._acquire()
+        self._leased[id(conn.session)] = conn
+        session = conn.session
+        try:
+            yield session
+        except HTTPException:
+            # Erro devolvido pela ferramenta: a sessão continua utilizável
+            raise
+        except BaseException:
+            conn.broken = True
+            raise
+        finally:
+            self._leased.pop(id(session), None)
+            conn.last_used = time.monotonic()
+            await self._release(conn)
+
+    def invalidate(self, session: ClientSession) -> None:
+        """Marca a sessão emprestada para descarte quando for devolvida."""
+        conn = self._leased.get(id(session))
+        if conn is not None:
+            conn.broken = True
+
+    async def _acquire(self) -> MCPConnection:
+        while True:
+            if self._idle and not self._waiters:
+                conn = self._idle.popleft()
+            elif self._size < self.max_size and not self._waiters:
+                self._size += 1
+                return await self._open_new()
+            else:
+                future = asyncio.get_running_loop().create_future()
+                self._waiters.append(future)
+                try:
+                    conn = await asyncio.wait_for(future, self.acquire_timeout)
+                except BaseException as e:
+                    if future in self._waiters:
+                        self._waiters.remove(future)
+                    self._return_handoff(future)
+                    if isinstance(e, asyncio.TimeoutError):
+                        raise HTTPException(
+                            status_code=503,
+                            detail="Serviço de Agente Spotify ocupado. Tente novamente.",
+                        )
+                    raise
+                if conn is None:
+                    # Lugar liberado por uma sessão descartada
+                    return await self._open_new()
+
+            if await self._healthy(conn):
+                self.reused += 1
+                return conn
+            await self._discard(conn, reopen_slot=False)
+            self._size += 1
+            return await self._open_new()
+
+    async def _healthy(self, conn: MCPConnection) -> bool:
+        if not conn.alive:
+            return False
+        if time.monotonic() - conn.last_used < self.ping_interval:
+            return True
+        return await conn.ping(timeout=5)
+
+    async def _open_new(self) -> MCPConnection:
+        """Abre uma conexão para um lugar já reservado em `_size`."""
+        last_error = None
+        try:
+            for attempt in range(3):
+                conn = MCPConnection(self.url)
+                try:
+                    await conn.open(timeout=self.acquire_timeout)
+                    self.opened += 1
+                    return conn
+                except Exception as e:
+                    logger.warning(
+                        f"Tentativa {attempt + 1}/3 de conectar ao MCP falhou",
+                        data=str(e),
+                    )
+                    last_error = e
+                    await conn.close()
+                    await asyncio.sleep(1 * (attempt + 1))
+        except BaseException:
+            self._free_slot()
+            raise
+
+        self._free_slot()
+        logger.error("Erro ao conectar no MCP após 3 tentativas", error=last_error)
+        raise HTTPException(
+            status_code=503, detail="Serviço de Agente Spotify indisponível"
+        )
+
+    async def _release(self, conn: MCPConnection) -> None:
+        if not conn.alive:
+            await self._discard(conn)
+            return
+        self._hand_over(conn)
+
+    def _hand_over(self, conn: MCPConnection) -> None:
+        """Entrega a sessão ao primeiro da fila ou a devolve às ociosas."""
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(conn)
+                return
+        self._idle.append(conn)
+
+    def _return_handoff(self, future: asyncio.Future) -> None:
+        """Repassa o que foi entregue a um waiter que desistiu (timeout/cancelamento)."""
+        if not future.done() or future.cancelled():
+            return
+        conn = future.result()
+        if conn is None:
+            self._free_slot()
+        else:
+            self._hand_over(conn)
+
+    async def _discard(self, conn: MCPConnection, reopen_slot: bool = True) -> None:
+        self._size -= 1
+        if reopen_slot:
+            self._free_slot(reserved=False)
+        await conn.close()
+
+    def _free_slot(self, reserved: bool = True) -> None:
+        """Passa um lugar livre para o próximo da fila, que abrirá a conexão."""
+        if reserved:
+            self._size -= 1
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                self._size += 1
+                waiter.set_result(None)
+                return
+
+    async def close(self) -> None:
+        idle, self._idle = list(self._idle), deque()
+        self._size -= len(idle)
+        await asyncio.gather(*(conn.close() for conn in idle))
+
+    def stats(self) -> dict:
+        return {
+            "size": self._size,
+            "idle": len(self._idle),
+            "in_use": len(self._leased),
+            "waiting": len(self._waiters),
+            "max_size": self.max_size,
+            "opened": self.opened,
+            "reused": self.reused,
+        }
+
+
+mcp_pool = MCPSessionPool(
+    settings.MCP_SERVER_URL,
+    max_size=settings.MCP_POOL_SIZE,
+    ping_interval=settings.MCP_POOL_PING_INTERVAL,
+    acquire_timeout=settings.MCP_POOL_ACQUIRE_TIMEOUT,
+)
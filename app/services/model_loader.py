@@ -1,14 +1,338 @@
+import hashlib
+import json
 import os
 import pickle
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Optional
+
 import joblib
+import numpy as np
+from app.core.config import settings
 from app.core.logger import logger
+from app.services.feature_encoder import QueryEncoder
+from app.services.knn_index import (
+    BruteForceIndex,
+    HNSWIndex,
+    NeighborIndex,
+    SklearnIndex,
+)
+
+MODELS_DIR = os.path.abspath(
+    os.path.join(os.path.dirname(__file__), "../assets/models")
+)
+MODEL_FILE = "music_recommender_model.joblib"
+SCALER_FILE = "scaler.joblib"
+FEATURES_FILE = "music_model_features.pkl"
+HNSW_INDEX_FILE = "hnsw_index.bin"
+
+# Layout exportado por scripts/export_model_arrays.py, aberto com mmap
+MATRIX_FILE = "matrix.npy"
+SQ_NORMS_FILE = "sq_norms.npy"
+SCALER_PARAMS_FILE = "scaler_params.npz"
+KNN_PARAMS_FILE = "knn_params.json"
+# Tabela int32 (linhas, K) de vizinhos pré-calculados (scripts/build_similar_tracks.py)
+SIMILAR_TRACKS_FILE = "similar_tracks.npy"
+
+# Registro versionado: versions/<versão>/ + ponteiro versions/CURRENT
+VERSIONS_DIR = os.path.join(MODELS_DIR, "versions")
+CURRENT_FILE = "CURRENT"
+MANIFEST_FILE = "manifest.json"
+
+
+def file_checksum(path: str) -> str:
+    sha = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+
+def has_mapped_artifacts(directory: str) -> bool:
+    """Indica se `directory` tem o layout exportado e se ele deve ser usado."""
+    return settings.MODEL_MMAP_ENABLED and os.path.exists(
+        os.path.join(directory, MATRIX_FILE)
+    )
+
+
+def resolve_model_dir() -> tuple[str, Optional[dict]]:
+    """
+    Diretório da versão ativa do modelo e seu manifest.
+
+    Usa versions/CURRENT quando existe; caso contrário cai no layout antigo,
+    com os arquivos soltos em MODELS_DIR (sem manifest).
+    """
+    try:
+        with open(os.path.join(VERSIONS_DIR, CURRENT_FILE)) as f:
+            version = f.read().strip()
+        directory = os.path.join(VERSIONS_DIR, version)
+        with open(os.path.join(directory, MANIFEST_FILE)) as f:
+            return directory, json.load(f)
+    except (OSError, ValueError):
+        return MODELS_DIR, None
+
+
+class ModelBundle:
+    """
+    Artefatos de uma versão do modelo (KNN, scaler, features, encoder e
+    índice de busca). Nunca é alterado depois de criado: uma recarga gera um
+    novo bundle, e quem já tem uma referência continua usando a versão antiga.
+    """
+
+    def __init__(
+        self,
+        version: str,
+        directory: str,
+        model,
+        scaler,
+        features: list,
+        encoder: QueryEncoder,
+        index: NeighborIndex,
+        manifest: Optional[dict] = None,
+        similar: Optional[np.ndarray] = None,
+    ):
+        self.version = version
+        self.directory = directory
+        self.model = model
+        self.scaler = scaler
+        self.features = features
+        self.encoder = encoder
+        self.index = index
+        self.manifest = manifest or {}
+        self.similar = similar
+        self.loaded_at = datetime.now(timezone.utc)
+        self.load_timings: dict[str, float] = {}
+
+    @staticmethod
+    def version_for(directory: str, manifest: Optional[dict] = None) -> str:
+        """Versão dos artefatos em `directory`, conhecida antes de carregá-los."""
+        if manifest is not None:
+            return manifest["version"]
+        main_file = MATRIX_FILE if has_mapped_artifacts(directory) else MODEL_FILE
+        stat = os.stat(os.path.join(directory, main_file))
+        return f"{stat.st_size:x}-{stat.st_mtime_ns:x}"
+
+    @staticmethod
+    def _check_features(version: str, manifest: Optional[dict], features) -> None:
+        if manifest is not None and list(manifest.get("features", features)) != list(
+            features
+        ):
+            raise ValueError(
+                f"Features do modelo {version} divergem das registradas no manifest."
+            )
+
+    @classmethod
+    def load(cls, directory: str, manifest: Optional[dict] = None) -> "ModelBundle":
+        """
+        Lê os artefatos de `directory`. Checksum, modelo, scaler e features são
+        lidos em paralelo; os tempos de cada etapa ficam em `load_timings` (ms).
+        Se houver artefatos exportados para mmap, eles têm preferência.
+        """
+        if has_mapped_artifacts(directory):
+            return cls.load_mapped(directory, manifest)
+
+        path_model = os.path.join(directory, MODEL_FILE)
+        path_scaler = os.path.join(directory, SCALER_FILE)
+        path_features = os.path.join(directory, FEATURES_FILE)
+
+        def read_features():
+            with open(path_features, "rb") as f:
+                return pickle.load(f)
+
+        tasks = {
+            "model": lambda: joblib.load(path_model),
+            "scaler": lambda: joblib.load(path_scaler),
+            "features": read_features,
+        }
+        if manifest is not None:
+            tasks["checksum"] = lambda: file_checksum(path_model)
+
+        timings: dict[str, float] = {}
+
+        def timed(name):
+            start = time.perf_counter()
+            result = tasks[name]()
+            timings[name] = round((time.perf_counter() - start) * 1000, 2)
+            return result
+
+        with ThreadPoolExecutor(
+            max_workers=len(tasks), thread_name_prefix="model-load"
+        ) as pool:
+            futures = {name: pool.submit(timed, name) for name in tasks}
+            artifacts = {name: future.result() for name, future in futures.items()}
+
+        model, scaler, features = (
+            artifacts["model"],
+            artifacts["scaler"],
+            artifacts["features"],
+        )
+        if manifest is not None:
+            if artifacts["checksum"] != manifest.get("checksum"):
+                raise ValueError(
+                    f"Checksum do modelo {manifest.get('version')} não confere "
+                    f"com o manifest ({artifacts['checksum'][:12]})."
+                )
+        version = cls.version_for(directory, manifest)
+        cls._check_features(version, manifest, features)
+
+        start = time.perf_counter()
+        encoder = QueryEncoder.from_scaler(scaler, features)
+        timings["encoder"] = round((time.perf_counter() - start) * 1000, 2)
+
+        start = time.perf_counter()
+        if settings.RECOMMENDER_INDEX_BACKEND == "sklearn":
+            index = SklearnIndex(model)
+        else:
+            index = cls._build_index(directory, model._fit_X, model.effective_metric_)
+        timings["index"] = round((time.perf_counter() - start) * 1000, 2)
+
+        bundle = cls(
+            version=version,
+            directory=directory,
+            model=model,
+            scaler=scaler,
+            features=features,
+            encoder=encoder,
+            index=index,
+            manifest=manifest,
+            similar=cls._load_similar(directory, index.size),
+        )
+        bundle.load_timings = timings
+        return bundle
+
+    @classmethod
+    def load_mapped(
+        cls, directory: str, manifest: Optional[dict] = None
+    ) -> "ModelBundle":
+        """
+        Abre a versão exportada por scripts/export_model_arrays.py. A matriz
+        de vizinhos é mapeada com mmap_mode="r", então todos os workers do
+        host compartilham as mesmas páginas, e o encoder é montado direto dos
+        parâmetros do scaler, sem unpickling. Não há objeto sklearn nesse
+        modo: o backend "sklearn" usa a busca brute-force, que é exata.
+        """
+        timings: dict[str, float] = {}
+        version = cls.version_for(directory, manifest)
+
+        start = time.perf_counter()
+        path_matrix = os.path.join(directory, MATRIX_FILE)
+        cls._check_matrix(version, manifest, path_matrix)
+        matrix = np.load(path_matrix, mmap_mode="r")
+        sq_norms = np.load(os.path.join(directory, SQ_NORMS_FILE), mmap_mode="r")
+        timings["matrix"] = round((time.perf_counter() - start) * 1000, 2)
+
+        start = time.perf_counter()
+        with open(os.path.join(directory, KNN_PARAMS_FILE)) as f:
+            params = json.load(f)
+        with np.load(os.path.join(directory, SCALER_PARAMS_FILE)) as archive:
+            scaled_columns = [str(c) for c in archive["columns"]]
+            mean, scale = archive["mean"], archive["scale"]
+        features = params["features"]
+        cls._check_features(version, manifest, features)
+        encoder = QueryEncoder(features, scaled_columns, mean, scale)
+        timings["encoder"] = round((time.perf_counter() - start) * 1000, 2)
+
+        start = time.perf_counter()
+        index = cls._build_index(directory, matrix, params["metric"], sq_norms)
+        timings["index"] = round((time.perf_counter() - start) * 1000, 2)
+
+        bundle = cls(
+            version=version,
+            directory=directory,
+            model=None,
+            scaler=None,
+            features=features,
+            encoder=encoder,
+            index=index,
+            manifest=manifest,
+            similar=cls._load_similar(directory, index.size),
+        )
+        bundle.load_timings = timings
+        return bundle
+
+    @staticmethod
+    def _check_matrix(version: str, manifest: Optional[dict], path_matrix: str) -> None:
+        """
+        Confere a matriz com o manifest. O checksum é calculado na publicação;
+        no carregamento basta o tamanho (um stat), e o sha256 completo só é
+        recalculado com MODEL_VERIFY_CHECKSUM.
+        """
+        if manifest is None:
+            return
+        expected_size = manifest.get("matrix_size")
+        if expected_size is not None and os.path.getsize(path_matrix) != expected_size:
+            raise ValueError(
+                f"Tamanho da matriz do modelo {version} não confere com o manifest."
+            )
+        if settings.MODEL_VERIFY_CHECKSUM and manifest.get("matrix_checksum"):
+            if file_checksum(path_matrix) != manifest["matrix_checksum"]:
+                raise ValueError(
+                    f"Checksum da matriz do modelo {version} não confere com o manifest."
+                )
+
+    @staticmethod
+    def _load_similar(directory: str, index_size: int) -> Optional[np.ndarray]:
+        """Abre a tabela de vizinhos pré-calculados (mmap), se for desta versão."""
+        path = os.path.join(directory, SIMILAR_TRACKS_FILE)
+        if not os.path.exists(path):
+            return None
+        similar = np.load(path, mmap_mode="r")
+        if similar.ndim != 2 or similar.shape[0] != index_size:
+            logger.warning(
+                f"Tabela de faixas similares com shape {similar.shape} não corresponde "
+                f"ao índice ({index_size} linhas). Usando busca KNN."
+            )
+            return None
+        return similar
+
+    @staticmethod
+    def _build_index(
+        directory: str,
+        matrix: np.ndarray,
+        metric: str,
+        sq_norms: Optional[np.ndarray] = None,
+    ) -> NeighborIndex:
+        """
+        Cria o backend de busca configurado em RECOMMENDER_INDEX_BACKEND sobre
+        a matriz do modelo (o backend "sklearn" é tratado por quem chama):
+        - brute: varredura NumPy sobre a matriz em float32 (exato)
+        - hnsw: grafo aproximado construído por scripts/build_knn_index.py
+        """
+        backend = settings.RECOMMENDER_INDEX_BACKEND
+
+        if backend == "hnsw":
+            path_index = os.path.join(directory, HNSW_INDEX_FILE)
+            if not os.path.exists(path_index):
+                logger.warning(
+                    f"Índice HNSW não encontrado em {path_index}. Usando busca brute-force."
+                )
+            else:
+                try:
+                    return HNSWIndex.load(
+                        path_index,
+                        matrix,
+                        metric=metric,
+                        ef_search=settings.HNSW_EF_SEARCH,
+                    )
+                except ImportError as e:
+                    logger.warning(f"{e} Usando busca brute-force.")
+        elif backend not in ("brute", "sklearn"):
+            logger.warning(
+                f"Backend de índice '{backend}' desconhecido. Usando busca brute-force."
+            )
+
+        return BruteForceIndex(matrix, metric=metric, sq_norms=sq_norms)
 
 
 class ModelLoader:
     _instance = None
-    _model = None
-    _scaler = None
-    _features = None
+    _bundle: Optional[ModelBundle] = None
+    _lock = threading.Lock()
+    _reload_lock = threading.Lock()
+    _reload_thread: Optional[threading.Thread] = None
+    _last_error: Optional[str] = None
 
     def __new__(cls):
         if cls._instance is None:
@@ -16,48 +340,156 @@ class ModelLoader:
         return cls._instance
 
     def load(self):
-        if self._model is not None:
-            return self._model, self._scaler, self._features
+        bundle = self.get_bundle()
+        return bundle.model, bundle.scaler, bundle.features
 
-        (
-            logger.info("Carregando modelos de ML do disco...")
-            if self._model is None
-            else None
-        )
-        logger.info("Carregando modelos de ML do disco...")
-        base_path = os.path.abspath(
-            os.path.join(os.path.dirname(__file__), "../assets")
+    def get_bundle(self) -> ModelBundle:
+        """
+        Versão ativa do modelo. Cada requisição deve pegar o bundle uma única
+        vez e usá-lo até o fim, para não misturar versões durante uma recarga.
+        """
+        bundle = self._bundle
+        if bundle is not None:
+            return bundle
+
+        with self._lock:
+            if self._bundle is None:
+                logger.info("Carregando modelos de ML do disco...")
+                directory, manifest = resolve_model_dir()
+                self._bundle = ModelBundle.load(directory, manifest)
+                logger.success(
+                    f"Modelos carregados com sucesso (versão: {self._bundle.version}, "
+                    f"índice: {self._bundle.index.name})."
+                )
+            return self._bundle
+
+    def reload(self, force: bool = False) -> ModelBundle:
+        """
+        Carrega a versão apontada por versions/CURRENT e troca a referência
+        ativa. Requisições em andamento continuam com o bundle anterior.
+        """
+        with self._lock:
+            directory, manifest = resolve_model_dir()
+            current = self._bundle
+            version = manifest["version"] if manifest else None
+            if (
+                not force
+                and current is not None
+                and version is not None
+                and current.version == version
+            ):
+                logger.info(f"Modelo {version} já está ativo. Recarga ignorada.")
+                return current
+
+            logger.info(f"Recarregando modelo a partir de {directory}...")
+            start = time.perf_counter()
+            bundle = ModelBundle.load(directory, manifest)
+            self._bundle = bundle
+
+        logger.success(
+            f"Modelo {bundle.version} ativo em {time.perf_counter() - start:.1f}s "
+            f"(anterior: {current.version if current else '-'})."
         )
+        return bundle
 
-        path_model = os.path.join(base_path, "models/music_recommender_model.joblib")
-        path_scaler = os.path.join(base_path, "models/scaler.joblib")
-        path_features = os.path.join(base_path, "models/music_model_features.pkl")
+    def reload_in_background(self, force: bool = False) -> bool:
+        """Dispara a recarga numa thread. Retorna False se já houver uma em andamento."""
+        with self._reload_lock:
+            if self._reload_thread is not None and self._reload_thread.is_alive():
+                return False
+            self._reload_thread = threading.Thread(
+                target=self._reload_safely,
+                args=(force,),
+                name="model-reload",
+                daemon=True,
+            )
+            self._reload_thread.start()
+            return True
 
-        self._model = joblib.load(path_model)
-        self._scaler = joblib.load(path_scaler)
-        with open(path_features, "rb") as f:
-            self._features = pickle.load(f)
+    def _reload_safely(self, force: bool) -> None:
+        try:
+            self.reload(force=force)
+            self._last_error = None
+        except Exception as e:
+            self._last_error = str(e)
+            logger.error(f"Falha ao recarregar o modelo. Mantendo a versão atual: {e}")
 
-        logger.success("Modelos carregados com sucesso.")
-        return self._model, self._scaler, self._features
+    def status(self) -> dict:
+        bundle = self._bundle
+        return {
+            "version": bundle.version if bundle else None,
+            "directory": bundle.directory if bundle else None,
+            "index": bundle.index.name if bundle else None,
+            "loaded_at": bundle.loaded_at.isoformat() if bundle else None,
+            "manifest": bundle.manifest if bundle else None,
+            "reloading": self._reload_thread is not None
+            and self._reload_thread.is_alive(),
+            "last_error": self._last_error,
+        }
 
     def get_model(self):
-        if self._model is None:
-            self.load()
-        return self._model
+        return self.get_bundle().model
 
     def get_preprocessor(self):
-        if self._scaler is None:
-            self.load()
-        return self._scaler
+        return self.get_bundle().scaler
 
     def get_features(self):
-        if self._features is None:
-            self.load()
-        return self._features
+        return self.get_bundle().features
+
+    def get_encoder(self) -> QueryEncoder:
+        return self.get_bundle().encoder
+
+    def get_index(self) -> NeighborIndex:
+        return self.get_bundle().index
+
+    def get_version(self) -> str:
+        """Identificador do modelo ativo (muda a cada nova versão publicada)."""
+        return self.get_bundle().version
+
+
+class ModelWatcher:
+    """
+    Observa versions/CURRENT com watchdog e dispara a recarga em segundo
+    plano quando uma nova versão é publicada (MODEL_WATCH_ENABLED).
+    """
+
+    def __init__(self, loader: ModelLoader):
+        self._loader = loader
+        self._observer = None
+
+    def start(self) -> None:
+        from watchdog.events import FileSystemEventHandler
+        from watchdog.observers import Observer
+
+        loader = self._loader
+
+        class _CurrentHandler(FileSystemEventHandler):
+            def on_any_event(self, event):
+                paths = (event.src_path, getattr(event, "dest_path", ""))
+                if any(os.path.basename(p) == CURRENT_FILE for p in paths if p):
+                    logger.info("Nova versão de modelo detectada em versions/CURRENT.")
+                    loader.reload_in_background()
+
+        os.makedirs(VERSIONS_DIR, exist_ok=True)
+        self._observer = Observer()
+        self._observer.schedule(_CurrentHandler(), VERSIONS_DIR, recursive=False)
+        self._observer.daemon = True
+        self._observer.start()
+        logger.info(f"Observando novas versões de modelo em {VERSIONS_DIR}")
+
+    def stop(self) -> None:
+        if self._observer is not None:
+            self._observer.stop()
+            self._observer.join(timeout=5)
+            self._observer = None
 
 
 _loader = ModelLoader()
+model_watcher = ModelWatcher(_loader)
+
+
+def get_bundle() -> ModelBundle:
+    return _loader.get_bundle()
 
 
 def get_model():
@@ -70,3 +502,23 @@ def get_preprocessor():
 
 def get_features():
     return _loader.get_features()
+
+
+def get_encoder():
+    return _loader.get_encoder()
+
+
+def get_index():
+    return _loader.get_index()
+
+
+def get_version():
+    return _loader.get_version()
+
+
+def reload_model(force: bool = False) -> bool:
+    return _loader.reload_in_background(force=force)
+
+
+def model_status() -> dict:
+    return _loader.status()
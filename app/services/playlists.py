@@ -9,7 +9,9 @@ from app.models.user import User
 from app.schemas.playlists import (
     PlaylistsMCPResponse,
     PlaylistMCPDetailResponse,
+    PlaylistPageMCPResponse,
 )
+from app.schemas.tracks import PlaylistTracksMCPResponse
 from app.services.spotify_mcp import SpotifyMCPService
 from sqlalchemy.orm import Session
 import logging
@@ -30,17 +32,18 @@ class PlaylistsService:
         """
         Helper específico para buscar playlists via MCP.
         """
-        result_dict = await SpotifyMCPService.call_tool(
+        response = await SpotifyMCPService.call_tool(
             "getMyPlaylists",
             user,
             db,
             {"limit": limit, "offset": offset, "json": json_output, "md": md_output},
+            response_model=PlaylistsMCPResponse,
         )
         logger.info(
             f"Busca de playlists via MCP concluída. User: {user.email}, Offset: {offset}"
         )
 
-        return PlaylistsMCPResponse(**result_dict)
+        return response
 
     @staticmethod
     async def get_playlist_details_mcp(
@@ -52,21 +55,85 @@ class PlaylistsService:
         """
         Busca detalhes de uma playlist via MCP, opcionalmente calculando a duração total.
         """
-        result_dict = await SpotifyMCPService.call_tool(
+        response = await SpotifyMCPService.call_tool(
             "getPlaylist",
             user,
             db,
             {"playlistId": playlist_id, "calculateTotalDuration": calculate_duration},
+            response_model=PlaylistMCPDetailResponse,
         )
         logger.info(f"Detalhes da playlist {playlist_id} via MCP recuperados.")
-        if result_dict.get("json") and result_dict["json"].get("image"):
-            image_url = result_dict["json"]["image"]
-            if image_url and image_url != "No image":
-                color = await PlaylistsService.get_dominant_color(image_url)
-                if color:
-                    result_dict["json"]["primary_color"] = color
-
-        return PlaylistMCPDetailResponse(**result_dict)
+
+        return await PlaylistsService._with_primary_color(response)
+
+    @staticmethod
+    async def get_playlist_page_mcp(
+        user: User,
+        db: Session,
+        playlist_id: str,
+        limit: int = 50,
+        offset: int = 0,
+        calculate_duration: bool = False,
+    ) -> PlaylistPageMCPResponse:
+        """
+        Detalhes e faixas de uma playlist em uma única ida ao MCP: getPlaylist
+        e getPlaylistTracks rodam em paralelo sobre a mesma sessão.
+
+        Falha nos detalhes propaga o erro; falha só nas faixas devolve a
+        página com `tracks` vazio.
+        """
+        details, tracks = await SpotifyMCPService.call_tools_batch(
+            [
+                (
+                    "getPlaylist",
+                    {"playlistId": playlist_id, "calculateTotalDuration": calculate_duration},
+                    PlaylistMCPDetailResponse,
+                ),
+                (
+                    "getPlaylistTracks",
+                    {
+                        "playlistId": playlist_id,
+                        "limit": limit,
+                        "offset": offset,
+                        "json": True,
+                        "md": False,
+                    },
+                    PlaylistTracksMCPResponse,
+                ),
+            ],
+            user,
+            db,
+        )
+        if isinstance(details, BaseException):
+            raise details
+        if isinstance(tracks, BaseException):
+            logger.warning(f"Falha ao buscar faixas da playlist {playlist_id}: {tracks}")
+            tracks = None
+
+        logger.info(f"Página da playlist {playlist_id} via MCP recuperada.")
+        return PlaylistPageMCPResponse(
+            playlist=await PlaylistsService._with_primary_color(details),
+            tracks=tracks,
+        )
+
+    @staticmethod
+    async def _with_primary_color(
+        response: PlaylistMCPDetailResponse,
+    ) -> PlaylistMCPDetailResponse:
+        """
+        Cópia da resposta de getPlaylist com a cor dominante da capa, se
+        houver. A resposta original pode estar no cache do MCP e não é
+        alterada.
+        """
+        playlist = response.json
+        if not playlist or not playlist.image or playlist.image == "No image":
+            return response
+        color = await PlaylistsService.get_dominant_color(playlist.image)
+        if not color:
+            return response
+        return response.model_copy(
+            update={"json": playlist.model_copy(update={"primary_color": color})}
+        )
 
     @staticmethod
     async def get_dominant_color(image_url: str) -> str | None:
@@ -1,38 +1,574 @@
+import uuid
 from typing import Optional
 
-import pandas as pd
+import numpy as np
+from fastapi import HTTPException
 from sqlalchemy.orm import Session
-from sqlalchemy import asc
 from app.models.track import Track
 from app.models.user import User
-from app.schemas.recommendation import AudioFeaturesInput
+from app.schemas.recommendation import (
+    AudioFeaturesInput,
+    RadioInput,
+    RecommendationResponse,
+)
 from app.schemas.tracks import TrackResponse
 import app.services.model_loader as loader
+from app.services.track_catalog import (
+    DECADE_COLUMNS,
+    TrackCatalog,
+    get_catalog,
+    invalidate_catalog,
+)
+from app.services.filtered_search import allowed_buckets, get_filtered_index
+from app.services.reranking import mmr_rerank
+from app.services.user_signals import get_user_signals
 from app.services.tracks import TracksService
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.database import with_session
+from app.core.executor import recommender_pool
 from app.core.logger import logger
+from app.core.timing import StageTimer
+
+_cursors = TTLCache(
+    maxsize=settings.RECOMMENDER_CURSOR_CACHE_SIZE,
+    ttl=settings.RECOMMENDER_CURSOR_TTL,
+)
+
+# Resultados da busca KNN por vetor quantizado
+_results_cache = TTLCache(
+    maxsize=settings.RECOMMENDER_CACHE_SIZE, ttl=settings.RECOMMENDER_CACHE_TTL
+)
+
+
+class RecommendationCursor:
+    """Lista de vizinhos já ranqueada de uma consulta, servida em páginas."""
+
+    def __init__(self, user_id: Optional[int], catalog: TrackCatalog, rows: np.ndarray):
+        self.user_id = user_id
+        self.catalog = catalog
+        self.rows = rows
 
 
 class RecommenderService:
-    _id_map_cache = None
+    _cache_version: Optional[str] = None
+
+    @staticmethod
+    def _cache_key(
+        item: AudioFeaturesInput, n_candidates: int, version: str
+    ) -> tuple:
+        """
+        Chave do cache de resultados: features contínuas quantizadas na grade
+        RECOMMENDER_CACHE_QUANTUM, flags, década, filtros e profundidade da busca.
+        """
+        quantum = settings.RECOMMENDER_CACHE_QUANTUM
+        filters = item.filters
+        return (
+            version,
+            n_candidates,
+            None if filters is None or filters.is_empty else filters.cache_key(),
+            round(item.acousticness / quantum),
+            round(item.danceability / quantum),
+            round(item.energy / quantum),
+            round(item.valence / quantum),
+            item.is_popular,
+            item.explicit,
+            item.decade,
+        )
 
     @classmethod
-    def get_id_map(cls, db: Session):
+    def _sync_cache_version(cls, version: str) -> None:
+        """Descarta o cache de resultados quando o modelo ou o catálogo mudam."""
+        if cls._cache_version != version:
+            _results_cache.clear()
+            cls._cache_version = version
+
+    @staticmethod
+    def _snapshot(db: Session) -> tuple[loader.ModelBundle, TrackCatalog]:
+        """
+        Versão do modelo e catálogo usados por uma requisição. O bundle é lido
+        uma única vez, então uma recarga no meio da requisição não mistura
+        versões; o catálogo é renovado se foi montado para outro modelo.
+        """
+        bundle = loader.get_bundle()
+        catalog = get_catalog(db)
+        if catalog.manifest.get("model_version") != bundle.version:
+            invalidate_catalog()
+            catalog = get_catalog(db)
+        return bundle, catalog
+
+    @staticmethod
+    def cache_stats() -> dict:
+        return {
+            "results": _results_cache.stats(),
+            "images": TracksService.images_cache_stats(),
+        }
+
+    @staticmethod
+    def _search_batch(
+        db: Session,
+        items: list[AudioFeaturesInput],
+        timer: StageTimer,
+        user_id: Optional[int] = None,
+    ) -> tuple[TrackCatalog, list[np.ndarray], list[list[TrackResponse]]]:
+        """
+        Parte síncrona da recomendação (encoding, KNN e hidratação das faixas).
+        Executada no pool de threads para não bloquear o event loop.
+
+        Todas as consultas do lote são resolvidas com uma única busca no
+        índice de vizinhos, com profundidade RECOMMENDER_MAX_RESULTS para que
+        as páginas seguintes saiam da mesma lista. As faixas são montadas a
+        partir do catálogo em memória, sem consulta ao banco no caminho quente.
+
+        Com `user_id`, busca candidatos extras (RECOMMENDER_OVERFETCH), remove
+        faixas com dislike e reordena usando likes e skips do usuário.
+
+        Os vizinhos de cada consulta ficam em cache por vetor quantizado; só
+        as consultas ausentes do cache passam pelo encoder e pelo índice.
+
+        Consultas com `filters` (décadas, explicit, popularidade) são buscadas
+        de forma exata apenas nas partições do catálogo que atendem os filtros.
+
+        Returns:
+            Tupla (catálogo, linhas ranqueadas por consulta, primeira página de
+            TrackResponse sem image_url por consulta).
+        """
+        with timer.stage("load"):
+            bundle, catalog = RecommenderService._snapshot(db)
+            index, encoder = bundle.index, bundle.encoder
+
+        signals = None
+        if user_id is not None:
+            with timer.stage("signals"):
+                signals = get_user_signals(db, user_id, catalog)
+                if signals.is_empty:
+                    signals = None
+
+        max_results = max(
+            settings.RECOMMENDER_MAX_RESULTS, max(item.top_k for item in items)
+        )
+        diversify = [RecommenderService._diversity_params(item) for item in items]
+        n_candidates = max_results
+        if signals is not None or any(any(params) for params in diversify):
+            n_candidates *= settings.RECOMMENDER_OVERFETCH
+
+        RecommenderService._sync_cache_version(catalog.version)
+        keys = [
+            RecommenderService._cache_key(item, n_candidates, catalog.version)
+            for item in items
+        ]
+        neighbors = [_results_cache.get(key) for key in keys]
+        missing = [i for i, found in enumerate(neighbors) if found is None]
+
+        if missing:
+            with timer.stage("encode"):
+                input_final = encoder.encode_batch([items[i] for i in missing])
+
+            filtered = [
+                pos
+                for pos, i in enumerate(missing)
+                if items[i].filters is not None and not items[i].filters.is_empty
+            ]
+            unfiltered = sorted(set(range(len(missing))) - set(filtered))
+
+            with timer.stage("search"):
+                if unfiltered:
+                    distances, indices = index.search(
+                        input_final[unfiltered], n_candidates
+                    )
+                    for j, pos in enumerate(unfiltered):
+                        neighbors[missing[pos]] = (indices[j], distances[j])
+
+                if filtered:
+                    partitioned = get_filtered_index(bundle, catalog)
+                    for pos in filtered:
+                        distances, indices = partitioned.search(
+                            input_final[pos],
+                            n_candidates,
+                            allowed_buckets(items[missing[pos]].filters),
+                        )
+                        neighbors[missing[pos]] = (indices[0], distances[0])
+
+            for i in missing:
+                _results_cache.set(keys[i], neighbors[i])
+
+        ranked = []
+        for (rows, dists), (diversity, max_per_artist) in zip(neighbors, diversify):
+            if signals is not None:
+                with timer.stage("rerank"):
+                    rows, dists = signals.rerank(rows, dists, len(rows))
+            if diversity or max_per_artist:
+                with timer.stage("diversify"):
+                    rows = RecommenderService._diversify(
+                        index,
+                        catalog,
+                        rows,
+                        dists,
+                        max_results,
+                        diversity,
+                        max_per_artist,
+                    )
+            ranked.append(rows[:max_results])
+
+        with timer.stage("hydrate"):
+            pages = [
+                catalog.to_responses(rows[: item.top_k])
+                for rows, item in zip(ranked, items)
+            ]
+
+        return catalog, ranked, pages
+
+    @staticmethod
+    def _diversity_params(item) -> tuple[float, int]:
+        """Peso MMR e limite por artista da consulta, com os padrões das settings."""
+        diversity = item.diversity
+        if diversity is None:
+            diversity = settings.RECOMMENDER_MMR_DIVERSITY
+        max_per_artist = item.max_per_artist
+        if max_per_artist is None:
+            max_per_artist = settings.RECOMMENDER_MAX_PER_ARTIST
+        return diversity, max_per_artist
+
+    @staticmethod
+    def _diversify(
+        index,
+        catalog: TrackCatalog,
+        rows: np.ndarray,
+        dists: np.ndarray,
+        k: int,
+        diversity: float,
+        max_per_artist: int,
+    ) -> np.ndarray:
+        """Aplica MMR e o limite por artista sobre os candidatos já ordenados."""
+        order = mmr_rerank(
+            index.vectors(rows),
+            dists,
+            k,
+            diversity=diversity,
+            artist_keys=catalog.columns["artist_key"][rows],
+            max_per_artist=max_per_artist,
+            pool_factor=settings.RECOMMENDER_MMR_POOL_FACTOR,
+        )
+        return rows[order]
+
+    @staticmethod
+    def _similar_rows(
+        db: Session,
+        track_id: int,
+        top_k: int,
+        timer: StageTimer,
+        user_id: Optional[int] = None,
+    ) -> tuple[TrackCatalog, np.ndarray, list[TrackResponse]]:
+        """
+        Vizinhos de uma faixa do catálogo. Usa a tabela pré-calculada do
+        modelo (consulta O(1), sem inferência); para faixas fora da tabela,
+        monta as features a partir do catálogo/banco e faz a busca KNN.
+
+        Raises:
+            HTTPException 404: se a faixa não existir
+        """
+        with timer.stage("load"):
+            bundle, catalog = RecommenderService._snapshot(db)
+            row = catalog.row_for(track_id)
+
+        similar = bundle.similar
+        if similar is not None and row is not None and row < similar.shape[0]:
+            with timer.stage("lookup"):
+                rows = np.asarray(similar[row], dtype=np.int64)
+                rows = rows[rows >= 0]
+        else:
+            with timer.stage("encode"):
+                if row is not None and row < bundle.index.size:
+                    query = bundle.index.vectors([row])
+                else:
+                    features = RecommenderService._track_features(
+                        db, catalog, row, track_id
+                    )
+                    query = bundle.encoder.encode(features)
+
+            with timer.stage("search"):
+                _, indices = bundle.index.search(
+                    query, settings.RECOMMENDER_MAX_RESULTS + 1
+                )
+                rows = indices[0]
+                rows = rows[rows != row] if row is not None else rows
+            logger.debug(
+                f"Faixa {track_id} fora da tabela de similares. Usada busca KNN."
+            )
+
+        if user_id is not None:
+            with timer.stage("signals"):
+                signals = get_user_signals(db, user_id, catalog)
+                if signals.disliked_rows.size:
+                    rows = rows[~np.isin(rows, signals.disliked_rows)]
+
+        with timer.stage("hydrate"):
+            page = catalog.to_responses(rows[:top_k])
+
+        return catalog, rows, page
+
+    @staticmethod
+    def _track_features(
+        db: Session, catalog: TrackCatalog, row: Optional[int], track_id: int
+    ) -> AudioFeaturesInput:
+        """Features de uma faixa, do catálogo ou, se ainda não estiver nele, do banco."""
+        if row is not None:
+            return catalog.features_for(row)
+
+        track = db.query(Track).filter(Track.id == track_id).first()
+        if track is None:
+            raise HTTPException(status_code=404, detail="Faixa não encontrada.")
+        return RecommenderService._features_from_track(track)
+
+    @staticmethod
+    def _features_from_track(track: Track) -> AudioFeaturesInput:
+        decade = next(
+            (str(d) for d, col in DECADE_COLUMNS if getattr(track, col)), None
+        )
+        return AudioFeaturesInput(
+            energy=track.energy or 0,
+            danceability=track.danceability or 0,
+            valence=track.valence or 0,
+            acousticness=track.acousticness or 0,
+            is_popular=bool(track.is_popular),
+            explicit=bool(track.explicit),
+            decade=decade,
+        )
+
+    @staticmethod
+    def _medoids(vectors: np.ndarray, k: int, max_iter: int = 10) -> np.ndarray:
+        """
+        Escolhe até `k` sementes representativas (k-medoids) entre `vectors`.
+
+        Começa pelo medoide global e pelos pontos mais distantes dos já
+        escolhidos; depois alterna atribuição e atualização dos medoides
+        sobre a matriz de distâncias par-a-par. Retorna as posições escolhidas.
+        """
+        n = vectors.shape[0]
+        k = min(k, n)
+        sq = np.einsum("ij,ij->i", vectors, vectors)
+        dist = np.sqrt(
+            np.maximum(sq[:, None] + sq[None, :] - 2.0 * vectors @ vectors.T, 0.0)
+        )
+
+        medoids = [int(np.argmin(dist.sum(axis=1)))]
+        while len(medoids) < k:
+            medoids.append(int(np.argmax(dist[:, medoids].min(axis=1))))
+        medoids = np.array(medoids)
+
+        for _ in range(max_iter):
+            assignment = np.argmin(dist[:, medoids], axis=1)
+            updated = medoids.copy()
+            for cluster in range(k):
+                members = np.flatnonzero(assignment == cluster)
+                if members.size:
+                    within = dist[np.ix_(members, members)].sum(axis=1)
+                    updated[cluster] = members[np.argmin(within)]
+            if np.array_equal(updated, medoids):
+                break
+            medoids = updated
+
+        return medoids
+
+    @staticmethod
+    def _merge_neighbors(
+        indices: np.ndarray, distances: np.ndarray, exclude: np.ndarray
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Junta os vizinhos de várias consultas em uma lista única ordenada por
+        distância, mantendo a menor distância de cada faixa e removendo as
+        linhas de `exclude` (as próprias sementes).
+        """
+        rows = indices.ravel()
+        dists = distances.ravel()
+        order = np.argsort(dists, kind="stable")
+        rows, dists = rows[order], dists[order]
+
+        _, first = np.unique(rows, return_index=True)
+        first.sort()
+        rows, dists = rows[first], dists[first]
+
+        keep = ~np.isin(rows, exclude)
+        return rows[keep], dists[keep]
+
+    @staticmethod
+    def _radio_rows(
+        db: Session,
+        payload: RadioInput,
+        spotify_ids: Optional[list[str]],
+        timer: StageTimer,
+        user_id: Optional[int] = None,
+    ) -> tuple[TrackCatalog, np.ndarray, list[TrackResponse]]:
         """
-        Cria um mapeamento de índice -> spotify_id baseado na ordem do banco.
-        Isso substitui a necessidade do pre_processing.csv.
+        Rádio a partir de várias faixas: carrega as sementes em uma consulta,
+        resume-as no centroide ou em poucos medoides e resolve todas as
+        consultas com uma única busca KNN, mesclando os resultados.
+
+        Raises:
+            HTTPException 404: se nenhuma semente estiver no banco
+        """
+        with timer.stage("load"):
+            bundle, catalog = RecommenderService._snapshot(db)
+
+        with timer.stage("seeds"):
+            query = db.query(Track)
+            if spotify_ids is not None:
+                query = query.filter(Track.spotify_id.in_(spotify_ids))
+            else:
+                query = query.filter(Track.id.in_(payload.track_ids))
+            seeds = query.all()
+
+        if not seeds:
+            raise HTTPException(
+                status_code=404,
+                detail="Nenhuma das faixas informadas está no catálogo.",
+            )
+
+        with timer.stage("encode"):
+            vectors = bundle.encoder.encode_batch(
+                [RecommenderService._features_from_track(t) for t in seeds]
+            )
+            if payload.strategy == "centroid":
+                queries = vectors.mean(axis=0, keepdims=True)
+            else:
+                medoids = RecommenderService._medoids(vectors, payload.n_medoids)
+                queries = vectors[medoids]
+
+        signals = None
+        if user_id is not None:
+            with timer.stage("signals"):
+                signals = get_user_signals(db, user_id, catalog)
+                if signals.is_empty:
+                    signals = None
+
+        max_results = max(settings.RECOMMENDER_MAX_RESULTS, payload.top_k)
+        diversity, max_per_artist = RecommenderService._diversity_params(payload)
+        n_candidates = max_results + len(seeds)
+        if signals is not None or diversity or max_per_artist:
+            n_candidates *= settings.RECOMMENDER_OVERFETCH
+
+        with timer.stage("search"):
+            distances, indices = bundle.index.search(queries, n_candidates)
+
+        with timer.stage("merge"):
+            seed_rows = np.array(
+                [row for t in seeds if (row := catalog.row_for(t.id)) is not None],
+                dtype=np.int64,
+            )
+            rows, dists = RecommenderService._merge_neighbors(
+                indices, distances, seed_rows
+            )
+            if signals is not None:
+                rows, dists = signals.rerank(rows, dists, len(rows))
+
+        if diversity or max_per_artist:
+            with timer.stage("diversify"):
+                rows = RecommenderService._diversify(
+                    bundle.index,
+                    catalog,
+                    rows,
+                    dists,
+                    max_results,
+                    diversity,
+                    max_per_artist,
+                )
+        rows = rows[:max_results]
+
+        with timer.stage("hydrate"):
+            page = catalog.to_responses(rows[: payload.top_k])
+
+        logger.info(
+            f"Rádio com {len(seeds)} semente(s) e {queries.shape[0]} consulta(s) "
+            f"({payload.strategy})."
+        )
+        return catalog, rows, page
+
+    @staticmethod
+    async def _attach_images(
+        db: Session,
+        user: Optional[User],
+        pages: list[list[TrackResponse]],
+        timer: StageTimer,
+    ) -> None:
+        """
+        Preenche image_url das faixas. Capas já conhecidas saem do cache
+        (memória ou track_images); só as ausentes vão ao MCP, deduplicadas.
+        Com TRACK_IMAGES_ASYNC, as ausentes ficam nulas e são buscadas em
+        segundo plano (GET /tracks/images).
         """
-        if cls._id_map_cache is None:
-            tracks_ids = db.query(Track.spotify_id).order_by(asc(Track.id)).all()
-            cls._id_map_cache = [t.spotify_id for t in tracks_ids]
-            logger.info(
-                f"Cache de ID inicializado com {len(cls._id_map_cache)} faixas."
+        unique_ids = list(dict.fromkeys(t.spotify_id for p in pages for t in p))
+        if not user or not unique_ids:
+            return
+
+        with timer.stage("images"):
+            images_map = await TracksService.get_track_images(
+                user, db, unique_ids, wait=not settings.TRACK_IMAGES_ASYNC
             )
-        return cls._id_map_cache
+
+        for track_responses in pages:
+            for track_response in track_responses:
+                track_response.image_url = images_map.get(track_response.spotify_id)
+
+    @staticmethod
+    def _make_cursor(entry: RecommendationCursor, offset: int) -> Optional[str]:
+        if offset >= len(entry.rows):
+            return None
+        token = uuid.uuid4().hex
+        _cursors.set(token, entry)
+        return f"{token}.{offset}"
+
+    @staticmethod
+    async def recommend_batch(
+        db: Session, items: list[AudioFeaturesInput], user: Optional[User] = None
+    ) -> list[RecommendationResponse]:
+        """
+        Gera recomendações para várias consultas de audio features de uma vez.
+
+        Args:
+            db: Sessão do banco de dados
+            items: Lista de características de áudio (uma consulta por item)
+            user: Usuário autenticado (opcional, necessário para buscar imagens)
+
+        Returns:
+            Um RecommendationResponse por consulta, na mesma ordem de `items`,
+            com até `top_k` faixas ordenadas por distância e o cursor da
+            próxima página (se houver)
+
+        Raises:
+            HTTPException 503: se o pool do recomendador estiver saturado
+        """
+        timer = StageTimer()
+        user_id = user.id if user else None
+        catalog, ranked, pages = await recommender_pool.run(
+            with_session, RecommenderService._search_batch, items, timer, user_id
+        )
+        logger.info(
+            f"Geradas recomendações para {len(items)} consulta(s) "
+            f"({sum(len(p) for p in pages)} faixas)."
+        )
+
+        await RecommenderService._attach_images(db, user, pages, timer)
+
+        results = []
+        for rows, page, item in zip(ranked, pages, items):
+            entry = RecommendationCursor(user_id, catalog, rows)
+            results.append(
+                RecommendationResponse(
+                    recommendations=page,
+                    next_cursor=RecommenderService._make_cursor(entry, item.top_k),
+                )
+            )
+
+        logger.info(
+            "Tempos da recomendação (ms)",
+            data={**timer.as_dict(), "cache": _results_cache.stats()},
+        )
+        return results
 
     @staticmethod
     async def recommend_by_audio_features(
         db: Session, features: AudioFeaturesInput, user: Optional[User] = None
-    ) -> list[TrackResponse]:
+    ) -> RecommendationResponse:
         """
         Gera recomendações baseadas em audio features usando o modelo KNN.
 
@@ -42,72 +578,150 @@ class RecommenderService:
             user: Usuário autenticado (opcional, necessário para buscar imagens)
 
         Returns:
-            Lista de TrackResponse com image_url preenchido (se user fornecido)
+            RecommendationResponse com até `features.top_k` faixas (image_url
+            preenchido se user fornecido) e o cursor da próxima página
+
+        Raises:
+            HTTPException 503: se o pool do recomendador estiver saturado
         """
-        model = loader.get_model()
-        scaler = loader.get_preprocessor()
-        model_features = loader.get_features()
+        result = (
+            await RecommenderService.recommend_batch(db, [features], user=user)
+        )[0]
+        logger.success(
+            "Recomendações Encontradas",
+            data=[t.name for t in result.recommendations[:5]],
+        )
+        return result
 
-        input_dict = {
-            "acousticness": features.acousticness,
-            "danceability": features.danceability,
-            "energy": features.energy,
-            "valence": features.valence,
-        }
+    @staticmethod
+    async def similar_tracks(
+        db: Session, track_id: int, top_k: int = 20, user: Optional[User] = None
+    ) -> RecommendationResponse:
+        """
+        Recomenda faixas parecidas com uma faixa do catálogo ("mais como esta").
 
-        input_df = pd.DataFrame([input_dict])
-        scaled_data = scaler.transform(input_df)
-        full_df = pd.DataFrame(scaled_data, columns=input_dict.keys())
+        Args:
+            db: Sessão do banco de dados
+            track_id: tracks.id da faixa de referência
+            top_k: Quantidade de faixas na primeira página
+            user: Usuário autenticado (opcional, necessário para buscar imagens)
 
-        full_df["is_popular"] = 1 if features.is_popular else 0
-        full_df["explicit"] = 1 if features.explicit else 0
+        Returns:
+            RecommendationResponse sem a própria faixa, com o cursor da
+            próxima página (se houver)
 
-        decades = [f"d_{d}s" for d in range(1920, 2030, 10)]
-        for d_col in decades:
-            model_dec_col = d_col.replace("d_", "")
-            full_df[model_dec_col] = (
-                1 if (features.decade and features.decade in d_col) else 0
-            )
+        Raises:
+            HTTPException 404: se a faixa não existir
+            HTTPException 503: se o pool do recomendador estiver saturado
+        """
+        timer = StageTimer()
+        user_id = user.id if user else None
+        catalog, rows, page = await recommender_pool.run(
+            with_session,
+            RecommenderService._similar_rows,
+            track_id,
+            top_k,
+            timer,
+            user_id,
+        )
 
-        input_final = full_df[model_features].values
-        distances, indices = model.kneighbors(input_final, n_neighbors=20)
+        await RecommenderService._attach_images(db, user, [page], timer)
 
-        id_map = RecommenderService.get_id_map(db)
+        entry = RecommendationCursor(user_id, catalog, rows)
+        logger.info("Tempos da recomendação por faixa (ms)", data=timer.as_dict())
+        return RecommendationResponse(
+            recommendations=page,
+            next_cursor=RecommenderService._make_cursor(entry, top_k),
+        )
 
-        recommended_ids = []
-        for idx in indices[0]:
-            if idx < len(id_map):
-                recommended_ids.append(id_map[idx])
+    @staticmethod
+    async def radio(
+        db: Session, payload: RadioInput, user: Optional[User] = None
+    ) -> RecommendationResponse:
+        """
+        Recomendações a partir de várias faixas de referência (rádio).
 
-        results = db.query(Track).filter(Track.spotify_id.in_(recommended_ids)).all()
-        logger.info(f"Geradas {len(results)} recomendações para audio features.")
-        logger.success(
-            "Recomendações Encontradas",
-            data=[t.name for t in results[:5]],
-        )
+        Args:
+            db: Sessão do banco de dados
+            payload: IDs internos das faixas ou ID de uma playlist do Spotify,
+                estratégia (centroide ou medoides) e `top_k`
+            user: Usuário autenticado (necessário para playlists e imagens)
+
+        Returns:
+            RecommendationResponse sem as faixas de referência, com o cursor
+            da próxima página (se houver)
 
-        images_map: dict[str, Optional[str]] = {}
-        if user and recommended_ids:
-            try:
-                images_response = await TracksService.get_track_images_mcp(
-                    user=user,
-                    db=db,
-                    track_ids=recommended_ids,
+        Raises:
+            HTTPException 400: se uma playlist for informada sem usuário
+            HTTPException 404: se nenhuma semente estiver no catálogo
+            HTTPException 503: se o pool do recomendador estiver saturado
+        """
+        timer = StageTimer()
+        spotify_ids = None
+        if payload.playlist_id:
+            if user is None:
+                raise HTTPException(
+                    status_code=400,
+                    detail="É necessário estar autenticado para usar uma playlist.",
                 )
-                if images_response.json:
-                    images_map = images_response.json.images
-                    logger.success(
-                        f"Imagens obtidas para {images_response.json.count} tracks"
-                    )
-            except Exception as e:
-                logger.warning(
-                    f"Não foi possível buscar imagens das tracks: {e}"
+            with timer.stage("playlist"):
+                response = await TracksService.get_playlist_tracks_mcp(
+                    user, db, payload.playlist_id, json_output=True, md_output=False
                 )
+            items = response.json.items if response.json else []
+            spotify_ids = [item.track.id for item in items if item.track]
+
+        user_id = user.id if user else None
+        catalog, rows, page = await recommender_pool.run(
+            with_session,
+            RecommenderService._radio_rows,
+            payload,
+            spotify_ids,
+            timer,
+            user_id,
+        )
+
+        await RecommenderService._attach_images(db, user, [page], timer)
 
-        track_responses = []
-        for track in results:
-            track_response = TrackResponse.model_validate(track)
-            track_response.image_url = images_map.get(track.spotify_id)
-            track_responses.append(track_response)
+        entry = RecommendationCursor(user_id, catalog, rows)
+        logger.info("Tempos da rádio (ms)", data=timer.as_dict())
+        return RecommendationResponse(
+            recommendations=page,
+            next_cursor=RecommenderService._make_cursor(entry, payload.top_k),
+        )
+
+    @staticmethod
+    async def get_page(
+        db: Session, cursor: str, limit: int, user: Optional[User] = None
+    ) -> RecommendationResponse:
+        """
+        Retorna a próxima página de uma recomendação anterior a partir da
+        lista de vizinhos em cache, sem refazer a busca.
+
+        Raises:
+            HTTPException 404: se o cursor for inválido, expirado ou de outro usuário
+        """
+        token, _, offset_str = cursor.partition(".")
+        entry = _cursors.get(token)
+        user_id = user.id if user else None
+        if entry is None or entry.user_id != user_id or not offset_str.isdigit():
+            raise HTTPException(
+                status_code=404,
+                detail="Cursor de recomendação inválido ou expirado. Refaça a busca.",
+            )
+
+        offset = int(offset_str)
+        timer = StageTimer()
+        with timer.stage("hydrate"):
+            page = entry.catalog.to_responses(entry.rows[offset : offset + limit])
 
-        return track_responses
+        await RecommenderService._attach_images(db, user, [page], timer)
+
+        next_offset = offset + limit
+        logger.info("Tempos da página de recomendação (ms)", data=timer.as_dict())
+        return RecommendationResponse(
+            recommendations=page,
+            next_cursor=(
+                f"{token}.{next_offset}" if next_offset < len(entry.rows) else None
+            ),
+        )
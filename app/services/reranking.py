@@ -0,0 +1,114 @@
+from typing import Optional
+
+import numpy as np
+
+
+def mmr_rerank(
+    vectors: np.ndarray,
+    distances: np.ndarray,
+    k: int,
+    diversity: float = 0.3,
+    artist_keys: Optional[np.ndarray] = None,
+    max_per_artist: int = 0,
+    pool_factor: int = 0,
+) -> np.ndarray:
+    """
+    Re-ranking por Maximal Marginal Relevance sobre os candidatos do KNN.
+
+    A cada passo escolhe o candidato que maximiza
+
+        (1 - diversity) * relevância - diversity * max(similaridade com os escolhidos)
+
+    onde relevância = 1 / (1 + distância à consulta) e similaridade =
+    1 / (1 + distância entre candidatos). A matriz de penalidades
+    (diversity * similaridade) é calculada uma única vez a partir de um
+    produto de matrizes; cada passo faz só três operações O(n) em NumPy.
+    Bloquear um artista custa O(faixas dele), não O(n).
+
+    Com `max_per_artist` > 0, um artista que atinge o limite tem os demais
+    candidatos descartados, então a lista pode ter menos de `k` itens.
+
+    Com `pool_factor` > 0, só os `pool_factor * k` candidatos mais relevantes
+    entram no MMR. O custo da matriz é quadrático no número de candidatos e
+    o do laço, linear em `k`; limitar o pool mantém a latência independente
+    do overfetch (ver scripts/benchmark_mmr.py).
+
+    Args:
+        vectors: Vetores dos candidatos, shape (n, dim)
+        distances: Distância (ou score, menor é melhor) de cada candidato
+        k: Quantidade de itens a selecionar
+        diversity: Peso da diversidade entre 0 (só relevância) e 1
+        artist_keys: Identificador do artista principal de cada candidato
+        max_per_artist: Limite de faixas por artista (0 = sem limite)
+        pool_factor: Candidatos considerados, em múltiplos de `k` (0 = todos)
+
+    Returns:
+        Posições dos candidatos selecionados, na ordem final.
+    """
+    n = len(distances)
+    k = min(k, n)
+    if k <= 0:
+        return np.empty(0, dtype=np.intp)
+
+    if pool_factor > 0 and n > pool_factor * k:
+        pool = np.sort(np.argpartition(distances, pool_factor * k - 1)[: pool_factor * k])
+        order = mmr_rerank(
+            np.asarray(vectors)[pool],
+            np.asarray(distances)[pool],
+            k,
+            diversity=diversity,
+            artist_keys=None if artist_keys is None else np.asarray(artist_keys)[pool],
+            max_per_artist=max_per_artist,
+        )
+        return pool[order]
+
+    vectors = np.asarray(vectors, dtype=np.float32)
+    relevance = 1.0 / (1.0 + np.asarray(distances, dtype=np.float32))
+
+    # penalidade[i, j] = diversity / (1 + ||v_i - v_j||), calculada in-place em float32.
+    # Sem diversidade (só limite por artista), a matriz não é necessária.
+    penalty_matrix = None
+    if diversity > 0:
+        sq = np.einsum("ij,ij->i", vectors, vectors)
+        penalty_matrix = (vectors * -2.0) @ vectors.T
+        penalty_matrix += sq[:, None]
+        penalty_matrix += sq[None, :]
+        np.maximum(penalty_matrix, 0.0, out=penalty_matrix)
+        np.sqrt(penalty_matrix, out=penalty_matrix)
+        penalty_matrix += 1.0
+        np.divide(np.float32(diversity), penalty_matrix, out=penalty_matrix)
+
+    # Relevância ponderada; vira -inf quando o candidato é escolhido ou bloqueado
+    base = ((1.0 - diversity) * relevance).astype(np.float32)
+    penalty = np.zeros(n, dtype=np.float32)
+    scores = np.empty(n, dtype=np.float32)
+
+    capped = max_per_artist > 0 and artist_keys is not None
+    if capped:
+        # Candidatos agrupados por artista: bloquear um artista custa O(faixas dele)
+        _, artist_idx = np.unique(np.asarray(artist_keys), return_inverse=True)
+        artist_of = artist_idx.tolist()
+        by_artist = np.argsort(artist_idx, kind="stable")
+        bounds = np.cumsum(np.bincount(artist_idx)).tolist()
+        artist_counts = [0] * len(bounds)
+
+    selected = []
+    for _ in range(k):
+        np.subtract(base, penalty, out=scores)
+        best = int(np.argmax(scores))
+        if scores[best] == -np.inf:
+            break
+
+        selected.append(best)
+        base[best] = -np.inf
+        if penalty_matrix is not None:
+            np.maximum(penalty, penalty_matrix[best], out=penalty)
+
+        if capped:
+            artist = artist_of[best]
+            artist_counts[artist] += 1
+            if artist_counts[artist] >= max_per_artist:
+                start = bounds[artist - 1] if artist else 0
+                base[by_artist[start : bounds[artist]]] = -np.inf
+
+    return np.array(selected, dtype=np.intp)
@@ -1,46 +1,39 @@
+import asyncio
+import time
 import httpx
-import json
 from contextlib import asynccontextmanager
-from typing import Any
+from typing import Any, Optional, Type
+from pydantic import BaseModel
 from sqlalchemy.orm import Session
 from fastapi import HTTPException
 
-from mcp import ClientSession
-from mcp.client.sse import sse_client
-
+from app.core.cache import SingleFlight
 from app.core.config import settings
 from app.models.user import User
 from app.core.logger import logger
+from app.services.mcp_cache import (
+    COALESCED_TOOLS,
+    MISS,
+    mcp_cache,
+    normalize_arguments,
+)
+from app.services.mcp_decoder import decode_tool_result
+from app.services.mcp_pool import mcp_pool
+
+# Chamadas somente leitura idênticas em andamento (mesmo usuário/ferramenta/args)
+_in_flight = SingleFlight()
 
 
 class SpotifyMCPService:
     @staticmethod
     @asynccontextmanager
     async def connect():
-        last_error = None
-        for attempt in range(3):
-            try:
-                async with sse_client(settings.MCP_SERVER_URL, timeout=120.0) as (
-                    read,
-                    write,
-                ):
-                    async with ClientSession(read, write) as session:
-                        await session.initialize()
-                        yield session
-                        return
-            except Exception as e:
-                logger.warning(
-                    f"Tentativa {attempt + 1}/3 de conectar ao MCP falhou", data=str(e)
-                )
-                last_error = e
-                import asyncio
-
-                await asyncio.sleep(1 * (attempt + 1))
-
-        logger.error("Erro ao conectar no MCP após 3 tentativas", error=last_error)
-        raise HTTPException(
-            status_code=503, detail="Serviço de Agente Spotify indisponível"
-        )
+        """
+        Empresta uma sessão MCP já inicializada do pool (mcp_pool), devolvida
+        ao final do bloco. Falhas ao conectar viram HTTPException 503.
+        """
+        async with mcp_pool.session() as session:
+            yield session
 
     @staticmethod
     async def _refresh_spotify_token(user: User, db: Session) -> str:
@@ -103,109 +96,168 @@ class SpotifyMCPService:
             result = await session.list_tools()
             return result.tools
 
+    @staticmethod
+    async def _access_token(user: User, db: Session) -> str:
+        token = user.spotify_access_token
+        if not token:
+            token = await SpotifyMCPService._refresh_spotify_token(user, db)
+        return token
+
     @staticmethod
     async def call_tool(
-        tool_name: str, user: User, db: Session, arguments: dict = None
+        tool_name: str,
+        user: User,
+        db: Session,
+        arguments: dict = None,
+        response_model: Optional[Type[BaseModel]] = None,
     ) -> Any:
         """
         Chama uma ferramenta específica injetando o token do usuário.
+
+        Com `response_model`, o JSON da ferramenta é validado direto para o
+        modelo (ex.: PlaylistsMCPResponse); sem ele, devolve
+        {"md": ..., "json": ...}.
+
+        Ferramentas somente leitura de CACHED_TOOLS são servidas do mcp_cache
+        enquanto válidas; ferramentas de escrita invalidam as respostas da
+        mesma playlist (ou biblioteca/dispositivos) do usuário. Chamadas
+        idênticas de COALESCED_TOOLS feitas ao mesmo tempo compartilham uma
+        única execução no MCP. O token é resolvido antes, com a sessão de
+        banco de cada chamador: a execução compartilhada não usa `db` nem o
+        objeto `user` de quem a iniciou.
         """
         if arguments is None:
             arguments = {}
 
-        token = user.spotify_access_token
+        cached = mcp_cache.get(user.id, tool_name, arguments, response_model)
+        if cached is not MISS:
+            return cached
 
-        if not token:
-            token = await SpotifyMCPService._refresh_spotify_token(user, db)
+        user_id = user.id
+        token = await SpotifyMCPService._access_token(user, db)
 
+        if tool_name in COALESCED_TOOLS:
+            key = (user_id, tool_name, normalize_arguments(arguments), response_model)
+            return await _in_flight.run(
+                key,
+                lambda: SpotifyMCPService._execute(
+                    tool_name, user_id, token, dict(arguments), response_model
+                ),
+            )
+        return await SpotifyMCPService._execute(
+            tool_name, user_id, token, arguments, response_model
+        )
+
+    @staticmethod
+    async def _execute(
+        tool_name: str,
+        user_id: int,
+        token: str,
+        arguments: dict,
+        response_model: Optional[Type[BaseModel]],
+    ) -> Any:
+        cache_key = mcp_cache.key(user_id, tool_name, arguments, response_model)
         arguments["_accessToken"] = token
 
-        response_data = None
-        mcp_error_msg = None
-        execution_error = None
-        
         async with SpotifyMCPService.connect() as session:
-            try:
-                result = await session.call_tool(tool_name, arguments)
-
-                if result.content and len(result.content) > 0:
-                    response_data = {"md": None, "json": None}
-
-                    for c in result.content:
-                        if not hasattr(c, "text"):
-                            continue
-
-                        text_content = c.text
-                        text_stripped = text_content.strip()
-
-                        error_patterns = (
-                            "Error:",
-                            "Error ",
-                            "Failed to",
-                            "Unable to",
-                            "Cannot ",
-                            "Could not",
-                            "Bad OAuth request",
-                            "MCP error",
-                        )
-                        if text_stripped.startswith(error_patterns):
-                            mcp_error_msg = text_stripped
-                            logger.error(
-                                f"Erro retornado pela ferramenta {tool_name}",
-                                error=mcp_error_msg,
-                            )
-
-                        is_json = False
-                        if text_stripped.startswith("{") and text_stripped.endswith("}"):
-                            try:
-                                json_content = json.loads(text_content)
-                                response_data["json"] = json_content
-                                is_json = True
-                                
-                                if isinstance(json_content, dict) and "error" in json_content:
-                                    mcp_error_msg = text_content 
-                                    
-                            except json.JSONDecodeError:
-                                pass
-                        
-                        elif text_stripped.startswith("[") and text_stripped.endswith("]"):
-                            try:
-                                response_data["json"] = json.loads(text_content)
-                                is_json = True
-                            except json.JSONDecodeError:
-                                pass
-
-                        if not is_json:
-                            response_data["md"] = text_content
-                else:
-                    response_data = {"md": "Sem resposta da ferramenta.", "json": None}
-
-            except Exception as e:
-                execution_error = e
-                logger.error(f"Erro na execução da ferramenta {tool_name}", error=e)
-
-        if execution_error:
-            raise HTTPException(
-                status_code=500,
-                detail=f"Erro ao executar ação no Spotify: {str(execution_error)}",
+            result = await SpotifyMCPService._run_tool(
+                session, tool_name, arguments, response_model
+            )
+
+        SpotifyMCPService._remember(user_id, tool_name, arguments, cache_key, result)
+        return result
+
+    @staticmethod
+    def in_flight_stats() -> dict:
+        return _in_flight.stats()
+
+    @staticmethod
+    def _remember(
+        user_id: int, tool_name: str, arguments: dict, cache_key: Any, result: Any
+    ) -> None:
+        """Guarda a resposta no cache ou invalida o que a escrita alterou."""
+        mcp_cache.set(cache_key, result)
+        mcp_cache.observe_write(user_id, tool_name, arguments)
+
+    @staticmethod
+    async def call_tools_batch(calls: list[tuple], user: User, db: Session) -> list[Any]:
+        """
+        Executa várias ferramentas concorrentemente sobre uma única sessão MCP.
+
+        Args:
+            calls: Lista de (nome da ferramenta, argumentos) ou
+                (nome da ferramenta, argumentos, response_model)
+            user: Usuário autenticado com token Spotify
+            db: Sessão do banco de dados
+
+        Returns:
+            Lista na mesma ordem de `calls`, com o resultado de cada chamada
+            (como em call_tool) ou a exceção (HTTPException) que ela gerou.
+            Uma chamada com erro não interrompe as demais.
+        """
+        calls = [
+            (call[0], call[1] or {}, call[2] if len(call) > 2 else None)
+            for call in calls
+        ]
+        results = [mcp_cache.get(user.id, *call) for call in calls]
+        pending = [i for i, result in enumerate(results) if result is MISS]
+        if not pending:
+            return results
+        cache_keys = {i: mcp_cache.key(user.id, *calls[i]) for i in pending}
+
+        token = await SpotifyMCPService._access_token(user, db)
+
+        async with SpotifyMCPService.connect() as session:
+            fetched = await asyncio.gather(
+                *[
+                    SpotifyMCPService._run_tool(
+                        session,
+                        calls[i][0],
+                        {**calls[i][1], "_accessToken": token},
+                        calls[i][2],
+                    )
+                    for i in pending
+                ],
+                return_exceptions=True,
             )
 
-        if mcp_error_msg:
-            if "Forbidden" in mcp_error_msg or "403" in mcp_error_msg:
-                 raise HTTPException(
-                    status_code=403,
-                    detail="Permissão negada pelo Spotify. Verifique se você é o dono da playlist.",
+        for i, result in zip(pending, fetched):
+            results[i] = result
+            if not isinstance(result, BaseException):
+                tool_name, arguments, _ = calls[i]
+                SpotifyMCPService._remember(
+                    user.id, tool_name, arguments, cache_keys[i], result
                 )
-            
+        return results
+
+    @staticmethod
+    async def _run_tool(
+        session,
+        tool_name: str,
+        arguments: dict,
+        response_model: Optional[Type[BaseModel]] = None,
+    ) -> Any:
+        """
+        Executa uma ferramenta na sessão informada e decodifica o resultado
+        (ver decode_tool_result).
+
+        Raises:
+            HTTPException 500: falha na execução da chamada
+            HTTPException 403/400/502: erro retornado pela ferramenta
+        """
+        start = time.perf_counter()
+        try:
+            result = await session.call_tool(tool_name, arguments)
+        except Exception as e:
+            mcp_pool.invalidate(session)
+            logger.error(f"Erro na execução da ferramenta {tool_name}", error=e)
             raise HTTPException(
-                status_code=400,
-                detail=mcp_error_msg,
+                status_code=500,
+                detail=f"Erro ao executar ação no Spotify: {str(e)}",
             )
 
-        if response_data:
-            logger.success(
-                f"Resultado da Ferramenta ({tool_name})", data=response_data
-            )
-            return response_data
-        
-        return {"md": "Sem resposta da ferramenta.", "json": None}
+        response = decode_tool_result(tool_name, result, response_model)
+        logger.info(
+            f"Ferramenta {tool_name} concluída em {(time.perf_counter() - start) * 1000:.0f} ms"
+        )
+        return response
@@ -6,6 +6,7 @@ from app.models.track_preference import TrackPreference
 from app.models.track_behavior import TrackBehavior, InteractionType
 from app.schemas.track_interaction import InteractionTypeEnum, InteractionResponse
 from app.models.user import User
+from app.services.user_signals import invalidate_user_signals
 
 from app.core.logger import logger
 
@@ -89,6 +90,7 @@ class TrackActionsService:
         )
 
         db.commit()
+        invalidate_user_signals(user.id)
 
         logger.success(
             "Ação Registrada",
@@ -0,0 +1,453 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+import zlib
+from datetime import datetime, timezone
+from typing import Optional, Sequence
+
+import numpy as np
+from sqlalchemy import asc, func
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.logger import logger
+from app.models.track import Track
+from app.schemas.recommendation import AudioFeaturesInput
+from app.schemas.tracks import TrackResponse
+import app.services.model_loader as loader
+
+CATALOG_DIR = os.path.join(loader.MODELS_DIR, "catalog")
+CURRENT_FILE = "CURRENT"
+MANIFEST_FILE = "manifest.json"
+# Versões mantidas em disco: durante uma troca de modelo, workers em versões
+# diferentes não apagam o catálogo uns dos outros
+KEEP_VERSIONS = 3
+# Incrementar quando o layout das colunas mudar, forçando a reconstrução
+CATALOG_FORMAT = 3
+
+# Audio features em float64 para devolver exatamente os valores do banco
+NUMERIC_COLUMNS = {
+    "track_id": np.int64,
+    "duration_ms": np.int32,
+    "energy": np.float64,
+    "danceability": np.float64,
+    "valence": np.float64,
+    "acousticness": np.float64,
+    "instrumentalness": np.float64,
+    "speechiness": np.float64,
+    "explicit": np.bool_,
+    "is_popular": np.bool_,
+    "decade": np.int16,
+    # crc32 do artista principal, usado para limitar faixas por artista
+    "artist_key": np.int64,
+}
+STRING_COLUMNS = ("name", "artists")
+DECADE_COLUMNS = [(d, f"d_{d}s") for d in range(1920, 2030, 10)]
+
+
+def primary_artist(artists: str) -> str:
+    """
+    Primeiro artista de `tracks.artists`, guardado no formato de lista do
+    dataset (ex.: "['Queen', 'David Bowie']"), normalizado em minúsculas.
+    """
+    text = artists.strip()
+    if text.startswith("["):
+        text = text[1:]
+    quote = text[:1]
+    if quote in ("'", '"'):
+        end = text.find(quote, 1)
+        return text[1 : end if end > 0 else None].strip().lower()
+    return text.split(",")[0].strip().rstrip("]").strip().lower()
+
+
+class TrackCatalog:
+    """
+    Colunas das faixas alinhadas ao índice do modelo KNN: a linha `i` do
+    catálogo corresponde à linha `i` da matriz do modelo (faixas ordenadas
+    por `tracks.id`).
+
+    As colunas ficam em arquivos `.npy` ao lado do modelo e são abertas com
+    `mmap_mode="r"`, então workers do mesmo host compartilham as páginas.
+    """
+
+    def __init__(self, directory: str, manifest: dict, columns: dict[str, np.ndarray]):
+        self.directory = directory
+        self.manifest = manifest
+        self.version: str = manifest["version"]
+        self.columns = columns
+        self.track_ids: np.ndarray = columns["track_id"]
+        self.spotify_ids: np.ndarray = columns["spotify_id"]
+
+    def __len__(self) -> int:
+        return self.track_ids.shape[0]
+
+    def row_for(self, track_id: int) -> Optional[int]:
+        """Linha do catálogo de um tracks.id (busca binária), ou None se ausente."""
+        row = int(np.searchsorted(self.track_ids, track_id))
+        if row < len(self) and self.track_ids[row] == track_id:
+            return row
+        return None
+
+    def features_for(self, row: int) -> AudioFeaturesInput:
+        """Audio features de uma linha no formato de entrada do recomendador."""
+        c = self.columns
+        decade = int(c["decade"][row])
+        return AudioFeaturesInput(
+            energy=float(c["energy"][row]),
+            danceability=float(c["danceability"][row]),
+            valence=float(c["valence"][row]),
+            acousticness=float(c["acousticness"][row]),
+            is_popular=bool(c["is_popular"][row]),
+            explicit=bool(c["explicit"][row]),
+            decade=str(decade) if decade else None,
+        )
+
+    def spotify_ids_for(self, rows: Sequence[int]) -> list[str]:
+        """Converte linhas do índice em spotify_ids, ignorando linhas fora do catálogo."""
+        size = len(self)
+        return [self.spotify_ids[row].decode() for row in rows if 0 <= row < size]
+
+    def text(self, column: str, row: int) -> str:
+        """Lê uma coluna de texto guardada como tabela de offsets + bytes UTF-8."""
+        offsets = self.columns[f"{column}.offsets"]
+        data = self.columns[f"{column}.data"]
+        return data[offsets[row] : offsets[row + 1]].tobytes().decode()
+
+    def to_responses(self, rows: Sequence[int]) -> list[TrackResponse]:
+        """
+        Monta TrackResponse direto das colunas, preservando a ordem de `rows`
+        (ordem de distância do KNN), sem consultar o banco.
+        """
+        size = len(self)
+        c = self.columns
+        responses = []
+        for row in rows:
+            if not 0 <= row < size:
+                continue
+            responses.append(
+                TrackResponse(
+                    id=int(c["track_id"][row]),
+                    spotify_id=c["spotify_id"][row].decode(),
+                    name=self.text("name", row),
+                    artists=self.text("artists", row),
+                    duration_ms=int(c["duration_ms"][row]),
+                    energy=float(c["energy"][row]),
+                    danceability=float(c["danceability"][row]),
+                    valence=float(c["valence"][row]),
+                    acousticness=float(c["acousticness"][row]),
+                    instrumentalness=float(c["instrumentalness"][row]),
+                    speechiness=float(c["speechiness"][row]),
+                    explicit=bool(c["explicit"][row]),
+                )
+            )
+        return responses
+
+    # --- Versionamento ---
+
+    @staticmethod
+    def current_stamp(db: Session, model_version: Optional[str] = None) -> dict:
+        """
+        Estado atual da tabela tracks e do modelo, usado para detectar mudanças.
+        `model_version` permite montar o catálogo antes do modelo terminar de
+        carregar (warm-up); por padrão usa a versão ativa.
+        """
+        count, min_id, max_id = db.query(
+            func.count(Track.id), func.min(Track.id), func.max(Track.id)
+        ).one()
+        return {
+            "format": CATALOG_FORMAT,
+            "model_version": model_version or loader.get_version(),
+            "track_count": int(count),
+            "min_track_id": int(min_id or 0),
+            "max_track_id": int(max_id or 0),
+        }
+
+    @staticmethod
+    def version_for(stamp: dict) -> str:
+        payload = json.dumps(stamp, sort_keys=True).encode()
+        return hashlib.sha1(payload).hexdigest()[:16]
+
+    # --- Persistência ---
+
+    @classmethod
+    def open(cls, directory: str) -> "TrackCatalog":
+        with open(os.path.join(directory, MANIFEST_FILE)) as f:
+            manifest = json.load(f)
+        columns = {
+            name: np.load(os.path.join(directory, f"{name}.npy"), mmap_mode="r")
+            for name in manifest["columns"]
+        }
+        return cls(directory, manifest, columns)
+
+    @staticmethod
+    def _read_columns(db: Session, after_id: int = 0) -> dict[str, np.ndarray]:
+        """Lê as colunas das faixas com id > `after_id`, ordenadas por id."""
+        numeric = {name: [] for name in NUMERIC_COLUMNS}
+        strings = {name: [] for name in ("spotify_id", *STRING_COLUMNS)}
+
+        query = (
+            db.query(
+                Track.id,
+                Track.spotify_id,
+                Track.name,
+                Track.artists,
+                Track.duration_ms,
+                Track.energy,
+                Track.danceability,
+                Track.valence,
+                Track.acousticness,
+                Track.instrumentalness,
+                Track.speechiness,
+                Track.explicit,
+                Track.is_popular,
+                *[getattr(Track, col) for _, col in DECADE_COLUMNS],
+            )
+            .filter(Track.id > after_id)
+            .order_by(asc(Track.id))
+            .execution_options(yield_per=10000)
+        )
+        for row in query:
+            numeric["track_id"].append(row.id)
+            strings["spotify_id"].append(row.spotify_id)
+            strings["name"].append(row.name or "")
+            strings["artists"].append(row.artists or "")
+            for name in NUMERIC_COLUMNS:
+                if name not in ("track_id", "decade", "artist_key"):
+                    numeric[name].append(getattr(row, name) or 0)
+            numeric["decade"].append(
+                next((d for d, col in DECADE_COLUMNS if getattr(row, col)), 0)
+            )
+            numeric["artist_key"].append(
+                zlib.crc32(primary_artist(row.artists or "").encode())
+            )
+
+        columns = {
+            name: np.array(values, dtype=NUMERIC_COLUMNS[name])
+            for name, values in numeric.items()
+        }
+        width = max((len(s) for s in strings["spotify_id"]), default=1)
+        columns["spotify_id"] = np.array(strings["spotify_id"], dtype=f"S{width}")
+
+        for name in STRING_COLUMNS:
+            encoded = [value.encode() for value in strings[name]]
+            offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+            np.cumsum(
+                np.array([len(b) for b in encoded], dtype=np.int64), out=offsets[1:]
+            )
+            columns[f"{name}.offsets"] = offsets
+            columns[f"{name}.data"] = np.frombuffer(b"".join(encoded), dtype=np.uint8)
+
+        return columns
+
+    @classmethod
+    def _append_columns(
+        cls, previous: "TrackCatalog", db: Session, stamp: dict
+    ) -> Optional[dict[str, np.ndarray]]:
+        """
+        Colunas do catálogo anterior acrescidas das faixas importadas depois
+        dele (id maior que o último do catálogo); quando só a versão do
+        modelo mudou, reaproveita as colunas. Retorna None se a tabela
+        mudou de outra forma (remoções, ids fora de ordem ou outro formato),
+        caso em que o catálogo precisa ser lido inteiro.
+        """
+        manifest = previous.manifest
+        if (
+            manifest.get("format") != stamp["format"]
+            or manifest.get("min_track_id") != stamp["min_track_id"]
+            or manifest.get("track_count") != len(previous)
+            or manifest.get("max_track_id", 0) > stamp["max_track_id"]
+        ):
+            return None
+
+        new = cls._read_columns(db, after_id=manifest["max_track_id"])
+        if len(previous) + len(new["track_id"]) != stamp["track_count"]:
+            return None
+
+        old = previous.columns
+        columns = {
+            name: np.concatenate([old[name], new[name]]) for name in NUMERIC_COLUMNS
+        }
+        width = max(old["spotify_id"].dtype.itemsize, new["spotify_id"].dtype.itemsize)
+        columns["spotify_id"] = np.concatenate(
+            [old["spotify_id"], new["spotify_id"]]
+        ).astype(f"S{width}")
+        for name in STRING_COLUMNS:
+            offsets, data = old[f"{name}.offsets"], old[f"{name}.data"]
+            columns[f"{name}.offsets"] = np.concatenate(
+                [offsets, new[f"{name}.offsets"][1:] + offsets[-1]]
+            )
+            columns[f"{name}.data"] = np.concatenate([data, new[f"{name}.data"]])
+
+        if len(new["track_id"]):
+            logger.info(
+                f"Catálogo estendido com {len(new['track_id'])} faixas novas "
+                f"(id > {manifest['max_track_id']})."
+            )
+        return columns
+
+    @classmethod
+    def open_current(cls, base_dir: str = CATALOG_DIR) -> Optional["TrackCatalog"]:
+        try:
+            with open(os.path.join(base_dir, CURRENT_FILE)) as f:
+                version = f.read().strip()
+            return cls.open(os.path.join(base_dir, version))
+        except (OSError, ValueError, KeyError):
+            return None
+
+    @classmethod
+    def build(
+        cls, db: Session, stamp: dict, base_dir: str = CATALOG_DIR
+    ) -> "TrackCatalog":
+        """
+        Lê as faixas do banco e grava o catálogo em `base_dir/<versão>/`.
+        Se só houve faixas novas desde o catálogo atual (importação
+        incremental), lê do banco apenas essas faixas. A gravação ocorre em
+        um diretório temporário renomeado ao final, e o ponteiro CURRENT é
+        trocado com os.replace, então workers concorrentes nunca enxergam um
+        catálogo pela metade.
+        """
+        version = cls.version_for(stamp)
+        target = os.path.join(base_dir, version)
+        os.makedirs(base_dir, exist_ok=True)
+
+        if not os.path.exists(os.path.join(target, MANIFEST_FILE)):
+            previous = cls.open_current(base_dir)
+            columns = None
+            if previous is not None:
+                columns = cls._append_columns(previous, db, stamp)
+            if columns is None:
+                columns = cls._read_columns(db)
+            manifest = {
+                **stamp,
+                "version": version,
+                "built_at": datetime.now(timezone.utc).isoformat(),
+                "columns": list(columns.keys()),
+            }
+
+            tmp_dir = tempfile.mkdtemp(prefix=f".{version}-", dir=base_dir)
+            for name, values in columns.items():
+                np.save(os.path.join(tmp_dir, f"{name}.npy"), values)
+            with open(os.path.join(tmp_dir, MANIFEST_FILE), "w") as f:
+                json.dump(manifest, f)
+            try:
+                os.rename(tmp_dir, target)
+            except OSError:
+                # Outro worker publicou a mesma versão primeiro
+                shutil.rmtree(tmp_dir, ignore_errors=True)
+
+        tmp_pointer = os.path.join(base_dir, f".{CURRENT_FILE}.{os.getpid()}")
+        with open(tmp_pointer, "w") as f:
+            f.write(version)
+        os.replace(tmp_pointer, os.path.join(base_dir, CURRENT_FILE))
+
+        catalog = cls.open(target)
+        cls._remove_stale_versions(base_dir, keep=version)
+        return catalog
+
+    @staticmethod
+    def _remove_stale_versions(base_dir: str, keep: str) -> None:
+        """
+        Remove as versões além das KEEP_VERSIONS mais recentes (pela data do
+        manifest), preservando sempre `keep` e a apontada por CURRENT.
+        Workers que ainda mapeiam os arquivos removidos continuam com acesso
+        às páginas até recarregarem o catálogo.
+        """
+        protected = {keep}
+        try:
+            with open(os.path.join(base_dir, CURRENT_FILE)) as f:
+                protected.add(f.read().strip())
+        except OSError:
+            pass
+
+        versions = []
+        for entry in os.listdir(base_dir):
+            manifest = os.path.join(base_dir, entry, MANIFEST_FILE)
+            if entry.startswith(".") or not os.path.exists(manifest):
+                continue
+            try:
+                versions.append((os.path.getmtime(manifest), entry))
+            except OSError:
+                continue
+
+        versions.sort(reverse=True)
+        for _, entry in versions[KEEP_VERSIONS:]:
+            if entry not in protected:
+                shutil.rmtree(os.path.join(base_dir, entry), ignore_errors=True)
+
+
+class TrackCatalogStore:
+    """
+    Mantém o catálogo do processo e verifica periodicamente (a cada
+    TRACK_CATALOG_CHECK_INTERVAL segundos) se a tabela tracks ou o modelo
+    mudaram, reconstruindo o catálogo quando necessário.
+    """
+
+    def __init__(self):
+        self._catalog: Optional[TrackCatalog] = None
+        self._checked_at = 0.0
+        # Só serializa a troca/reconstrução; a verificação não bloqueia
+        self._build_lock = threading.Lock()
+
+    def get(self, db: Session, model_version: Optional[str] = None) -> TrackCatalog:
+        """
+        Catálogo atual. Enquanto uma thread reconstrói o catálogo, as demais
+        seguem com a versão anterior; só esperam se ainda não houver nenhuma.
+        """
+        catalog = self._catalog
+        if (
+            catalog is not None
+            and time.monotonic() - self._checked_at < settings.TRACK_CATALOG_CHECK_INTERVAL
+        ):
+            return catalog
+
+        stamp = TrackCatalog.current_stamp(db, model_version)
+        version = TrackCatalog.version_for(stamp)
+        if catalog is not None and catalog.version == version:
+            self._checked_at = time.monotonic()
+            return catalog
+
+        if not self._build_lock.acquire(blocking=catalog is None):
+            return catalog
+        try:
+            current = self._catalog
+            if current is not None and current.version == version:
+                return current
+
+            catalog = TrackCatalog.open_current()
+            if catalog is None or catalog.version != version:
+                logger.info("Construindo catálogo de faixas a partir do banco...")
+                catalog = TrackCatalog.build(db, stamp)
+
+            index_size = loader.get_index().size
+            if len(catalog) != index_size:
+                logger.warning(
+                    f"Catálogo com {len(catalog)} faixas, mas o índice KNN tem "
+                    f"{index_size} linhas. Recomendações podem ficar desalinhadas."
+                )
+            logger.info(
+                f"Catálogo de faixas {catalog.version} carregado com {len(catalog)} faixas."
+            )
+            self._catalog = catalog
+            self._checked_at = time.monotonic()
+            return catalog
+        finally:
+            self._build_lock.release()
+
+    def invalidate(self) -> None:
+        """Força a verificação de versão na próxima chamada."""
+        self._checked_at = 0.0
+
+
+_store = TrackCatalogStore()
+
+
+def get_catalog(db: Session, model_version: Optional[str] = None) -> TrackCatalog:
+    return _store.get(db, model_version)
+
+
+def invalidate_catalog() -> None:
+    _store.invalidate()
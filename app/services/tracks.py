@@ -1,12 +1,28 @@
+from datetime import datetime, timezone
+from typing import Optional
+
+from fastapi import HTTPException
 from sqlalchemy.orm import Session
 from sqlalchemy import func, text
 from app.models.track import Track
+from app.models.track_image import TrackImage
 
 from app.schemas.tracks import PlaylistTracksMCPResponse, TrackImagesMCPResponse
+from app.services.image_enrichment import image_enrichment
 from app.services.spotify_mcp import SpotifyMCPService
 from app.models.user import User
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.executor import recommender_pool
 from app.core.logger import logger
 
+# Capas mudam raramente: LRU do processo na frente da tabela track_images
+_images_cache = TTLCache(
+    maxsize=settings.TRACK_IMAGES_CACHE_SIZE, ttl=settings.TRACK_IMAGES_TTL
+)
+_MISSING = object()
+
 
 class TracksService:
     @staticmethod
@@ -26,16 +42,169 @@ class TracksService:
         Returns:
             TrackImagesMCPResponse com o dicionário de imagens
         """
-        result_dict = await SpotifyMCPService.call_tool(
+        return await SpotifyMCPService.call_tool(
             "getTrackImages",
             user,
             db,
             {
                 "trackIds": track_ids,
             },
+            response_model=TrackImagesMCPResponse,
         )
-        logger.success("Resposta MCP Track Images", data=result_dict)
-        return TrackImagesMCPResponse(**result_dict)
+
+    @staticmethod
+    async def get_track_images(
+        user: Optional[User],
+        db: Session,
+        spotify_ids: list[str],
+        wait: bool = True,
+    ) -> dict[str, Optional[str]]:
+        """
+        URLs de capa por spotify_id, consultando em ordem o LRU do processo,
+        a tabela track_images (entradas com menos de TRACK_IMAGES_TTL
+        segundos) e, só para as faixas ausentes, o getTrackImages via MCP em
+        lotes de TRACK_IMAGES_BATCH_SIZE. Faixas sem capa no Spotify ficam
+        com None e também são guardadas.
+
+        Falhas do MCP não propagam: as faixas do lote afetado ficam de fora
+        do resultado (sem imagem) e são buscadas de novo na próxima chamada.
+        Uma falha ao ler track_images (banco ou pool saturado) conta como
+        cache vazio.
+
+        Com `wait=False`, devolve só o que está em cache e agenda as ausentes
+        no worker de enriquecimento, sem esperar o MCP. Se o worker não está
+        rodando (TRACK_IMAGES_ASYNC=false), busca as ausentes na hora, como
+        com `wait=True`.
+        """
+        images: dict[str, Optional[str]] = {}
+        missing = []
+        for spotify_id in dict.fromkeys(spotify_ids):
+            image_url = _images_cache.get(spotify_id, _MISSING)
+            if image_url is _MISSING:
+                missing.append(spotify_id)
+            else:
+                images[spotify_id] = image_url
+
+        if missing:
+            try:
+                stored = await recommender_pool.run(
+                    TracksService._load_stored_images, missing
+                )
+            except Exception as e:
+                logger.warning(f"Não foi possível ler capas de track_images: {e}")
+                stored = {}
+            images.update(stored)
+            missing = [spotify_id for spotify_id in missing if spotify_id not in stored]
+
+        if missing and user and not wait and image_enrichment.running:
+            image_enrichment.enqueue(user.id, missing)
+        elif missing and user:
+            fetched = await TracksService._fetch_track_images(user, db, missing)
+            if fetched:
+                await TracksService.store_images(fetched)
+                images.update(fetched)
+
+        return images
+
+    @staticmethod
+    async def store_images(images: dict[str, Optional[str]]) -> None:
+        """Grava as capas fora do event loop; falhas só geram aviso."""
+        try:
+            await recommender_pool.run(TracksService._store_images, images)
+        except HTTPException as e:
+            logger.warning(f"Capas não foram salvas em track_images: {e.detail}")
+
+    @staticmethod
+    def _load_stored_images(spotify_ids: list[str]) -> dict[str, Optional[str]]:
+        """
+        Capas ainda válidas da tabela track_images, já copiadas para o LRU.
+        Roda no pool com sessão própria: a thread pode terminar depois que a
+        sessão da requisição foi fechada.
+        """
+        now = datetime.now(timezone.utc)
+        stored = {}
+        db = SessionLocal()
+        try:
+            rows = (
+                db.query(TrackImage.spotify_id, TrackImage.image_url, TrackImage.updated_at)
+                .filter(TrackImage.spotify_id.in_(spotify_ids))
+                .all()
+            )
+        finally:
+            db.close()
+        for spotify_id, image_url, updated_at in rows:
+            if updated_at is None:
+                continue
+            if updated_at.tzinfo is None:
+                updated_at = updated_at.replace(tzinfo=timezone.utc)
+            remaining = settings.TRACK_IMAGES_TTL - (now - updated_at).total_seconds()
+            if remaining > 0:
+                stored[spotify_id] = image_url
+                _images_cache.set(spotify_id, image_url, ttl=remaining)
+        return stored
+
+    @staticmethod
+    async def _fetch_track_images(
+        user: User, db: Session, spotify_ids: list[str]
+    ) -> dict[str, Optional[str]]:
+        """
+        Busca as capas via MCP em lotes concorrentes sobre uma única sessão.
+        Falhas antes dos lotes (token sem refresh, MCP indisponível) viram
+        aviso e resultado vazio, como a falha de um lote isolado.
+        """
+        size = max(1, settings.TRACK_IMAGES_BATCH_SIZE)
+        batches = [spotify_ids[i : i + size] for i in range(0, len(spotify_ids), size)]
+        try:
+            responses = await SpotifyMCPService.call_tools_batch(
+                [
+                    ("getTrackImages", {"trackIds": batch}, TrackImagesMCPResponse)
+                    for batch in batches
+                ],
+                user,
+                db,
+            )
+        except Exception as e:
+            logger.warning(f"Não foi possível buscar imagens das tracks: {e}")
+            return {}
+
+        fetched: dict[str, Optional[str]] = {}
+        for batch, response in zip(batches, responses):
+            if isinstance(response, BaseException):
+                logger.warning(f"Não foi possível buscar imagens das tracks: {response}")
+                continue
+            if response.json is None:
+                continue
+            for spotify_id in batch:
+                fetched[spotify_id] = response.json.images.get(spotify_id)
+        return fetched
+
+    @staticmethod
+    def _store_images(images: dict[str, Optional[str]]) -> None:
+        """
+        Grava as capas no LRU e na tabela track_images (insere ou atualiza),
+        com sessão própria como em `_load_stored_images`. O updated_at é
+        sempre definido: sem isso o merge de uma URL igual não gera UPDATE e
+        a entrada expiraria mesmo tendo sido confirmada agora.
+        """
+        for spotify_id, image_url in images.items():
+            _images_cache.set(spotify_id, image_url)
+        now = datetime.now(timezone.utc)
+        db = SessionLocal()
+        try:
+            for spotify_id, image_url in images.items():
+                db.merge(
+                    TrackImage(spotify_id=spotify_id, image_url=image_url, updated_at=now)
+                )
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            logger.warning(f"Não foi possível salvar capas em track_images: {e}")
+        finally:
+            db.close()
+
+    @staticmethod
+    def images_cache_stats() -> dict:
+        return _images_cache.stats()
 
     @staticmethod
     async def get_playlist_tracks_mcp(
@@ -50,7 +219,7 @@ class TracksService:
         """
         Helper específico para buscar faixas de uma playlist via MCP.
         """
-        result_dict = await SpotifyMCPService.call_tool(
+        return await SpotifyMCPService.call_tool(
             "getPlaylistTracks",
             user,
             db,
@@ -61,9 +230,8 @@ class TracksService:
                 "json": json_output,
                 "md": md_output,
             },
+            response_model=PlaylistTracksMCPResponse,
         )
-        logger.success("Resposta MCP Tracks", data=result_dict)
-        return PlaylistTracksMCPResponse(**result_dict)
 
     @staticmethod
     async def search_tracks_fuzzy(
@@ -92,8 +260,9 @@ class TracksService:
 
         track_ids = [t.spotify_id for t in results]
         try:
-            images_resp = await TracksService.get_track_images_mcp(user, db, track_ids)
-            images_dict = images_resp.json.images if images_resp.json else {}
+            images_dict = await TracksService.get_track_images(
+                user, db, track_ids, wait=not settings.TRACK_IMAGES_ASYNC
+            )
 
             for track in results:
                 track.image_url = images_dict.get(track.spotify_id)
@@ -0,0 +1,163 @@
+import threading
+import time
+from typing import Optional
+
+import numpy as np
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.logger import logger
+from app.models.track_behavior import InteractionType, TrackBehavior
+from app.models.track_preference import TrackPreference
+from app.services.track_catalog import TrackCatalog
+
+
+class UserSignals:
+    """
+    Sinais de preferência de um usuário como vetores esparsos alinhados às
+    linhas do catálogo (arrays ordenados de linhas), prontos para operações
+    vetorizadas sobre os candidatos do KNN.
+    """
+
+    def __init__(
+        self,
+        catalog_version: str,
+        disliked_rows: np.ndarray,
+        liked_rows: np.ndarray,
+        skip_rows: np.ndarray,
+        skip_counts: np.ndarray,
+    ):
+        self.catalog_version = catalog_version
+        self.disliked_rows = disliked_rows
+        self.liked_rows = liked_rows
+        self.skip_rows = skip_rows
+        self.skip_counts = skip_counts
+        self.loaded_at = time.monotonic()
+
+    @property
+    def is_empty(self) -> bool:
+        return not (
+            self.disliked_rows.size or self.liked_rows.size or self.skip_rows.size
+        )
+
+    @staticmethod
+    def _to_rows(catalog: TrackCatalog, track_ids: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Converte tracks.id em linhas do catálogo (busca binária, já que é ordenado)."""
+        if not track_ids.size or not len(catalog):
+            empty = np.empty(0, dtype=np.int64)
+            return empty, np.empty(0, dtype=bool)
+        rows = np.searchsorted(catalog.track_ids, track_ids)
+        rows = np.minimum(rows, len(catalog) - 1)
+        found = catalog.track_ids[rows] == track_ids
+        return rows, found
+
+    @classmethod
+    def load(cls, db: Session, user_id: int, catalog: TrackCatalog) -> "UserSignals":
+        preferences = (
+            db.query(TrackPreference.track_id, TrackPreference.liked)
+            .filter(TrackPreference.user_id == user_id)
+            .all()
+        )
+        skips = (
+            db.query(TrackBehavior.track_id, func.sum(TrackBehavior.count))
+            .filter(
+                TrackBehavior.user_id == user_id,
+                TrackBehavior.interaction_type == InteractionType.SKIP,
+            )
+            .group_by(TrackBehavior.track_id)
+            .all()
+        )
+
+        pref_ids = np.array([p[0] for p in preferences], dtype=np.int64)
+        pref_liked = np.array([p[1] for p in preferences], dtype=bool)
+        pref_rows, found = cls._to_rows(catalog, pref_ids)
+        pref_rows, pref_liked = pref_rows[found], pref_liked[found]
+
+        skip_ids = np.array([s[0] for s in skips], dtype=np.int64)
+        skip_counts = np.array([s[1] or 0 for s in skips], dtype=np.float32)
+        skip_rows, found = cls._to_rows(catalog, skip_ids)
+        skip_rows, skip_counts = skip_rows[found], skip_counts[found]
+        order = np.argsort(skip_rows)
+
+        return cls(
+            catalog_version=catalog.version,
+            disliked_rows=np.sort(pref_rows[~pref_liked]),
+            liked_rows=np.sort(pref_rows[pref_liked]),
+            skip_rows=skip_rows[order],
+            skip_counts=skip_counts[order],
+        )
+
+    def rerank(
+        self, rows: np.ndarray, distances: np.ndarray, k: int
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Remove faixas com dislike e reordena os candidatos por
+
+            score = distância * (1 + SKIP_PENALTY * log1p(skips)) * (1 - LIKE_BONUS * curtiu)
+
+        Retorna no máximo `k` (linhas, scores) em ordem crescente de score.
+        """
+        keep = ~np.isin(rows, self.disliked_rows)
+        rows, distances = rows[keep], distances[keep]
+
+        scores = distances.astype(np.float32, copy=True)
+        if self.skip_rows.size:
+            pos = np.minimum(np.searchsorted(self.skip_rows, rows), self.skip_rows.size - 1)
+            skips = np.where(self.skip_rows[pos] == rows, self.skip_counts[pos], 0.0)
+            scores *= 1.0 + settings.RECOMMENDER_SKIP_PENALTY * np.log1p(skips)
+        if self.liked_rows.size:
+            liked = np.isin(rows, self.liked_rows)
+            scores *= np.where(liked, 1.0 - settings.RECOMMENDER_LIKE_BONUS, 1.0)
+
+        order = np.argsort(scores, kind="stable")[:k]
+        return rows[order], scores[order]
+
+
+class UserSignalsCache:
+    """
+    Cache por processo dos sinais de cada usuário, com expiração em
+    USER_SIGNALS_TTL segundos e invalidação explícita quando o usuário
+    registra uma nova ação.
+    """
+
+    def __init__(self):
+        self._entries: dict[int, UserSignals] = {}
+        self._lock = threading.Lock()
+
+    def get(self, db: Session, user_id: int, catalog: TrackCatalog) -> UserSignals:
+        signals = self._entries.get(user_id)
+        if (
+            signals is not None
+            and signals.catalog_version == catalog.version
+            and time.monotonic() - signals.loaded_at < settings.USER_SIGNALS_TTL
+        ):
+            return signals
+
+        signals = UserSignals.load(db, user_id, catalog)
+        with self._lock:
+            self._entries[user_id] = signals
+        logger.debug(
+            f"Sinais do usuário {user_id} carregados "
+            f"({signals.disliked_rows.size} dislikes, {signals.liked_rows.size} likes, "
+            f"{signals.skip_rows.size} faixas puladas)"
+        )
+        return signals
+
+    def invalidate(self, user_id: Optional[int] = None) -> None:
+        with self._lock:
+            if user_id is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(user_id, None)
+
+
+_cache = UserSignalsCache()
+
+
+def get_user_signals(db: Session, user_id: int, catalog: TrackCatalog) -> UserSignals:
+    return _cache.get(db, user_id, catalog)
+
+
+def invalidate_user_signals(user_id: Optional[int] = None) -> None:
+    _cache.invalidate(user_id)
@@ -0,0 +1,110 @@
+import asyncio
+import time
+from datetime import datetime, timezone
+from typing import Optional
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.logger import logger
+from app.schemas.recommendation import AudioFeaturesInput
+import app.services.model_loader as loader
+from app.services.filtered_search import get_filtered_index
+from app.services.model_loader import ModelBundle, resolve_model_dir
+from app.services.track_catalog import get_catalog
+
+
+class WarmupState:
+    """Estado do warm-up do worker, exposto em /health/ready."""
+
+    def __init__(self):
+        self.status = "pending"
+        self.timings: dict[str, float] = {}
+        self.error: Optional[str] = None
+        self.started_at: Optional[datetime] = None
+        self.finished_at: Optional[datetime] = None
+
+    @property
+    def ready(self) -> bool:
+        return self.status in ("ready", "disabled")
+
+    def as_dict(self) -> dict:
+        return {
+            "status": self.status,
+            "ready": self.ready,
+            "model_version": loader.model_status()["version"],
+            "timings_ms": self.timings,
+            "error": self.error,
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+        }
+
+
+state = WarmupState()
+
+
+def _timed(name: str, fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    state.timings[name] = round((time.perf_counter() - start) * 1000, 2)
+    return result
+
+
+def _warm_catalog(model_version: str):
+    db = SessionLocal()
+    try:
+        return get_catalog(db, model_version=model_version)
+    finally:
+        db.close()
+
+
+def _warm_search(bundle: ModelBundle) -> None:
+    """Executa uma consulta para carregar as páginas da matriz/grafo do índice."""
+    query = bundle.encoder.encode(
+        AudioFeaturesInput(energy=0.5, danceability=0.5, valence=0.5, acousticness=0.5)
+    )
+    k = min(settings.RECOMMENDER_MAX_RESULTS, bundle.index.size)
+    bundle.index.search(query, k)
+
+
+async def warm_up() -> None:
+    """
+    Carrega modelo e catálogo de faixas em paralelo antes do primeiro
+    request. O catálogo usa a versão do modelo lida do manifest (ou do
+    arquivo), então pode ser montado enquanto o modelo ainda carrega. Em
+    seguida prepara o índice particionado das buscas com filtros.
+    """
+    if not settings.MODEL_WARMUP_ENABLED:
+        state.status = "disabled"
+        return
+
+    state.status = "warming"
+    state.started_at = datetime.now(timezone.utc)
+    start = time.perf_counter()
+    logger.info("Iniciando warm-up do recomendador...")
+
+    try:
+        directory, manifest = resolve_model_dir()
+        model_version = ModelBundle.version_for(directory, manifest)
+
+        bundle, catalog = await asyncio.gather(
+            asyncio.to_thread(_timed, "bundle", loader.get_bundle),
+            asyncio.to_thread(_timed, "catalog", _warm_catalog, model_version),
+        )
+        state.timings.update(bundle.load_timings)
+        await asyncio.gather(
+            asyncio.to_thread(_timed, "search", _warm_search, bundle),
+            asyncio.to_thread(
+                _timed, "filtered_index", get_filtered_index, bundle, catalog
+            ),
+        )
+    except Exception as e:
+        state.status = "failed"
+        state.error = str(e)
+        logger.error(f"Falha no warm-up do recomendador: {e}")
+        return
+    finally:
+        state.timings["total"] = round((time.perf_counter() - start) * 1000, 2)
+        state.finished_at = datetime.now(timezone.utc)
+
+    state.status = "ready"
+    logger.success("Warm-up do recomendador concluído", data=state.timings)
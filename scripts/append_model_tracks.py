@@ -0,0 +1,128 @@
+import argparse
+import os
+import pickle
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import joblib
+import numpy as np
+from sqlalchemy import asc
+from sqlalchemy.orm import Session
+
+from app.core.database import SessionLocal
+from app.models.track import Track
+from app.services.feature_encoder import QueryEncoder
+from app.services.knn_index import HNSWIndex
+from app.services.model_loader import (
+    FEATURES_FILE,
+    HNSW_INDEX_FILE,
+    MATRIX_FILE,
+    MODEL_FILE,
+    SCALER_FILE,
+    resolve_model_dir,
+)
+from app.services.recommender import RecommenderService
+from publish_model import publish_model
+
+
+def append_tracks_to_model(db: Session, activate: bool = True):
+    """
+    Acrescenta ao modelo ativo as faixas importadas depois dele, sem retreino:
+    as faixas novas (as de maior id, além das linhas do modelo) são
+    codificadas com o scaler da versão ativa e anexadas ao fim da matriz,
+    preservando a ordem por tracks.id. O NearestNeighbors é reajustado sobre
+    a matriz estendida e o grafo HNSW, se existir, recebe só os nós novos.
+
+    O resultado é publicado como nova versão (manifest com `parent`); com
+    `activate`, o ponteiro CURRENT muda e os workers recarregam o modelo e
+    o catálogo sem reinício (MODEL_WATCH_ENABLED ou /admin/model/reload).
+
+    Returns:
+        Versão publicada, ou None se não houver faixas novas.
+    """
+    directory, manifest = resolve_model_dir()
+    parent = manifest["version"] if manifest else None
+    print(f"Lendo modelo ativo de {directory}...")
+    model = joblib.load(os.path.join(directory, MODEL_FILE))
+    scaler = joblib.load(os.path.join(directory, SCALER_FILE))
+    with open(os.path.join(directory, FEATURES_FILE), "rb") as f:
+        features = pickle.load(f)
+    encoder = QueryEncoder.from_scaler(scaler, features)
+
+    n_model = int(model.n_samples_fit_)
+    tracks = (
+        db.query(Track).order_by(asc(Track.id)).offset(max(n_model - 1, 0)).all()
+    )
+    if n_model and tracks:
+        # A última linha do modelo precisa ser a mesma faixa no banco; senão a
+        # ordem por tracks.id mudou e só um retreino completo realinha o índice.
+        last = encoder.encode(RecommenderService._features_from_track(tracks[0]))
+        if not np.allclose(last[0], model._fit_X[n_model - 1], atol=1e-4):
+            raise SystemExit(
+                "❌ As linhas do modelo não correspondem às faixas do banco "
+                "(faixas removidas ou reordenadas). Treine o modelo novamente."
+            )
+        tracks = tracks[1:]
+
+    if not tracks:
+        print("Nenhuma faixa nova para acrescentar ao modelo.")
+        return None
+
+    print(f"Codificando {len(tracks)} faixas novas...")
+    new_rows = encoder.encode_batch(
+        [RecommenderService._features_from_track(t) for t in tracks]
+    )
+    old_matrix = model._fit_X
+    matrix = np.concatenate([old_matrix, new_rows.astype(old_matrix.dtype)])
+
+    staging = tempfile.mkdtemp(prefix=".append-")
+    try:
+        start = time.perf_counter()
+        model.fit(matrix)
+        joblib.dump(model, os.path.join(staging, MODEL_FILE))
+        shutil.copy2(os.path.join(directory, SCALER_FILE), staging)
+        shutil.copy2(os.path.join(directory, FEATURES_FILE), staging)
+        print(f"Modelo reajustado com {matrix.shape[0]} linhas em {time.perf_counter() - start:.1f}s.")
+
+        path_index = os.path.join(directory, HNSW_INDEX_FILE)
+        if os.path.exists(path_index):
+            start = time.perf_counter()
+            index = HNSWIndex.load(
+                path_index, old_matrix, metric=model.effective_metric_
+            )
+            index.add(new_rows)
+            index.save(os.path.join(staging, HNSW_INDEX_FILE))
+            print(f"Grafo HNSW estendido em {time.perf_counter() - start:.1f}s.")
+
+        mmap = os.path.exists(os.path.join(directory, MATRIX_FILE))
+        version = publish_model(staging, activate=activate, mmap=mmap, parent=parent)
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
+
+    print(
+        "ℹ️  A tabela de faixas similares não é copiada; rode "
+        "scripts/build_similar_tracks.py para recalculá-la nesta versão."
+    )
+    return version
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Acrescenta ao modelo ativo as faixas importadas depois dele, sem retreino."
+    )
+    parser.add_argument(
+        "--no-activate",
+        action="store_true",
+        help="Apenas publica a versão, sem trocar o ponteiro CURRENT",
+    )
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        append_tracks_to_model(db, activate=not args.no_activate)
+    finally:
+        db.close()
@@ -0,0 +1,145 @@
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Optional
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import numpy as np
+
+from app.services.knn_index import (
+    BruteForceIndex,
+    HNSWIndex,
+    NeighborIndex,
+    SklearnIndex,
+    recall_at_k,
+)
+from app.services.model_loader import HNSW_INDEX_FILE, MODEL_FILE, resolve_model_dir
+
+
+def load_model(synthetic: int, dim: int, seed: int):
+    """Retorna o modelo exato: o do disco ou um treinado sobre um catálogo sintético."""
+    if not synthetic:
+        import joblib
+
+        return joblib.load(os.path.join(resolve_model_dir()[0], MODEL_FILE))
+
+    from sklearn.neighbors import NearestNeighbors
+
+    rng = np.random.default_rng(seed)
+    matrix = rng.normal(size=(synthetic, dim))
+    matrix[:, 4:] = matrix[:, 4:] > 1.0
+    return NearestNeighbors().fit(matrix)
+
+
+def measure(index, queries: np.ndarray, k: int):
+    latencies = []
+    indices = []
+    for query in queries:
+        start = time.perf_counter()
+        _, idx = index.search(query[None, :], k)
+        latencies.append((time.perf_counter() - start) * 1000)
+        indices.append(idx[0])
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+    return np.array(indices), p50, p95, p99
+
+
+def compare_indexes(
+    exact: NeighborIndex,
+    matrix: np.ndarray,
+    metric: str,
+    queries: np.ndarray,
+    k: int,
+    ef_values: list[int],
+    hnsw: Optional[HNSWIndex] = None,
+) -> dict[str, dict]:
+    """
+    recall@k e latência (p50/p95/p99 em ms) de cada backend contra o índice
+    exato `exact`, sobre as mesmas consultas. Sem `hnsw`, o grafo é
+    construído sobre `matrix` (o tempo vai em "build_s"); com `ef_values`
+    vazio, o HNSW não é avaliado.
+    """
+    def entry(recall, p50, p95, p99, **extra):
+        latency = {"p50": round(p50, 4), "p95": round(p95, 4), "p99": round(p99, 4)}
+        return {"recall": round(recall, 4), "latency_ms": latency, **extra}
+
+    exact_found, *latency = measure(exact, queries, k)
+    results = {exact.name: entry(1.0, *latency)}
+
+    found, *latency = measure(BruteForceIndex(matrix, metric=metric), queries, k)
+    results["brute"] = entry(recall_at_k(exact_found, found), *latency)
+
+    if not ef_values:
+        return results
+    build_s = None
+    if hnsw is None:
+        start = time.perf_counter()
+        hnsw = HNSWIndex.build(matrix, metric=metric)
+        build_s = round(time.perf_counter() - start, 3)
+    for ef in ef_values:
+        hnsw.set_ef(ef)
+        found, *latency = measure(hnsw, queries, k)
+        results[f"hnsw_ef{ef}"] = entry(
+            recall_at_k(exact_found, found), *latency, ef=ef, build_s=build_s
+        )
+    return results
+
+
+def print_comparison(results: dict[str, dict], k: int) -> None:
+    print(f"{'backend':<18}{'recall@' + str(k):>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for name, entry in results.items():
+        latency = entry["latency_ms"]
+        print(
+            f"{name:<18}{entry['recall']:>10.4f}"
+            f"{latency['p50']:>10.3f}{latency['p95']:>10.3f}{latency['p99']:>10.3f}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compara recall@k e latência dos backends de busca contra o modelo exato."
+    )
+    parser.add_argument("--synthetic", type=int, default=0,
+                        help="Tamanho do catálogo sintético (0 = usa o modelo do disco)")
+    parser.add_argument("--dim", type=int, default=17)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=20)
+    parser.add_argument("--ef", type=int, nargs="+", default=[16, 32, 64, 128, 256])
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="Grava os resultados também em JSON")
+    args = parser.parse_args()
+
+    model = load_model(args.synthetic, args.dim, args.seed)
+    matrix = model._fit_X
+    metric = model.effective_metric_
+    rng = np.random.default_rng(args.seed)
+    rows = rng.choice(matrix.shape[0], size=args.queries, replace=False)
+    queries = (matrix[rows] + rng.normal(scale=0.05, size=(args.queries, matrix.shape[1]))).astype(np.float32)
+
+    hnsw = None
+    path_index = os.path.join(resolve_model_dir()[0], HNSW_INDEX_FILE)
+    if not args.synthetic and os.path.exists(path_index):
+        hnsw = HNSWIndex.load(path_index, matrix, metric=metric)
+
+    print(f"Catálogo: {matrix.shape[0]} linhas x {matrix.shape[1]} dimensões ({metric})")
+    results = compare_indexes(
+        SklearnIndex(model), matrix, metric, queries, args.k, args.ef, hnsw=hnsw
+    )
+    print_comparison(results, args.k)
+
+    if args.output:
+        report = {
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "config": {**vars(args), "rows": int(matrix.shape[0]), "metric": metric},
+            "indexes": results,
+        }
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\n✅ Resultados salvos em {args.output}")
+
+
+if __name__ == "__main__":
+    main()
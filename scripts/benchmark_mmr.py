@@ -0,0 +1,99 @@
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import numpy as np
+
+from app.services.reranking import mmr_rerank
+
+
+def measure(vectors, distances, artists, k, diversity, max_per_artist, pool_factor, repeats):
+    latencies = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        mmr_rerank(
+            vectors,
+            distances,
+            k,
+            diversity=diversity,
+            artist_keys=artists,
+            max_per_artist=max_per_artist,
+            pool_factor=pool_factor,
+        )
+        latencies.append((time.perf_counter() - start) * 1000)
+    return np.percentile(latencies, [50, 95, 99])
+
+
+def artist_stats(order, artists, k):
+    top = artists[order[:k]]
+    _, counts = np.unique(top, return_counts=True)
+    return len(counts), int(counts.max())
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Mede a latência do re-ranking MMR sobre candidatos sintéticos."
+    )
+    parser.add_argument("--candidates", type=int, nargs="+", default=[60, 180, 300, 500])
+    parser.add_argument("--dim", type=int, default=17)
+    parser.add_argument("--k", type=int, default=60)
+    parser.add_argument("--diversity", type=float, default=0.3)
+    parser.add_argument("--max-per-artist", type=int, default=3)
+    parser.add_argument(
+        "--pool-factor",
+        type=int,
+        default=3,
+        help="Candidatos no MMR em múltiplos de k (0 = todos), como RECOMMENDER_MMR_POOL_FACTOR",
+    )
+    parser.add_argument("--repeats", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    print(
+        f"k={args.k}, dim={args.dim}, diversity={args.diversity}, "
+        f"max_per_artist={args.max_per_artist}, pool_factor={args.pool_factor}\n"
+    )
+    print(
+        f"{'candidatos':<12}{'p50 (ms)':>10}{'p95 (ms)':>10}{'p99 (ms)':>10}"
+        f"{'itens':>8}{'artistas':>14}{'máx/artista':>16}"
+    )
+
+    for n in args.candidates:
+        vectors = rng.normal(size=(n, args.dim)).astype(np.float32)
+        distances = np.sort(rng.uniform(0.1, 2.0, size=n)).astype(np.float32)
+        # Poucos artistas dominando o topo, como nas listas reais do KNN
+        artists = rng.zipf(1.5, size=n) % max(1, n // 5)
+
+        p50, p95, p99 = measure(
+            vectors,
+            distances,
+            artists,
+            args.k,
+            args.diversity,
+            args.max_per_artist,
+            args.pool_factor,
+            args.repeats,
+        )
+        before = artist_stats(np.arange(n), artists, args.k)
+        order = mmr_rerank(
+            vectors,
+            distances,
+            args.k,
+            diversity=args.diversity,
+            artist_keys=artists,
+            max_per_artist=args.max_per_artist,
+            pool_factor=args.pool_factor,
+        )
+        after = artist_stats(order, artists, args.k)
+        print(
+            f"{n:<12}{p50:>10.3f}{p95:>10.3f}{p99:>10.3f}{len(order):>8}"
+            f"{f'{before[0]} → {after[0]}':>14}{f'{before[1]} → {after[1]}':>16}"
+        )
+
+
+if __name__ == "__main__":
+    main()
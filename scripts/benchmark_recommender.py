@@ -0,0 +1,188 @@
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import zlib
+from datetime import datetime, timezone
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import numpy as np
+from benchmark_knn_index import compare_indexes, print_comparison
+
+from app.schemas.recommendation import AudioFeaturesInput, RecommendationResponse
+from app.services.feature_encoder import DECADES, QueryEncoder
+from app.services.knn_index import BruteForceIndex, SklearnIndex
+from app.services.model_loader import FEATURES_FILE, SCALER_FILE, resolve_model_dir
+from app.services.track_catalog import NUMERIC_COLUMNS, TrackCatalog
+
+STAGES = ("encode", "search", "hydrate", "serialize")
+FEATURES = ("energy", "danceability", "valence", "acousticness")
+
+
+def load_encoder(directory: str) -> QueryEncoder:
+    """Encoder do modelo a partir do scaler e da lista de features (sem o KNN)."""
+    import pickle
+
+    import joblib
+
+    scaler = joblib.load(os.path.join(directory, SCALER_FILE))
+    with open(os.path.join(directory, FEATURES_FILE), "rb") as f:
+        features = pickle.load(f)
+    return QueryEncoder.from_scaler(scaler, features)
+
+
+def synthetic_catalog(size: int, rng: np.random.Generator) -> TrackCatalog:
+    """
+    Catálogo em memória com o mesmo layout de colunas de TrackCatalog.build,
+    com audio features uniformes, décadas e flags sorteadas e alguns
+    artistas concentrando boa parte das faixas.
+    """
+    columns = {
+        "track_id": np.arange(1, size + 1, dtype=np.int64),
+        "duration_ms": rng.integers(90_000, 420_000, size=size).astype(np.int32),
+        "explicit": rng.random(size) < 0.2,
+        "is_popular": rng.random(size) < 0.3,
+        "decade": rng.choice([int(d) for d in DECADES], size=size).astype(np.int16),
+    }
+    for name in (*FEATURES, "instrumentalness", "speechiness"):
+        columns[name] = rng.random(size)
+
+    artists = [f"['Artista {a}']" for a in rng.zipf(1.3, size=size) % max(1, size // 10)]
+    columns["artist_key"] = np.array(
+        [zlib.crc32(a[2:-2].lower().encode()) for a in artists], dtype=np.int64
+    )
+    columns["spotify_id"] = np.array(
+        [f"{i:022d}".encode() for i in range(size)], dtype="S22"
+    )
+    for name, values in (("name", [f"Faixa {i}" for i in range(size)]), ("artists", artists)):
+        encoded = [value.encode() for value in values]
+        offsets = np.zeros(size + 1, dtype=np.int64)
+        np.cumsum(np.array([len(b) for b in encoded], dtype=np.int64), out=offsets[1:])
+        columns[f"{name}.offsets"] = offsets
+        columns[f"{name}.data"] = np.frombuffer(b"".join(encoded), dtype=np.uint8)
+
+    for name, dtype in NUMERIC_COLUMNS.items():
+        columns[name] = columns[name].astype(dtype, copy=False)
+    return TrackCatalog("", {"version": f"synthetic-{size}"}, columns)
+
+
+def sample_queries(
+    catalog: TrackCatalog, n: int, top_k: int, rng: np.random.Generator
+) -> list[AudioFeaturesInput]:
+    """Consultas próximas de faixas do catálogo, com ruído nas features contínuas."""
+    queries = []
+    for row in rng.choice(len(catalog), size=n, replace=False):
+        base = catalog.features_for(int(row))
+        noisy = {
+            name: float(np.clip(getattr(base, name) + rng.normal(scale=0.05), 0.0, 1.0))
+            for name in FEATURES
+        }
+        queries.append(base.model_copy(update={**noisy, "top_k": top_k}))
+    return queries
+
+
+def percentiles(values: list[float]) -> dict[str, float]:
+    p50, p95, p99 = np.percentile(values, [50, 95, 99])
+    return {"p50": round(p50, 4), "p95": round(p95, 4), "p99": round(p99, 4)}
+
+
+def run_pipeline(encoder, index, catalog, queries, k):
+    """
+    Executa encode -> busca -> hidratação -> serialização para cada consulta,
+    como no caminho de RecommenderService, medindo cada etapa em ms.
+    """
+    timings = {stage: [] for stage in STAGES}
+    for query in queries:
+        start = time.perf_counter()
+        vector = encoder.encode(query)
+        encoded = time.perf_counter()
+        _, indices = index.search(vector, k)
+        searched = time.perf_counter()
+        page = catalog.to_responses(indices[0][: query.top_k])
+        hydrated = time.perf_counter()
+        RecommendationResponse(recommendations=page).model_dump_json()
+        serialized = time.perf_counter()
+
+        timings["encode"].append((encoded - start) * 1000)
+        timings["search"].append((searched - encoded) * 1000)
+        timings["hydrate"].append((hydrated - searched) * 1000)
+        timings["serialize"].append((serialized - hydrated) * 1000)
+
+    totals = [sum(values) for values in zip(*timings.values())]
+    result = {stage: percentiles(values) for stage, values in timings.items()}
+    result["total"] = percentiles(totals)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=(
+            "Avalia o recomendador sobre um catálogo sintético: latência por etapa "
+            "(p50/p95/p99) e recall@k dos índices alternativos contra o modelo "
+            "exato (comparação de scripts/benchmark_knn_index.py)."
+        )
+    )
+    parser.add_argument("--size", type=int, default=20_000, help="Faixas no catálogo sintético")
+    parser.add_argument("--queries", type=int, default=300)
+    parser.add_argument("--k", type=int, default=60, help="Profundidade da busca")
+    parser.add_argument("--top-k", type=int, default=20, help="Faixas hidratadas por consulta")
+    parser.add_argument("--ef", type=int, nargs="*", default=[32, 64, 128],
+                        help="Valores de ef do HNSW (vazio = não avalia o HNSW)")
+    parser.add_argument(
+        "--model-dir",
+        default=resolve_model_dir()[0],
+        help="Diretório com o scaler/features do modelo (padrão: versão ativa)",
+    )
+    parser.add_argument("--metric", default="euclidean", help="Métrica do KNN")
+    parser.add_argument("--output", default="benchmark_recommender.json")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    print(f"Carregando encoder de {args.model_dir}...")
+    encoder, metric = load_encoder(args.model_dir), args.metric
+
+    print(f"Gerando catálogo sintético com {args.size} faixas...")
+    catalog = synthetic_catalog(args.size, rng)
+    start = time.perf_counter()
+    matrix = encoder.encode_batch([catalog.features_for(row) for row in range(args.size)])
+    encode_s = time.perf_counter() - start
+    queries = sample_queries(catalog, args.queries, args.top_k, rng)
+
+    report = {
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "config": {**vars(args), "dim": int(matrix.shape[1]), "metric": metric},
+        "environment": {
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "machine": platform.machine(),
+        },
+        "build": {"encode_catalog_s": round(encode_s, 3)},
+    }
+
+    index = BruteForceIndex(matrix, metric=metric)
+    report["timings_ms"] = run_pipeline(encoder, index, catalog, queries, args.k)
+
+    print(f"\n{'etapa':<12}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for stage, values in report["timings_ms"].items():
+        print(f"{stage:<12}{values['p50']:>10.3f}{values['p95']:>10.3f}{values['p99']:>10.3f}")
+
+    # Recall dos backends sobre o mesmo catálogo e as mesmas consultas
+    from sklearn.neighbors import NearestNeighbors
+
+    exact = SklearnIndex(NearestNeighbors(metric=metric).fit(matrix))
+    vectors = encoder.encode_batch(queries).astype(np.float32)
+    report["indexes"] = compare_indexes(exact, matrix, metric, vectors, args.k, args.ef)
+    print()
+    print_comparison(report["indexes"], args.k)
+
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\n✅ Resultados salvos em {args.output}")
+
+
+if __name__ == "__main__":
+    main()
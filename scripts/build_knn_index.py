@@ -0,0 +1,69 @@
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import joblib
+import numpy as np
+
+from app.services.knn_index import HNSWIndex
+from app.services.model_loader import (
+    HNSW_INDEX_FILE,
+    KNN_PARAMS_FILE,
+    MATRIX_FILE,
+    MODEL_FILE,
+    resolve_model_dir,
+)
+
+
+def load_matrix(directory: str) -> tuple[np.ndarray, str]:
+    """Matriz e métrica do modelo, preferindo a matriz exportada para mmap."""
+    path_matrix = os.path.join(directory, MATRIX_FILE)
+    if os.path.exists(path_matrix):
+        print(f"Lendo matriz exportada de {path_matrix}...")
+        with open(os.path.join(directory, KNN_PARAMS_FILE)) as f:
+            metric = json.load(f)["metric"]
+        return np.load(path_matrix, mmap_mode="r"), metric
+
+    path_model = os.path.join(directory, MODEL_FILE)
+    print(f"Lendo modelo KNN de {path_model}...")
+    model = joblib.load(path_model)
+    return model._fit_X, model.effective_metric_
+
+
+def build_hnsw_index(M: int, ef_construction: int, output: str):
+    matrix, metric = load_matrix(os.path.dirname(output))
+
+    print(
+        f"Construindo índice HNSW para {matrix.shape[0]} faixas "
+        f"(M={M}, ef_construction={ef_construction})..."
+    )
+    start = time.perf_counter()
+    index = HNSWIndex.build(
+        matrix,
+        M=M,
+        ef_construction=ef_construction,
+        metric=metric,
+    )
+    print(f"Índice construído em {time.perf_counter() - start:.1f}s.")
+
+    index.save(output)
+    print(f"✅ Índice salvo em {output}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Constrói o índice HNSW usado quando RECOMMENDER_INDEX_BACKEND=hnsw."
+    )
+    parser.add_argument("--m", type=int, default=16)
+    parser.add_argument("--ef-construction", type=int, default=100)
+    parser.add_argument(
+        "--output",
+        default=os.path.join(resolve_model_dir()[0], HNSW_INDEX_FILE),
+        help="Destino do índice; o modelo é lido do mesmo diretório (padrão: versão ativa)",
+    )
+    args = parser.parse_args()
+    build_hnsw_index(args.m, args.ef_construction, args.output)
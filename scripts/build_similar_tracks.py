@@ -0,0 +1,63 @@
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import numpy as np
+
+from app.services.model_loader import (
+    SIMILAR_TRACKS_FILE,
+    ModelBundle,
+    resolve_model_dir,
+)
+
+
+def build_similar_tracks(k: int, batch_size: int, directory: str):
+    """
+    Pré-calcula os `k` vizinhos mais próximos de cada faixa do modelo (sem a
+    própria faixa) e grava a tabela int32 (linhas, k) em similar_tracks.npy,
+    no diretório da versão do modelo. Linhas do índice = linhas do catálogo.
+    """
+    print(f"Carregando modelo de {directory}...")
+    bundle = ModelBundle.load(directory)
+    index = bundle.index
+    n = index.size
+    table = np.full((n, k), -1, dtype=np.int32)
+
+    print(f"Calculando {k} vizinhos para {n} faixas (índice: {index.name})...")
+    start = time.perf_counter()
+    for offset in range(0, n, batch_size):
+        rows = np.arange(offset, min(offset + batch_size, n))
+        _, indices = index.search(index.vectors(rows), k + 1)
+        for i, row in enumerate(rows):
+            neighbors = indices[i][indices[i] != row][:k]
+            table[row, : len(neighbors)] = neighbors
+        if (offset // batch_size) % 50 == 0:
+            print(f"  {min(offset + batch_size, n)}/{n}")
+    print(f"Tabela calculada em {time.perf_counter() - start:.1f}s.")
+
+    output = os.path.join(directory, SIMILAR_TRACKS_FILE)
+    fd, tmp_path = tempfile.mkstemp(prefix=".similar-", suffix=".npy", dir=directory)
+    with os.fdopen(fd, "wb") as f:
+        np.save(f, table)
+    os.replace(tmp_path, output)
+    size_mb = table.nbytes / (1024 * 1024)
+    print(f"✅ Tabela {n}x{k} ({size_mb:.1f} MB) salva em {output}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Pré-calcula a tabela de faixas similares usada por /recommendations/similar."
+    )
+    parser.add_argument("--k", type=int, default=50)
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument(
+        "--directory",
+        default=resolve_model_dir()[0],
+        help="Diretório da versão do modelo (padrão: versão ativa)",
+    )
+    args = parser.parse_args()
+    build_similar_tracks(args.k, args.batch_size, args.directory)
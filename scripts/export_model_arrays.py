@@ -0,0 +1,92 @@
+import argparse
+import json
+import os
+import pickle
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import joblib
+import numpy as np
+
+from app.services.knn_index import _prepare_matrix
+from app.services.model_loader import (
+    FEATURES_FILE,
+    KNN_PARAMS_FILE,
+    MATRIX_FILE,
+    MODEL_FILE,
+    SCALER_FILE,
+    SCALER_PARAMS_FILE,
+    SQ_NORMS_FILE,
+    resolve_model_dir,
+)
+
+
+def export_model_arrays(directory: str):
+    """
+    Converte o modelo joblib em arrays brutos no mesmo diretório:
+    - matrix.npy: matriz de vizinhos em float32 (normalizada se cosseno)
+    - sq_norms.npy: normas ao quadrado das linhas, usadas pela busca brute-force
+    - scaler_params.npz: colunas, média e escala do StandardScaler
+    - knn_params.json: métrica, n_neighbors e lista de features do modelo
+
+    O ModelLoader abre esses arquivos com mmap_mode="r" em vez de
+    desserializar o modelo em cada worker.
+    """
+    print(f"Lendo modelo de {directory}...")
+    model = joblib.load(os.path.join(directory, MODEL_FILE))
+    scaler = joblib.load(os.path.join(directory, SCALER_FILE))
+    with open(os.path.join(directory, FEATURES_FILE), "rb") as f:
+        features = pickle.load(f)
+
+    metric = model.effective_metric_
+    matrix = _prepare_matrix(model._fit_X, metric)
+    sq_norms = np.einsum("ij,ij->i", matrix, matrix)
+
+    columns = list(getattr(scaler, "feature_names_in_", [])) or [
+        "acousticness",
+        "danceability",
+        "energy",
+        "valence",
+    ]
+    n_scaled = len(columns)
+    mean = scaler.mean_ if getattr(scaler, "with_mean", True) else np.zeros(n_scaled)
+    scale = scaler.scale_ if getattr(scaler, "with_std", True) else np.ones(n_scaled)
+
+    np.save(os.path.join(directory, MATRIX_FILE), matrix)
+    np.save(os.path.join(directory, SQ_NORMS_FILE), sq_norms)
+    np.savez(
+        os.path.join(directory, SCALER_PARAMS_FILE),
+        columns=np.array(columns),
+        mean=np.asarray(mean, dtype=np.float64),
+        scale=np.asarray(scale, dtype=np.float64),
+    )
+    with open(os.path.join(directory, KNN_PARAMS_FILE), "w") as f:
+        json.dump(
+            {
+                "metric": metric,
+                "n_neighbors": int(model.n_neighbors),
+                "features": list(features),
+            },
+            f,
+            indent=2,
+        )
+
+    size_mb = matrix.nbytes / (1024 * 1024)
+    print(
+        f"✅ Matriz {matrix.shape[0]}x{matrix.shape[1]} ({size_mb:.1f} MB, "
+        f"métrica {metric}) exportada em {directory}"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Exporta o modelo KNN e o scaler para arrays abertos com mmap pelo ModelLoader."
+    )
+    parser.add_argument(
+        "--directory",
+        default=resolve_model_dir()[0],
+        help="Diretório com o modelo joblib (padrão: versão ativa)",
+    )
+    args = parser.parse_args()
+    export_model_arrays(args.directory)
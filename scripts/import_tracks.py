@@ -1,3 +1,4 @@
+import argparse
 import pandas as pd
 import os
 import sys
@@ -7,9 +8,18 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
 from app.core.database import SessionLocal
 from app.models.track import Track
+from append_model_tracks import append_tracks_to_model
 
 
-def import_tracks_from_csv(csv_path: str):
+def import_tracks_from_csv(csv_path: str, incremental: bool = False):
+    """
+    Importa as faixas do CSV. Por padrão só roda com o banco vazio; com
+    `incremental`, insere apenas as faixas cujo spotify_id ainda não existe
+    (que recebem ids maiores que os atuais) e acrescenta ao modelo ativo as
+    faixas que ele ainda não tem, publicando uma nova versão sem retreino.
+    O modelo é atualizado mesmo sem faixas novas no CSV, para que uma
+    execução anterior que falhou depois de gravar no banco seja concluída.
+    """
     db: Session = SessionLocal()
 
     if not os.path.exists(csv_path):
@@ -18,7 +28,7 @@ def import_tracks_from_csv(csv_path: str):
 
     try:
         existing_count = db.query(Track).count()
-        if existing_count > 0:
+        if existing_count > 0 and not incremental:
             print(
                 f"⚠️  Banco já contém {existing_count} músicas. Pulando importação para evitar duplicidade."
             )
@@ -27,41 +37,16 @@ def import_tracks_from_csv(csv_path: str):
         print(f"Lendo dados de {csv_path}...")
         df = pd.read_csv(csv_path)
 
-        track_objects = []
-
-        print("Transformando linhas em objetos Track...")
-        for _, row in df.iterrows():
-            track = Track(
-                spotify_id=row["id"],
-                name=row["name"],
-                artists=row["artists"],
-                duration_ms=int(row["duration_ms"]),
-                acousticness=float(row["acousticness"]),
-                danceability=float(row["danceability"]),
-                energy=float(row["energy"]),
-                instrumentalness=float(row["instrumentalness"]),
-                speechiness=float(row["speechiness"]),
-                valence=float(row["valence"]),
-                explicit=bool(row["explicit"]),
-                is_popular=bool(row["is_popular"]),
-                d_1920s=bool(row["1920s"]),
-                d_1930s=bool(row["1930s"]),
-                d_1940s=bool(row["1940s"]),
-                d_1950s=bool(row["1950s"]),
-                d_1960s=bool(row["1960s"]),
-                d_1970s=bool(row["1970s"]),
-                d_1980s=bool(row["1980s"]),
-                d_1990s=bool(row["1990s"]),
-                d_2000s=bool(row["2000s"]),
-                d_2010s=bool(row["2010s"]),
-                d_2020s=bool(row["2020s"]),
-            )
-            track_objects.append(track)
+        if incremental and existing_count > 0:
+            existing = {spotify_id for (spotify_id,) in db.query(Track.spotify_id)}
+            df = df[~df["id"].isin(existing)].drop_duplicates(subset="id")
+            print(f"{len(df)} músicas novas (de {existing_count} já no banco).")
+
+        if not df.empty:
+            insert_tracks(db, df)
 
-        print(f"Iniciando inserção de {len(track_objects)} músicas no PostgreSQL...")
-        db.bulk_save_objects(track_objects)
-        db.commit()
-        print("✅ Importação concluída com sucesso!")
+        if incremental and existing_count > 0:
+            append_tracks_to_model(db)
 
     except Exception as e:
         print(f"❌ Erro durante a importação: {e}")
@@ -70,6 +55,51 @@ def import_tracks_from_csv(csv_path: str):
         db.close()
 
 
+def insert_tracks(db: Session, df: pd.DataFrame):
+    track_objects = []
+
+    print("Transformando linhas em objetos Track...")
+    for _, row in df.iterrows():
+        track = Track(
+            spotify_id=row["id"],
+            name=row["name"],
+            artists=row["artists"],
+            duration_ms=int(row["duration_ms"]),
+            acousticness=float(row["acousticness"]),
+            danceability=float(row["danceability"]),
+            energy=float(row["energy"]),
+            instrumentalness=float(row["instrumentalness"]),
+            speechiness=float(row["speechiness"]),
+            valence=float(row["valence"]),
+            explicit=bool(row["explicit"]),
+            is_popular=bool(row["is_popular"]),
+            d_1920s=bool(row["1920s"]),
+            d_1930s=bool(row["1930s"]),
+            d_1940s=bool(row["1940s"]),
+            d_1950s=bool(row["1950s"]),
+            d_1960s=bool(row["1960s"]),
+            d_1970s=bool(row["1970s"]),
+            d_1980s=bool(row["1980s"]),
+            d_1990s=bool(row["1990s"]),
+            d_2000s=bool(row["2000s"]),
+            d_2010s=bool(row["2010s"]),
+            d_2020s=bool(row["2020s"]),
+        )
+        track_objects.append(track)
+
+    print(f"Iniciando inserção de {len(track_objects)} músicas no PostgreSQL...")
+    db.bulk_save_objects(track_objects)
+    db.commit()
+    print("✅ Importação concluída com sucesso!")
+
+
 if __name__ == "__main__":
-    FILE_PATH = "data/features.csv"
-    import_tracks_from_csv(FILE_PATH)
+    parser = argparse.ArgumentParser(description="Importa as faixas do CSV para o banco.")
+    parser.add_argument("--csv", default="data/features.csv")
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Insere só as faixas novas e as acrescenta ao modelo ativo, sem retreino",
+    )
+    args = parser.parse_args()
+    import_tracks_from_csv(args.csv, incremental=args.incremental)
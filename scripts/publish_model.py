@@ -0,0 +1,130 @@
+import argparse
+import json
+import os
+import pickle
+import shutil
+import sys
+import tempfile
+from datetime import datetime, timezone
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import joblib
+
+from app.services.model_loader import (
+    CURRENT_FILE,
+    FEATURES_FILE,
+    HNSW_INDEX_FILE,
+    KNN_PARAMS_FILE,
+    MANIFEST_FILE,
+    MATRIX_FILE,
+    MODEL_FILE,
+    MODELS_DIR,
+    SCALER_FILE,
+    SCALER_PARAMS_FILE,
+    SQ_NORMS_FILE,
+    VERSIONS_DIR,
+    file_checksum,
+)
+from export_model_arrays import export_model_arrays
+
+ARTIFACT_FILES = (
+    MODEL_FILE,
+    SCALER_FILE,
+    FEATURES_FILE,
+    HNSW_INDEX_FILE,
+    MATRIX_FILE,
+    SQ_NORMS_FILE,
+    SCALER_PARAMS_FILE,
+    KNN_PARAMS_FILE,
+)
+
+
+def publish_model(
+    source: str,
+    version: str = None,
+    activate: bool = True,
+    mmap: bool = False,
+    parent: str = None,
+) -> str:
+    """
+    Copia os artefatos de `source` para versions/<versão>/ com um manifest
+    e, se `activate`, aponta versions/CURRENT para a nova versão. Workers com
+    MODEL_WATCH_ENABLED (ou o endpoint /admin/model/reload) carregam a versão
+    sem reiniciar. Com `mmap`, exporta também os arrays abertos com mmap.
+    `parent` registra no manifest a versão da qual esta foi derivada.
+    """
+    path_model = os.path.join(source, MODEL_FILE)
+    checksum = file_checksum(path_model)
+    version = version or datetime.now(timezone.utc).strftime(
+        f"%Y%m%d%H%M%S-{checksum[:8]}"
+    )
+    target = os.path.join(VERSIONS_DIR, version)
+    if os.path.exists(target):
+        raise SystemExit(f"❌ A versão {version} já existe em {target}")
+
+    with open(os.path.join(source, FEATURES_FILE), "rb") as f:
+        features = pickle.load(f)
+    model = joblib.load(path_model)
+
+    manifest = {
+        "version": version,
+        "checksum": checksum,
+        "features": list(features),
+        "catalog_size": int(model.n_samples_fit_),
+        "built_at": datetime.now(timezone.utc).isoformat(),
+    }
+    if parent:
+        manifest["parent"] = parent
+
+    os.makedirs(VERSIONS_DIR, exist_ok=True)
+    tmp_dir = tempfile.mkdtemp(prefix=f".{version}-", dir=VERSIONS_DIR)
+    for name in ARTIFACT_FILES:
+        path = os.path.join(source, name)
+        if os.path.exists(path):
+            shutil.copy2(path, os.path.join(tmp_dir, name))
+    if mmap:
+        export_model_arrays(tmp_dir)
+    path_matrix = os.path.join(tmp_dir, MATRIX_FILE)
+    if os.path.exists(path_matrix):
+        manifest["matrix_checksum"] = file_checksum(path_matrix)
+        manifest["matrix_size"] = os.path.getsize(path_matrix)
+    with open(os.path.join(tmp_dir, MANIFEST_FILE), "w") as f:
+        json.dump(manifest, f, indent=2)
+    os.rename(tmp_dir, target)
+    print(f"✅ Versão {version} publicada em {target} ({manifest['catalog_size']} faixas)")
+
+    if activate:
+        tmp_pointer = os.path.join(VERSIONS_DIR, f".{CURRENT_FILE}.{os.getpid()}")
+        with open(tmp_pointer, "w") as f:
+            f.write(version)
+        os.replace(tmp_pointer, os.path.join(VERSIONS_DIR, CURRENT_FILE))
+        print(f"✅ versions/{CURRENT_FILE} aponta para {version}")
+
+    return version
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Publica um modelo treinado como nova versão do registro de modelos."
+    )
+    parser.add_argument(
+        "--source",
+        default=MODELS_DIR,
+        help="Diretório com o .joblib do modelo, o scaler e as features",
+    )
+    parser.add_argument("--version", help="Nome da versão (padrão: data + checksum)")
+    parser.add_argument(
+        "--no-activate",
+        action="store_true",
+        help="Apenas copia a versão, sem trocar o ponteiro CURRENT",
+    )
+    parser.add_argument(
+        "--mmap",
+        action="store_true",
+        help="Exporta a matriz e o scaler para arrays abertos com mmap pelos workers",
+    )
+    args = parser.parse_args()
+    publish_model(
+        args.source, args.version, activate=not args.no_activate, mmap=args.mmap
+    )
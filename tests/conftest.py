@@ -0,0 +1,139 @@
+import json
+import os
+import socket
+import threading
+import time
+
+import pytest
+
+# Valores de .env.example, definidos antes de importar o app (settings é
+# instanciado no import). O banco é sqlite em memória: nenhum teste depende
+# do Postgres.
+for name, value in {
+    "POSTGRES_USER": "spotify",
+    "POSTGRES_PASSWORD": "spotify123",
+    "POSTGRES_DB": "spotify-agentic-system",
+    "DATABASE_URL": "sqlite://",
+    "SPOTIFY_CLIENT_ID": "test-client-id",
+    "SPOTIFY_CLIENT_SECRET": "test-client-secret",
+    "SPOTIFY_REDIRECT_URI": "http://127.0.0.1:8000/api/auth/callback",
+    "SECRET_KEY": "test-secret",
+    "ALGORITHM": "HS256",
+    "ACCESS_TOKEN_EXPIRE_MINUTES": "10080",
+    "REFRESH_TOKEN_EXPIRE_MINUTES": "40320",
+    "MCP_SERVER_URL": "http://127.0.0.1:3000/sse",
+    "GOOGLE_API_KEY": "test-google-key",
+    "MODEL": "gemini-2.5-flash",
+    "MODEL_WARMUP_ENABLED": "false",
+}.items():
+    os.environ.setdefault(name, value)
+
+
+class _RequestCounter:
+    """
+    Middleware ASGI que conta as conexões SSE abertas e as mensagens
+    `initialize` recebidas pelo servidor MCP.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self.sessions = 0
+        self.initialize = 0
+        self.tool_calls = 0
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        if scope["method"] == "GET" and scope["path"] == "/sse":
+            self.sessions += 1
+            return await self.app(scope, receive, send)
+
+        messages, body = [], b""
+        while True:
+            message = await receive()
+            messages.append(message)
+            body += message.get("body", b"")
+            if not message.get("more_body"):
+                break
+        try:
+            method = json.loads(body).get("method")
+        except (ValueError, AttributeError):
+            method = None
+        if method == "initialize":
+            self.initialize += 1
+        elif method == "tools/call":
+            self.tool_calls += 1
+
+        replay = iter(messages)
+
+        async def receive_again():
+            try:
+                return next(replay)
+            except StopIteration:
+                return await receive()
+
+        return await self.app(scope, receive_again, send)
+
+
+class StandInMCPServer:
+    """
+    Servidor FastMCP (transporte SSE) rodando no próprio processo, numa
+    thread com uvicorn. Expõe a ferramenta `echo` e os contadores do
+    _RequestCounter. `restart` derruba as conexões abertas e sobe o servidor
+    de novo na mesma porta.
+    """
+
+    def __init__(self):
+        from mcp.server.fastmcp import FastMCP
+
+        with socket.socket() as sock:
+            sock.bind(("127.0.0.1", 0))
+            self.port = sock.getsockname()[1]
+        self.url = f"http://127.0.0.1:{self.port}/sse"
+
+        mcp = FastMCP("stand-in")
+
+        @mcp.tool()
+        async def echo(value: str) -> str:
+            return json.dumps({"value": value})
+
+        self.app = _RequestCounter(mcp.sse_app())
+        self._server = None
+        self._thread = None
+
+    def start(self) -> None:
+        import uvicorn
+
+        config = uvicorn.Config(
+            self.app,
+            host="127.0.0.1",
+            port=self.port,
+            log_level="warning",
+            timeout_graceful_shutdown=0,
+        )
+        self._server = uvicorn.Server(config)
+        self._thread = threading.Thread(target=self._server.run, daemon=True)
+        self._thread.start()
+        deadline = time.monotonic() + 10
+        while not self._server.started:
+            if time.monotonic() > deadline or not self._thread.is_alive():
+                raise RuntimeError("Servidor MCP de teste não iniciou")
+            time.sleep(0.01)
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.should_exit = True
+            self._thread.join(timeout=10)
+            self._server = None
+
+    def restart(self) -> None:
+        self.stop()
+        self.start()
+
+
+@pytest.fixture
+def mcp_server():
+    server = StandInMCPServer()
+    server.start()
+    yield server
+    server.stop()
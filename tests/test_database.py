@@ -0,0 +1,44 @@
+import pytest
+
+import app.core.database as database
+
+
+class FakeSession:
+    def __init__(self):
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+def fake_sessions(monkeypatch) -> list[FakeSession]:
+    sessions = []
+
+    def session_local():
+        sessions.append(FakeSession())
+        return sessions[-1]
+
+    monkeypatch.setattr(database, "SessionLocal", session_local)
+    return sessions
+
+
+def test_with_session_closes_the_session_it_opened(monkeypatch):
+    sessions = fake_sessions(monkeypatch)
+
+    result = database.with_session(
+        lambda db, value, scale=1: (db, value * scale), 2, scale=3
+    )
+
+    assert result == (sessions[0], 6)
+    assert sessions[0].closed
+
+
+def test_with_session_closes_on_error(monkeypatch):
+    sessions = fake_sessions(monkeypatch)
+
+    def fail(db):
+        raise ValueError("falhou")
+
+    with pytest.raises(ValueError):
+        database.with_session(fail)
+    assert sessions[0].closed
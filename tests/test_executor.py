@@ -0,0 +1,38 @@
+import asyncio
+import threading
+
+import pytest
+from fastapi import HTTPException
+
+from app.core.executor import BoundedExecutor
+
+
+def test_cancelled_caller_keeps_the_slot_until_the_thread_finishes():
+    pool = BoundedExecutor("test", max_workers=1, max_queue=0)
+    release = threading.Event()
+
+    async def scenario():
+        task = asyncio.ensure_future(pool.run(release.wait, 5))
+        await asyncio.sleep(0.05)
+        task.cancel()
+        await asyncio.sleep(0.05)
+        pending_after_cancel = pool.pending
+        with pytest.raises(HTTPException) as exc_info:
+            await pool.run(sum, [1, 2])
+
+        release.set()
+        for _ in range(100):
+            if pool.pending == 0:
+                break
+            await asyncio.sleep(0.01)
+        return pending_after_cancel, exc_info.value, await pool.run(sum, [1, 2])
+
+    try:
+        pending_after_cancel, rejected, result = asyncio.run(scenario())
+    finally:
+        release.set()
+        pool.shutdown()
+
+    assert pending_after_cancel == 1
+    assert rejected.status_code == 503
+    assert result == 3
@@ -0,0 +1,104 @@
+import numpy as np
+import pytest
+
+from app.services.knn_index import (
+    BruteForceIndex,
+    HNSWIndex,
+    PartitionedIndex,
+    recall_at_k,
+)
+
+METRICS = ("euclidean", "cosine")
+
+
+def random_matrix(rows: int, dim: int = 17, seed: int = 0) -> np.ndarray:
+    return np.random.default_rng(seed).normal(size=(rows, dim)).astype(np.float32)
+
+
+def noisy_queries(matrix: np.ndarray, n: int, seed: int = 1) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    rows = rng.choice(matrix.shape[0], size=n, replace=False)
+    return matrix[rows] + rng.normal(scale=0.05, size=(n, matrix.shape[1])).astype(np.float32)
+
+
+@pytest.mark.parametrize("metric", METRICS)
+def test_hnsw_matches_brute_force_with_wide_search(metric):
+    matrix = random_matrix(2000)
+    queries = noisy_queries(matrix, 50)
+
+    exact_dist, exact_idx = BruteForceIndex(matrix, metric=metric).search(queries, 10)
+    dist, idx = HNSWIndex.build(matrix, metric=metric, ef_search=200).search(queries, 10)
+
+    assert idx.shape == (50, 10)
+    assert recall_at_k(exact_idx, idx) == pytest.approx(1.0)
+    np.testing.assert_allclose(dist, exact_dist, atol=1e-4)
+
+
+def test_hnsw_add_and_reload_keep_row_numbers(tmp_path):
+    matrix = random_matrix(1500)
+    path = str(tmp_path / "hnsw_index.bin")
+    HNSWIndex.build(matrix[:1000]).save(path)
+
+    index = HNSWIndex.load(path, matrix[:1000])
+    index.add(matrix[1000:])
+    index.save(path)
+    index = HNSWIndex.load(path, matrix, ef_search=100)
+
+    _, idx = index.search(matrix[[0, 999, 1000, 1499]], 1)
+    assert idx[:, 0].tolist() == [0, 999, 1000, 1499]
+    np.testing.assert_array_equal(index.vectors([1200]), matrix[[1200]])
+
+
+def test_hnsw_load_rejects_matrix_of_another_size(tmp_path):
+    matrix = random_matrix(300)
+    path = str(tmp_path / "hnsw_index.bin")
+    HNSWIndex.build(matrix).save(path)
+
+    with pytest.raises(ValueError):
+        HNSWIndex.load(path, matrix[:200])
+
+
+def filtered_brute_force(matrix, buckets, allowed, queries, k, metric):
+    """Vizinhos exatos só entre as linhas dos buckets permitidos, em linhas originais."""
+    rows = np.flatnonzero(allowed[buckets])
+    dist, idx = BruteForceIndex(matrix[rows], metric=metric).search(queries, k)
+    return dist, rows[idx]
+
+
+@pytest.mark.parametrize("metric", METRICS)
+@pytest.mark.parametrize("on_disk", (False, True), ids=("memory", "mmap"))
+def test_partitioned_index_is_exact_per_bucket(tmp_path, metric, on_disk):
+    n_buckets = 8
+    matrix = random_matrix(3000)
+    buckets = np.random.default_rng(2).integers(0, n_buckets, size=3000)
+    buckets[buckets == 5] = 4  # bucket vazio
+    queries = noisy_queries(matrix, 20)
+    directory = str(tmp_path / "partitioned") if on_disk else None
+
+    index = PartitionedIndex.build(matrix, buckets, n_buckets, metric, directory=directory)
+    if on_disk:
+        assert isinstance(index.data, np.memmap)
+        index = PartitionedIndex.load(directory, metric)
+
+    for allowed in (
+        np.ones(n_buckets, dtype=bool),
+        np.isin(np.arange(n_buckets), [1, 4, 5]),
+        np.isin(np.arange(n_buckets), [7]),
+    ):
+        exact_dist, exact_idx = filtered_brute_force(
+            matrix, buckets, allowed, queries, 15, metric
+        )
+        dist, idx = index.search(queries, 15, allowed)
+        np.testing.assert_array_equal(idx, exact_idx)
+        np.testing.assert_allclose(dist, exact_dist, atol=1e-4)
+        assert np.isin(buckets[idx], np.flatnonzero(allowed)).all()
+
+
+def test_partitioned_index_without_allowed_rows_returns_empty():
+    matrix = random_matrix(100)
+    buckets = np.zeros(100, dtype=np.int64)
+    index = PartitionedIndex.build(matrix, buckets, 2)
+
+    dist, idx = index.search(matrix[:3], 5, np.array([False, True]))
+
+    assert dist.shape == idx.shape == (3, 0)
@@ -0,0 +1,101 @@
+from types import SimpleNamespace
+
+import pytest
+from pydantic import BaseModel
+
+import app.core.cache as cache_module
+from app.services.mcp_cache import CACHED_TOOLS, MISS, MCPResponseCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(cache_module, "time", SimpleNamespace(monotonic=clock.monotonic))
+    return clock
+
+
+def remember(cache, user_id, tool_name, arguments, value, response_model=None):
+    cache.set(cache.key(user_id, tool_name, arguments, response_model), value)
+
+
+def test_entries_expire_after_the_tool_ttl(clock):
+    cache = MCPResponseCache(maxsize=10)
+    remember(cache, 1, "getAvailableDevices", {}, "devices")
+    remember(cache, 1, "getMyPlaylists", {}, "playlists")
+
+    clock.now += CACHED_TOOLS["getAvailableDevices"].ttl + 1
+
+    assert cache.get(1, "getAvailableDevices", {}) is MISS
+    assert cache.get(1, "getMyPlaylists", {}) == "playlists"
+
+
+def test_key_ignores_access_token_and_separates_users_and_models():
+    class Playlists(BaseModel):
+        md: str = ""
+
+    cache = MCPResponseCache(maxsize=10)
+    remember(cache, 1, "getMyPlaylists", {"limit": 5, "_accessToken": "a"}, "dict")
+
+    assert cache.get(1, "getMyPlaylists", {"_accessToken": "b", "limit": 5}) == "dict"
+    assert cache.get(2, "getMyPlaylists", {"limit": 5}) is MISS
+    assert cache.get(1, "getMyPlaylists", {"limit": 5}, Playlists) is MISS
+
+
+def test_write_invalidates_only_the_affected_scopes():
+    cache = MCPResponseCache(maxsize=10)
+    remember(cache, 1, "getPlaylistTracks", {"playlistId": "p1"}, "p1 tracks")
+    remember(cache, 1, "getPlaylistTracks", {"playlistId": "p2"}, "p2 tracks")
+    remember(cache, 1, "getMyPlaylists", {}, "playlists")
+    remember(cache, 1, "getAvailableDevices", {}, "devices")
+    remember(cache, 2, "getMyPlaylists", {}, "other user")
+
+    cache.observe_write(1, "addTracksToPlaylist", {"playlistId": "p1", "uris": []})
+
+    assert cache.get(1, "getPlaylistTracks", {"playlistId": "p1"}) is MISS
+    assert cache.get(1, "getMyPlaylists", {}) is MISS
+    assert cache.get(1, "getPlaylistTracks", {"playlistId": "p2"}) == "p2 tracks"
+    assert cache.get(1, "getAvailableDevices", {}) == "devices"
+    assert cache.get(2, "getMyPlaylists", {}) == "other user"
+    assert cache.invalidations == 2
+
+
+def test_key_taken_before_a_concurrent_write_is_not_served():
+    cache = MCPResponseCache(maxsize=10)
+    key = cache.key(1, "getPlaylist", {"playlistId": "p1"})
+
+    cache.observe_write(1, "updatePlaylistDetails", {"playlistId": "p1"})
+    cache.set(key, "stale")
+
+    assert cache.get(1, "getPlaylist", {"playlistId": "p1"}) is MISS
+
+
+def test_uncached_tools_and_disabled_cache_always_miss():
+    cache = MCPResponseCache(maxsize=10)
+    assert cache.key(1, "searchSpotify", {"query": "x"}) is None
+    assert cache.get(1, "searchSpotify", {"query": "x"}) is MISS
+
+    disabled = MCPResponseCache(maxsize=10, enabled=False)
+    remember(disabled, 1, "getMyPlaylists", {}, "playlists")
+    assert disabled.get(1, "getMyPlaylists", {}) is MISS
+    assert len(disabled._cache) == 0
+
+
+def test_stats_count_hits_and_misses_per_tool():
+    cache = MCPResponseCache(maxsize=10)
+    remember(cache, 1, "getMyPlaylists", {}, "playlists")
+    cache.get(1, "getMyPlaylists", {})
+    cache.get(1, "getMyPlaylists", {"offset": 50})
+
+    stats = cache.stats()
+
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["tools"]["getMyPlaylists"]["hit_rate"] == 0.5
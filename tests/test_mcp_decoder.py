@@ -0,0 +1,104 @@
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+
+from app.schemas.tracks import TrackImagesMCPResponse
+from app.services.mcp_decoder import decode_tool_result
+
+
+def tool_result(*texts: str, is_error: bool = False) -> SimpleNamespace:
+    return SimpleNamespace(
+        content=[SimpleNamespace(text=text) for text in texts], isError=is_error
+    )
+
+
+def decode_error(result, response_model=None) -> HTTPException:
+    with pytest.raises(HTTPException) as exc_info:
+        decode_tool_result("getPlaylist", result, response_model)
+    return exc_info.value
+
+
+def test_decodes_markdown_and_json_parts():
+    result = tool_result("# Capas", '{"images": {"a": "http://img"}, "count": 1}')
+
+    assert decode_tool_result("getTrackImages", result) == {
+        "md": "# Capas",
+        "json": {"images": {"a": "http://img"}, "count": 1},
+    }
+
+    typed = decode_tool_result("getTrackImages", result, TrackImagesMCPResponse)
+    assert typed.md == "# Capas"
+    assert typed.json.images == {"a": "http://img"}
+
+
+def test_json_outside_the_response_model_is_502():
+    error = decode_error(tool_result('{"unexpected": true}'), TrackImagesMCPResponse)
+    assert error.status_code == 502
+
+
+# --- Erros tipados: classificados só pelo status/code ---
+
+
+@pytest.mark.parametrize("response_model", (None, TrackImagesMCPResponse))
+def test_typed_403_is_permission_denied(response_model):
+    result = tool_result('{"error": {"status": 403, "message": "Insufficient client scope"}}')
+
+    error = decode_error(result, response_model)
+
+    assert error.status_code == 403
+    assert "Permissão negada" in error.detail
+
+
+def test_typed_code_field_is_used_when_status_is_missing():
+    error = decode_error(tool_result('{"error": {"code": 403, "message": "Nope"}}'))
+    assert error.status_code == 403
+
+
+@pytest.mark.parametrize(
+    "payload",
+    (
+        '{"error": {"status": 404, "message": "Forbidden playlist not found"}}',
+        '{"error": {"code": -32603, "message": "Internal error 403"}}',
+        '{"error": {"status": "403", "message": "status is not numeric"}}',
+    ),
+)
+def test_typed_errors_do_not_look_at_the_message(payload):
+    error = decode_error(tool_result(payload))
+    assert error.status_code == 400
+
+
+# --- Erros só em texto: caminho legado (_legacy_text_error) ---
+
+
+def test_is_error_text_mentioning_forbidden_is_403():
+    error = decode_error(tool_result("Spotify API error: 403 Forbidden", is_error=True))
+    assert error.status_code == 403
+
+
+def test_is_error_text_without_status_is_400():
+    error = decode_error(tool_result("Playlist not found", is_error=True))
+    assert error.status_code == 400
+    assert error.detail == "Playlist not found"
+
+
+def test_is_error_without_content_is_400():
+    error = decode_error(SimpleNamespace(content=[], isError=True))
+    assert error.status_code == 400
+    assert error.detail == "Erro desconhecido"
+
+
+def test_untyped_error_string_goes_through_the_legacy_path():
+    error = decode_error(tool_result('{"error": "Forbidden"}'))
+    assert error.status_code == 403
+
+
+def test_legacy_prefix_without_is_error_is_an_error():
+    error = decode_error(tool_result("Failed to add tracks"))
+    assert error.status_code == 400
+
+
+def test_plain_markdown_is_not_an_error():
+    result = tool_result("Nenhuma música tocando (403 ouvintes hoje)")
+
+    assert decode_tool_result("getNowPlaying", result)["md"].startswith("Nenhuma")
@@ -0,0 +1,71 @@
+import asyncio
+
+from app.services.mcp_pool import MCPSessionPool
+
+
+def make_pool(url: str, max_size: int = 1) -> MCPSessionPool:
+    return MCPSessionPool(url, max_size=max_size, ping_interval=60, acquire_timeout=10)
+
+
+async def call_echo(pool: MCPSessionPool, value: str) -> str:
+    async with pool.session() as session:
+        result = await session.call_tool("echo", {"value": value})
+    return result.content[0].text
+
+
+def test_sequential_calls_reuse_one_session(mcp_server):
+    async def scenario():
+        pool = make_pool(mcp_server.url)
+        try:
+            return pool, [await call_echo(pool, str(i)) for i in range(5)]
+        finally:
+            await pool.close()
+
+    pool, results = asyncio.run(scenario())
+
+    assert results == [f'{{"value": "{i}"}}' for i in range(5)]
+    assert pool.opened == 1
+    assert pool.reused == 4
+    assert mcp_server.app.sessions == 1
+    assert mcp_server.app.initialize == 1
+    assert mcp_server.app.tool_calls == 5
+
+
+def test_concurrent_calls_wait_for_the_pooled_session(mcp_server):
+    async def scenario():
+        pool = make_pool(mcp_server.url)
+        try:
+            await asyncio.gather(*(call_echo(pool, str(i)) for i in range(8)))
+            return pool
+        finally:
+            await pool.close()
+
+    pool = asyncio.run(scenario())
+
+    assert pool.opened == 1
+    assert mcp_server.app.sessions == 1
+    assert mcp_server.app.initialize == 1
+    assert mcp_server.app.tool_calls == 8
+
+
+def test_dropped_connection_is_reestablished(mcp_server):
+    async def scenario():
+        pool = make_pool(mcp_server.url)
+        try:
+            await call_echo(pool, "before")
+            await asyncio.to_thread(mcp_server.restart)
+            # A task da conexão percebe o fim do stream SSE e encerra a sessão
+            for _ in range(100):
+                if not pool._idle[0].alive:
+                    break
+                await asyncio.sleep(0.05)
+            return pool, await call_echo(pool, "after")
+        finally:
+            await pool.close()
+
+    pool, result = asyncio.run(scenario())
+
+    assert result == '{"value": "after"}'
+    assert pool.opened == 2
+    assert mcp_server.app.sessions == 2
+    assert mcp_server.app.initialize == 2
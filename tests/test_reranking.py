@@ -0,0 +1,64 @@
+import numpy as np
+
+from app.services.reranking import mmr_rerank
+
+
+def candidates(n: int, dim: int = 17, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    vectors = rng.normal(size=(n, dim)).astype(np.float32)
+    distances = rng.uniform(0.1, 2.0, size=n).astype(np.float32)
+    artists = rng.integers(0, n // 5, size=n)
+    return vectors, distances, artists
+
+
+def test_pool_only_considers_most_relevant_candidates():
+    vectors, distances, _ = candidates(500)
+
+    order = mmr_rerank(vectors, distances, 20, diversity=0.5, pool_factor=3)
+
+    pool = set(np.argsort(distances)[:60].tolist())
+    assert len(order) == 20
+    assert len(set(order.tolist())) == 20
+    assert set(order.tolist()) <= pool
+
+
+def test_pool_matches_full_run_on_the_same_candidates():
+    vectors, distances, artists = candidates(500)
+    top = np.sort(np.argsort(distances)[:60])
+
+    pooled = mmr_rerank(
+        vectors,
+        distances,
+        20,
+        diversity=0.3,
+        artist_keys=artists,
+        max_per_artist=2,
+        pool_factor=3,
+    )
+    full = mmr_rerank(
+        vectors[top],
+        distances[top],
+        20,
+        diversity=0.3,
+        artist_keys=artists[top],
+        max_per_artist=2,
+    )
+
+    np.testing.assert_array_equal(pooled, top[full])
+
+
+def test_max_per_artist_is_respected():
+    vectors, distances, artists = candidates(300)
+
+    order = mmr_rerank(vectors, distances, 60, artist_keys=artists, max_per_artist=2)
+
+    _, counts = np.unique(artists[order], return_counts=True)
+    assert counts.max() <= 2
+
+
+def test_without_diversity_keeps_relevance_order():
+    vectors, distances, _ = candidates(100)
+
+    order = mmr_rerank(vectors, distances, 10, diversity=0.0)
+
+    np.testing.assert_array_equal(order, np.argsort(distances, kind="stable")[:10])
@@ -0,0 +1,115 @@
+import asyncio
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+
+from app.core.cache import SingleFlight
+from app.services.spotify_mcp import SpotifyMCPService
+
+
+def test_concurrent_calls_share_one_execution():
+    flight = SingleFlight()
+    executions = 0
+
+    async def fetch():
+        nonlocal executions
+        executions += 1
+        await asyncio.sleep(0.05)
+        return {"value": 1}
+
+    async def scenario():
+        return await asyncio.gather(*(flight.run("key", fetch) for _ in range(5)))
+
+    results = asyncio.run(scenario())
+
+    assert executions == 1
+    assert all(result is results[0] for result in results)
+    assert flight.stats() == {"in_flight": 0, "calls": 1, "shared": 4}
+
+
+def test_exception_reaches_every_waiter_and_releases_the_key():
+    flight = SingleFlight()
+
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise ValueError("boom")
+
+    async def scenario():
+        results = await asyncio.gather(
+            *(flight.run("key", fail) for _ in range(3)), return_exceptions=True
+        )
+        return results, await flight.run("key", lambda: asyncio.sleep(0, "ok"))
+
+    results, retry = asyncio.run(scenario())
+
+    assert all(isinstance(result, ValueError) for result in results)
+    assert retry == "ok"
+    assert flight.calls == 2
+
+
+def test_cancelled_waiter_does_not_cancel_the_shared_call():
+    flight = SingleFlight()
+
+    async def fetch():
+        await asyncio.sleep(0.05)
+        return "done"
+
+    async def scenario():
+        first = asyncio.ensure_future(flight.run("key", fetch))
+        second = asyncio.ensure_future(flight.run("key", fetch))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        return first, await second
+
+    first, result = asyncio.run(scenario())
+
+    assert first.cancelled()
+    assert result == "done"
+
+
+def test_distinct_keys_run_separately():
+    flight = SingleFlight()
+
+    async def scenario():
+        return await asyncio.gather(
+            flight.run("a", lambda: asyncio.sleep(0.01, "a")),
+            flight.run("b", lambda: asyncio.sleep(0.01, "b")),
+        )
+
+    assert asyncio.run(scenario()) == ["a", "b"]
+    assert flight.stats()["shared"] == 0
+
+
+def test_coalesced_tool_call_resolves_token_with_each_callers_session(monkeypatch):
+    sessions_used = []
+    executions = []
+
+    async def access_token(user, db):
+        sessions_used.append(db)
+        return "token"
+
+    @asynccontextmanager
+    async def connect():
+        yield object()
+
+    async def run_tool(session, tool_name, arguments, response_model=None):
+        executions.append(dict(arguments))
+        await asyncio.sleep(0.05)
+        return {"md": "tocando", "json": None}
+
+    monkeypatch.setattr(SpotifyMCPService, "_access_token", staticmethod(access_token))
+    monkeypatch.setattr(SpotifyMCPService, "connect", staticmethod(connect))
+    monkeypatch.setattr(SpotifyMCPService, "_run_tool", staticmethod(run_tool))
+
+    user = SimpleNamespace(id=42, spotify_access_token="token")
+    dbs = [object() for _ in range(3)]
+
+    async def scenario():
+        return await asyncio.gather(
+            *(SpotifyMCPService.call_tool("getNowPlaying", user, db) for db in dbs)
+        )
+
+    results = asyncio.run(scenario())
+
+    assert sessions_used == dbs
+    assert executions == [{"_accessToken": "token"}]
+    assert all(result is results[0] for result in results)
@@ -0,0 +1,109 @@
+import numpy as np
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.models.base import Base
+from app.models.track import Track
+from app.services.track_catalog import DECADE_COLUMNS, TrackCatalog
+
+
+@pytest.fixture
+def db():
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+    engine.dispose()
+
+
+def add_tracks(db, start: int, count: int) -> None:
+    rng = np.random.default_rng(start)
+    for i in range(start, start + count):
+        decade = 1960 + 10 * (i % 6)
+        db.add(
+            Track(
+                spotify_id=f"{i:022d}",
+                name=f"Faixa {i} – ação",
+                artists=f"['Artista {i % 7}', 'Convidado']",
+                duration_ms=180_000 + i,
+                energy=float(rng.random()),
+                danceability=float(rng.random()),
+                valence=float(rng.random()),
+                acousticness=float(rng.random()),
+                instrumentalness=float(rng.random()),
+                speechiness=float(rng.random()),
+                explicit=bool(i % 3 == 0),
+                is_popular=bool(i % 2 == 0),
+                **{col: d == decade for d, col in DECADE_COLUMNS},
+            )
+        )
+    db.commit()
+
+
+def build(db, base_dir) -> TrackCatalog:
+    return TrackCatalog.build(db, TrackCatalog.current_stamp(db, "v1"), str(base_dir))
+
+
+def assert_same_columns(catalog: TrackCatalog, expected: TrackCatalog) -> None:
+    assert catalog.columns.keys() == expected.columns.keys()
+    for name, values in expected.columns.items():
+        np.testing.assert_array_equal(catalog.columns[name], values, err_msg=name)
+
+
+@pytest.fixture
+def reads(monkeypatch):
+    """Registra o `after_id` de cada leitura de faixas do banco."""
+    calls = []
+    read_columns = TrackCatalog._read_columns
+
+    def spy(db, after_id=0):
+        calls.append(after_id)
+        return read_columns(db, after_id)
+
+    monkeypatch.setattr(TrackCatalog, "_read_columns", staticmethod(spy))
+    return calls
+
+
+def test_new_tracks_are_appended_without_rereading_the_table(db, tmp_path, reads):
+    add_tracks(db, 1, 40)
+    first = build(db, tmp_path / "catalog")
+    add_tracks(db, 41, 15)
+
+    appended = build(db, tmp_path / "catalog")
+
+    assert reads == [0, 40]
+    assert len(appended) == 55
+    assert appended.version != first.version
+    assert appended.to_responses([54])[0].name == "Faixa 55 – ação"
+    assert_same_columns(appended, build(db, tmp_path / "full"))
+
+
+def test_model_change_alone_reuses_the_columns(db, tmp_path, reads):
+    add_tracks(db, 1, 20)
+    first = build(db, tmp_path)
+
+    stamp = TrackCatalog.current_stamp(db, "v2")
+    catalog = TrackCatalog.build(db, stamp, str(tmp_path))
+
+    assert reads == [0, 20]
+    assert catalog.version != first.version
+    assert_same_columns(catalog, first)
+
+
+def test_removed_tracks_force_a_full_read(db, tmp_path, reads):
+    add_tracks(db, 1, 30)
+    build(db, tmp_path / "catalog")
+    db.query(Track).filter(Track.id == 10).delete()
+    add_tracks(db, 31, 5)
+
+    catalog = build(db, tmp_path / "catalog")
+
+    assert reads == [0, 30, 0]
+    assert len(catalog) == 34
+    assert catalog.row_for(10) is None
+    assert_same_columns(catalog, build(db, tmp_path / "full"))
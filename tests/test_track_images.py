@@ -0,0 +1,88 @@
+import asyncio
+from types import SimpleNamespace
+
+from fastapi import HTTPException
+
+from app.schemas.tracks import TrackImagesMCPResponse, TrackImagesResponse
+from app.services.image_enrichment import image_enrichment
+from app.services.spotify_mcp import SpotifyMCPService
+from app.services.tracks import TracksService
+
+USER = SimpleNamespace(id=7, spotify_access_token=None, spotify_refresh_token=None)
+
+
+def no_stored_images(monkeypatch):
+    monkeypatch.setattr(
+        TracksService, "_load_stored_images", staticmethod(lambda ids: {})
+    )
+
+
+def test_token_failure_returns_tracks_without_images(monkeypatch):
+    no_stored_images(monkeypatch)
+
+    async def access_token(user, db):
+        raise HTTPException(status_code=401, detail="sem refresh token")
+
+    monkeypatch.setattr(SpotifyMCPService, "_access_token", staticmethod(access_token))
+
+    images = asyncio.run(
+        TracksService.get_track_images(USER, None, ["token-fail-1", "token-fail-2"])
+    )
+
+    assert images == {}
+
+
+def test_mcp_unavailable_returns_tracks_without_images(monkeypatch):
+    no_stored_images(monkeypatch)
+
+    async def call_tools_batch(calls, user, db):
+        raise HTTPException(status_code=503, detail="Serviço de Agente Spotify indisponível")
+
+    monkeypatch.setattr(SpotifyMCPService, "call_tools_batch", staticmethod(call_tools_batch))
+
+    images = asyncio.run(TracksService.get_track_images(USER, None, ["mcp-down-1"]))
+
+    assert images == {}
+
+
+def test_track_images_read_failure_falls_back_to_mcp(monkeypatch):
+    def load_stored_images(spotify_ids):
+        raise RuntimeError("banco fora do ar")
+
+    async def call_tools_batch(calls, user, db):
+        ids = calls[0][1]["trackIds"]
+        images = TrackImagesResponse(images={i: f"http://img/{i}" for i in ids}, count=len(ids))
+        return [TrackImagesMCPResponse(json=images)]
+
+    async def store_images(images):
+        pass
+
+    monkeypatch.setattr(TracksService, "_load_stored_images", staticmethod(load_stored_images))
+    monkeypatch.setattr(SpotifyMCPService, "call_tools_batch", staticmethod(call_tools_batch))
+    monkeypatch.setattr(TracksService, "store_images", staticmethod(store_images))
+
+    images = asyncio.run(TracksService.get_track_images(USER, None, ["db-down-1"]))
+
+    assert images == {"db-down-1": "http://img/db-down-1"}
+
+
+def test_wait_false_without_worker_fetches_synchronously(monkeypatch):
+    no_stored_images(monkeypatch)
+
+    async def call_tools_batch(calls, user, db):
+        images = TrackImagesResponse(images={"no-worker-1": "http://img/1"}, count=1)
+        return [TrackImagesMCPResponse(json=images)]
+
+    async def store_images(images):
+        pass
+
+    monkeypatch.setattr(SpotifyMCPService, "call_tools_batch", staticmethod(call_tools_batch))
+    monkeypatch.setattr(TracksService, "store_images", staticmethod(store_images))
+    assert not image_enrichment.running
+
+    images = asyncio.run(
+        TracksService.get_track_images(USER, None, ["no-worker-1"], wait=False)
+    )
+
+    assert images == {"no-worker-1": "http://img/1"}
+    assert not image_enrichment.is_pending("no-worker-1")